@@ -15,4 +15,19 @@ run_container_with_docker_operator = DockerOperator(
     },
     docker_url="unix://var/run/docker.sock",  # Or your Docker daemon TCP URL
     network_mode="bridge" # Or the network mode your container needs
+)
+
+# Several exports can share one container run by listing them in a job
+# manifest (see pipeline/job_runner.py); they run concurrently inside it.
+run_export_jobs_with_docker_operator = DockerOperator(
+    task_id="run_py_file_proc_export_jobs",
+    image="py-file-proc",
+    auto_remove=True,
+    command="python main.py export_jobs.yaml",
+    environment={
+        "APP_ENV": TARGET_ENVIRONMENT,
+        "JOB_MAX_WORKERS": "4"
+    },
+    docker_url="unix://var/run/docker.sock",
+    network_mode="bridge"
 )
\ No newline at end of file
@@ -1,10 +1,252 @@
 # your_project_name/api_client/api_sender.py
 
+import io
+import glob
+import itertools
+import json
+import queue
+import threading
+import time
+import uuid
 import requests
+from typing import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
 import os # Import os for path.basename
 from your_project_name.config import settings
+from your_project_name.api_client.http_client import ApiClient, FileBody, get_default_client
+from your_project_name.file_handler import export_cache, file_operations
+from your_project_name.file_handler.state_files import locked_file
 
-def upload_file_to_api(filepath: str, api_endpoint: str = settings.API_ENDPOINT, api_key: str = settings.API_KEY) -> bool:
+# Responses that acknowledge a chunk in upload_file_in_chunks (308 is "Resume Incomplete")
+UPLOAD_CHUNK_ACCEPTED_STATUS_CODES = (200, 201, 202, 204, 308)
+
+# Content-Encoding of compressed files written by file_operations, by extension
+CONTENT_ENCODINGS = {'.gz': 'gzip', '.zst': 'zstd'}
+
+def get_content_encoding(filepath: str) -> str | None:
+    """Returns the Content-Encoding of a compressed file (e.g. 'gzip' for .gz), or None."""
+    return CONTENT_ENCODINGS.get(os.path.splitext(filepath)[1].lower())
+
+def get_content_type(filepath: str) -> str:
+    """
+    Determines the content type of a file based on its extension.
+
+    Compressed files report the type of their content, e.g. 'text/csv' for
+    'export.csv.gz'; the compression is described by `get_content_encoding`.
+    """
+    root, file_extension = os.path.splitext(filepath)
+    if file_extension.lower() in CONTENT_ENCODINGS:
+        file_extension = os.path.splitext(root)[1]
+    file_extension = file_extension.lower()
+    if file_extension == '.csv':
+        return 'text/csv'
+    elif file_extension == '.json':
+        return 'application/json'
+    elif file_extension == '.jsonl':
+        return 'application/x-ndjson'
+    elif file_extension == '.xml':
+        return 'application/xml' # New content type for XML
+    elif file_extension == '.parquet':
+        return 'application/vnd.apache.parquet'
+    elif file_extension == '.arrow':
+        return 'application/vnd.apache.arrow.file'
+    return 'application/octet-stream' # Default for unknown types
+
+def _build_auth_headers(api_key: str) -> dict:
+    """Builds the authentication headers for the API."""
+    headers = {}
+    if api_key:
+        # Example: Add API key to headers. Adjust based on your API's authentication method.
+        # Common methods: 'Authorization': 'Bearer YOUR_API_KEY', 'x-api-key': 'YOUR_API_KEY'
+        headers['X-API-Key'] = api_key # Or 'Authorization': f'Bearer {api_key}'
+    return headers
+
+def _handle_upload_response(response, filepath: str, api_endpoint: str) -> bool:
+    """Prints the outcome of an upload request and returns whether it succeeded."""
+    if response.status_code == 200:
+        print(f"File '{os.path.basename(filepath)}' uploaded successfully to {api_endpoint}.")
+        try:
+            print(f"API Response: {response.json()}") # Assuming JSON response
+        except requests.exceptions.JSONDecodeError:
+            print(f"API Response (non-JSON): {response.text}")
+        return True
+    else:
+        print(f"Failed to upload file. Status Code: {response.status_code}")
+        print(f"API Error Response: {response.text}")
+        return False
+
+class MultipartFileStream:
+    """
+    A file-like multipart/form-data body that reads the file lazily.
+
+    `requests` sends objects with a `read` method in small blocks and uses
+    `len()` for the Content-Length header, so the multipart body is never
+    built in memory, no matter how large the file is.
+    """
+
+    def __init__(self, file_obj, filename: str, content_type: str, file_size: int, field_name: str = "file",
+                 content_encoding: str | None = None):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        encoding_header = f"Content-Encoding: {content_encoding}\r\n" if content_encoding else ""
+        preamble = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n"
+            f"{encoding_header}\r\n"
+        ).encode("utf-8")
+        epilogue = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+        self._file_obj = file_obj
+        self._file_start = file_obj.tell()
+        self._preamble = preamble
+        self._epilogue = epilogue
+        self._length = len(preamble) + file_size + len(epilogue)
+        self.seek(0)
+
+    def seek(self, offset: int, whence: int = 0):
+        """Rewinds the body so a failed request can be retried. Only seek(0) is supported."""
+        if offset != 0 or whence != 0:
+            raise io.UnsupportedOperation("MultipartFileStream can only be rewound to the start.")
+        self._file_obj.seek(self._file_start)
+        self._parts = [io.BytesIO(self._preamble), self._file_obj, io.BytesIO(self._epilogue)]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = []
+        while self._parts and (size < 0 or size > 0):
+            chunk = self._parts[0].read(size)
+            if not chunk:
+                self._parts.pop(0)
+                continue
+            chunks.append(chunk)
+            if size > 0:
+                size -= len(chunk)
+        return b"".join(chunks)
+
+def send_upload_chunk(chunk: bytes, offset: int, upload_id: str, filename: str, content_type: str,
+                      total_size: int | None, api_endpoint: str = settings.API_ENDPOINT,
+                      api_key: str = settings.API_KEY,
+                      max_retries: int = settings.UPLOAD_CHUNK_RETRIES,
+                      client: ApiClient | None = None, content_encoding: str | None = None) -> bool:
+    """
+    Sends one chunk of the resumable chunked upload protocol (see `upload_file_in_chunks`).
+
+    Args:
+        chunk (bytes): The chunk's content.
+        offset (int): The byte offset of the chunk within the file.
+        upload_id (str): The id shared by all chunks of the upload.
+        filename (str): The file name reported to the server.
+        content_type (str): The content type of the whole file.
+        total_size (int | None): The size of the whole file, or None while it is
+                                 still unknown (streamed uploads). The last chunk
+                                 must always carry the total size.
+        api_endpoint (str): The URL of the chunk upload endpoint.
+        api_key (str): The API key for authentication (if required by the API).
+        max_retries (int): The number of retries for this chunk.
+        client (ApiClient | None): The client to send requests with. Defaults to the shared client.
+        content_encoding (str | None): The Content-Encoding of the whole file, e.g. "gzip".
+
+    Returns:
+        bool: True if the server accepted the chunk, False otherwise.
+    """
+    headers = _build_auth_headers(api_key)
+    total = "*" if total_size is None else str(total_size)
+    headers.update({
+        'Content-Type': content_type,
+        'X-Upload-Id': upload_id,
+        'X-File-Name': filename,
+        'X-Upload-Offset': str(offset),
+        'Content-Range': f"bytes {offset}-{offset + len(chunk) - 1}/{total}" if chunk else f"bytes */{total}",
+    })
+    if content_encoding:
+        headers['Content-Encoding'] = content_encoding
+    try:
+        response = (client or get_default_client()).post(api_endpoint, headers=headers, data=chunk,
+                                                         max_retries=max_retries)
+    except requests.exceptions.RequestException as e:
+        print(f"Chunk at offset {offset} failed: {e}")
+        return False
+    if response.status_code not in UPLOAD_CHUNK_ACCEPTED_STATUS_CODES:
+        print(f"Chunk at offset {offset} was rejected. Status Code: {response.status_code}")
+        print(f"API Error Response: {response.text}")
+        return False
+    return True
+
+def upload_file_in_chunks(filepath: str, api_endpoint: str = settings.API_ENDPOINT,
+                          api_key: str = settings.API_KEY,
+                          chunk_size: int = settings.UPLOAD_CHUNK_SIZE,
+                          max_retries: int = settings.UPLOAD_CHUNK_RETRIES,
+                          upload_id: str | None = None, start_offset: int = 0,
+                          client: ApiClient | None = None) -> bool:
+    """
+    Uploads a file with a resumable chunked protocol.
+
+    The file is sent as consecutive raw chunks of `chunk_size` bytes. Every
+    chunk request carries the headers below, so the server can place the
+    chunk and detect completion:
+
+        X-Upload-Id:     identifies the upload across chunk requests
+        X-Upload-Offset: byte offset of the chunk within the file
+        Content-Range:   bytes <first>-<last>/<total>
+        X-File-Name:     the original file name
+
+    A chunk is accepted on a 200, 201, 202, 204 or 308 response. Failed chunks
+    (network errors, 429 and 5xx responses) are retried up to `max_retries`
+    times by the ApiClient's backoff policy; chunks that were already accepted
+    are never re-sent. To resume an interrupted upload, pass its `upload_id` and
+    the first offset that was not accepted.
+
+    Args:
+        filepath (str): The full path to the file to upload.
+        api_endpoint (str): The URL of the chunk upload endpoint.
+        api_key (str): The API key for authentication (if required by the API).
+        chunk_size (int): The number of bytes per chunk.
+        max_retries (int): The number of retries per chunk.
+        upload_id (str | None): The upload to resume. A new id is generated if None.
+        start_offset (int): The byte offset to start (or resume) from.
+        client (ApiClient | None): The client to send requests with. Defaults to the shared client.
+
+    Returns:
+        bool: True if all chunks were accepted, False otherwise.
+    """
+    if not filepath or not os.path.exists(filepath):
+        print(f"File not found or invalid path: {filepath}")
+        return False
+
+    client = client or get_default_client()
+    upload_id = upload_id or uuid.uuid4().hex
+    total_size = os.path.getsize(filepath)
+    filename = os.path.basename(filepath)
+    content_type = get_content_type(filepath)
+    content_encoding = get_content_encoding(filepath)
+
+    try:
+        with open(filepath, 'rb') as f:
+            offset = start_offset
+            f.seek(offset)
+            while True:
+                chunk = f.read(chunk_size)
+                if not send_upload_chunk(chunk, offset, upload_id, filename, content_type, total_size,
+                                         api_endpoint, api_key, max_retries, client, content_encoding):
+                    print(f"Giving up on upload {upload_id} at offset {offset}. "
+                          f"Resume with upload_id='{upload_id}', start_offset={offset}.")
+                    return False
+                offset += len(chunk)
+                if offset >= total_size:
+                    break
+        print(f"File '{filename}' uploaded successfully to {api_endpoint} "
+              f"in chunks of {chunk_size} bytes (upload id {upload_id}).")
+        return True
+    except IOError as e:
+        print(f"Error reading file {filepath}: {e}")
+        return False
+
+def upload_file_to_api(filepath: str, api_endpoint: str = settings.API_ENDPOINT, api_key: str = settings.API_KEY,
+                       mode: str = settings.UPLOAD_MODE, client: ApiClient | None = None,
+                       cache_key: str | None = None) -> bool:
     """
     Uploads a file to a specified API endpoint.
 
@@ -12,47 +254,73 @@ def upload_file_to_api(filepath: str, api_endpoint: str = settings.API_ENDPOINT,
         filepath (str): The full path to the file to upload.
         api_endpoint (str): The URL of the API endpoint.
         api_key (str): The API key for authentication (if required by the API).
+        mode (str): "multipart" builds the multipart body in memory, "stream"
+                    sends the same multipart request while reading the file
+                    lazily, "raw" sends the file itself as the request body
+                    without copying it through Python (see `http_client.FileBody`),
+                    and "chunked" uses `upload_file_in_chunks`.
+        client (ApiClient | None): The client to send requests with. Defaults to the shared client.
+        cache_key (str | None): The export cache key from `file_operations.create_file_cached`.
+                                If the same data was already uploaded successfully to
+                                `api_endpoint`, the upload is skipped. The outcome is recorded.
 
     Returns:
-        bool: True if the upload was successful, False otherwise.
+        bool: True if the upload was successful (or skipped), False otherwise.
     """
+    try:
+        if cache_key and export_cache.was_uploaded(cache_key, api_endpoint):
+            print(f"Skipping upload of {filepath}: the same data was already uploaded to {api_endpoint}.")
+            return True
+    except (OSError, ValueError) as e:
+        print(f"Error reading the export cache, uploading anyway: {e}")
+
+    upload_success = _send_file(filepath, api_endpoint, api_key, mode, client)
+    if cache_key:
+        try:
+            export_cache.record_upload(cache_key, api_endpoint, upload_success)
+        except (OSError, ValueError) as e:
+            print(f"Error recording the upload in the export cache: {e}")
+    return upload_success
+
+def _send_file(filepath: str, api_endpoint: str, api_key: str, mode: str, client: ApiClient | None) -> bool:
+    """Sends a file with the given upload mode. See `upload_file_to_api`."""
+    if mode == "chunked":
+        return upload_file_in_chunks(filepath, api_endpoint, api_key, client=client)
+    if mode not in ("multipart", "stream", "raw"):
+        print(f"Unknown upload mode '{mode}'. Expected 'multipart', 'stream', 'raw' or 'chunked'.")
+        return False
+
     if not filepath or not os.path.exists(filepath):
         print(f"File not found or invalid path: {filepath}")
         return False
 
-    headers = {}
-    if api_key:
-        # Example: Add API key to headers. Adjust based on your API's authentication method.
-        # Common methods: 'Authorization': 'Bearer YOUR_API_KEY', 'x-api-key': 'YOUR_API_KEY'
-        headers['X-API-Key'] = api_key # Or 'Authorization': f'Bearer {api_key}'
+    headers = _build_auth_headers(api_key)
+    client = client or get_default_client()
 
     try:
         with open(filepath, 'rb') as f:
             # Determine content type based on file extension
-            file_extension = os.path.splitext(filepath)[1].lower()
-            if file_extension == '.csv':
-                content_type = 'text/csv'
-            elif file_extension == '.json':
-                content_type = 'application/json'
-            elif file_extension == '.xml':
-                content_type = 'application/xml' # New content type for XML
-            else:
-                content_type = 'application/octet-stream' # Default for unknown types
+            content_type = get_content_type(filepath)
+            # Compressed files are sent as-is and labelled with their Content-Encoding
+            content_encoding = get_content_encoding(filepath)
 
-            files = {'file': (os.path.basename(filepath), f, content_type)}
-            response = requests.post(api_endpoint, headers=headers, files=files)
-
-            if response.status_code == 200:
-                print(f"File '{os.path.basename(filepath)}' uploaded successfully to {api_endpoint}.")
-                try:
-                    print(f"API Response: {response.json()}") # Assuming JSON response
-                except requests.exceptions.JSONDecodeError:
-                    print(f"API Response (non-JSON): {response.text}")
-                return True
+            if mode == "raw":
+                headers.update({'Content-Type': content_type, 'X-File-Name': os.path.basename(filepath)})
+                if content_encoding:
+                    headers['Content-Encoding'] = content_encoding
+                response = client.post(api_endpoint, headers=headers, data=FileBody(f))
+            elif mode == "stream":
+                body = MultipartFileStream(f, os.path.basename(filepath), content_type, os.path.getsize(filepath),
+                                           content_encoding=content_encoding)
+                headers['Content-Type'] = body.content_type
+                response = client.post(api_endpoint, headers=headers, data=body)
             else:
-                print(f"Failed to upload file. Status Code: {response.status_code}")
-                print(f"API Error Response: {response.text}")
-                return False
+                files = {'file': (os.path.basename(filepath), f, content_type)}
+                if content_encoding:
+                    files['file'] += ({'Content-Encoding': content_encoding},)
+                response = client.post(api_endpoint, headers=headers, files=files)
+
+            return _handle_upload_response(response, filepath, api_endpoint)
     except requests.exceptions.RequestException as e:
         print(f"An error occurred during API request: {e}")
         return False
@@ -60,19 +328,322 @@ def upload_file_to_api(filepath: str, api_endpoint: str = settings.API_ENDPOINT,
         print(f"Error reading file {filepath}: {e}")
         return False
 
+class PartUploader:
+    """
+    Uploads the part files of a sharded export concurrently, as each part is closed.
+
+    Pass `submit` as the `on_part` callback of `file_operations.create_sharded_files`:
+    each part starts uploading while the next one is being written, with at
+    most `max_workers` uploads at a time over the shared pooled client.
+    Leaving the `with` block waits for all uploads to finish.
+
+    Example:
+        with PartUploader() as uploader:
+            manifest_path = file_operations.create_sharded_files(rows, "csv", "export.csv",
+                                                                 on_part=uploader.submit)
+        if manifest_path and uploader.succeeded:
+            upload_file_to_api(manifest_path)
+    """
+
+    def __init__(self, api_endpoint: str = settings.API_ENDPOINT, api_key: str = settings.API_KEY,
+                 mode: str = settings.UPLOAD_MODE, max_workers: int = settings.UPLOAD_MAX_WORKERS,
+                 client: ApiClient | None = None):
+        self.api_endpoint = api_endpoint
+        self.api_key = api_key
+        self.mode = mode
+        self.client = client
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="part-upload")
+        self._futures = {}
+
+    def submit(self, filepath: str):
+        """Starts uploading a part in the background."""
+        self._futures[filepath] = self._executor.submit(upload_file_to_api, filepath, self.api_endpoint,
+                                                        self.api_key, self.mode, self.client)
+
+    def wait(self) -> dict:
+        """Waits for all submitted uploads and returns whether each part was uploaded, by path."""
+        results = {}
+        for filepath, future in self._futures.items():
+            try:
+                results[filepath] = future.result()
+            except Exception as e:
+                print(f"Upload of part {filepath} failed: {e}")
+                results[filepath] = False
+        return results
+
+    @property
+    def succeeded(self) -> bool:
+        """True if every submitted part was uploaded. Waits for running uploads."""
+        return all(self.wait().values())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._executor.shutdown(wait=True)
+
+def resolve_upload_sources(sources) -> list:
+    """
+    Expands the files to upload, sorted and without duplicates.
+
+    Args:
+        sources (str | list): A directory (its files, not recursive), a glob
+                              pattern or a file path, or a list of them.
+                              Hidden files, such as partially written state files, are skipped.
+    """
+    filepaths = set()
+    for source in [sources] if isinstance(sources, str) else sources:
+        pattern = os.path.join(source, "*") if os.path.isdir(source) else source
+        filepaths.update(os.path.abspath(path) for path in glob.glob(pattern)
+                         if os.path.isfile(path) and not os.path.basename(path).startswith("."))
+    return sorted(filepaths)
+
+def _upload_journal_key(filepath: str, api_endpoint: str) -> tuple:
+    """Identifies one version of a file uploaded to an endpoint."""
+    stat = os.stat(filepath)
+    return api_endpoint, filepath, stat.st_size, stat.st_mtime_ns
+
+def read_upload_journal(journal_file: str = settings.UPLOAD_JOURNAL_FILE) -> set:
+    """Returns the keys of the uploads recorded in the journal (see `_upload_journal_key`)."""
+    completed = set()
+    with locked_file(journal_file):
+        if not os.path.exists(journal_file):
+            return completed
+        with open(journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue # A line cut short by a crash
+                completed.add((entry["endpoint"], entry["path"], entry["size"], entry["mtime_ns"]))
+    return completed
+
+def record_completed_upload(journal_key: tuple, journal_file: str = settings.UPLOAD_JOURNAL_FILE):
+    """
+    Appends a completed upload to the journal.
+
+    The journal is append-only JSON Lines, so recording one of thousands of
+    uploads writes one line instead of rewriting the whole record.
+    """
+    api_endpoint, filepath, size, mtime_ns = journal_key
+    entry = {"endpoint": api_endpoint, "path": filepath, "size": size, "mtime_ns": mtime_ns,
+             "uploaded_at": datetime.now().isoformat()}
+    with locked_file(journal_file):
+        with open(journal_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+def _print_batch_progress(done_files: int, total_files: int, done_bytes: int, total_bytes: int, started_at: float):
+    """Prints the aggregate progress, throughput and estimated time left of a batch upload."""
+    elapsed = max(time.perf_counter() - started_at, 1e-9)
+    throughput = done_bytes / elapsed
+    eta = timedelta(seconds=round((total_bytes - done_bytes) / throughput)) if throughput else "unknown"
+    print(f"[{done_files}/{total_files}] {done_bytes / 1024 / 1024:.1f}/{total_bytes / 1024 / 1024:.1f} MiB, "
+          f"{throughput / 1024 / 1024:.1f} MiB/s, ETA {eta}")
+
+def upload_files(sources, api_endpoint: str = settings.API_ENDPOINT, api_key: str = settings.API_KEY,
+                 mode: str = settings.UPLOAD_MODE, max_workers: int = settings.UPLOAD_MAX_WORKERS,
+                 rate_limit: float = settings.API_RATE_LIMIT,
+                 journal_file: str | None = settings.UPLOAD_JOURNAL_FILE,
+                 client: ApiClient | None = None) -> dict:
+    """
+    Uploads many files concurrently, resuming where an interrupted batch stopped.
+
+    Up to `max_workers` files are uploaded at once with `upload_file_to_api`
+    over one pooled client. Each completed upload is appended to the journal,
+    and files already recorded there for the same endpoint with an unchanged
+    size and modification time are skipped, so rerunning an interrupted
+    batch only uploads what is missing. Aggregate progress, throughput and
+    ETA are printed as files complete.
+
+    Args:
+        sources (str | list): The files to upload (see `resolve_upload_sources`).
+        api_endpoint (str): The URL of the API endpoint.
+        api_key (str): The API key for authentication (if required by the API).
+        mode (str): The upload mode (see `upload_file_to_api`).
+        max_workers (int): The maximum number of uploads running at once.
+        rate_limit (float): The maximum requests per second to the API host; 0 for
+                            no limit. Ignored when a `client` is given.
+        journal_file (str | None): The journal of completed uploads; None disables resuming.
+        client (ApiClient | None): The client to send requests with. Defaults to a
+                                   client with a connection per worker.
+
+    Returns:
+        dict: The "uploaded", "skipped" and "failed" file paths, and the
+              number of "bytes" uploaded.
+    """
+    summary = {"uploaded": [], "skipped": [], "failed": [], "bytes": 0}
+    completed = read_upload_journal(journal_file) if journal_file else set()
+    pending = []
+    for filepath in resolve_upload_sources(sources):
+        journal_key = _upload_journal_key(filepath, api_endpoint)
+        if journal_key in completed:
+            summary["skipped"].append(filepath)
+        else:
+            pending.append((filepath, journal_key))
+    total_bytes = sum(journal_key[2] for _, journal_key in pending)
+    print(f"Uploading {len(pending)} files ({total_bytes / 1024 / 1024:.1f} MiB) to {api_endpoint} "
+          f"with {max_workers} workers; {len(summary['skipped'])} already uploaded.")
+    if not pending:
+        return summary
+
+    batch_client = client or ApiClient(pool_size=max(settings.API_POOL_SIZE, max_workers), rate_limit=rate_limit)
+    started_at = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="batch-upload") as pool:
+            futures = {pool.submit(upload_file_to_api, filepath, api_endpoint, api_key, mode, batch_client):
+                       (filepath, journal_key) for filepath, journal_key in pending}
+            for future in as_completed(futures):
+                filepath, journal_key = futures[future]
+                try:
+                    uploaded = future.result()
+                except Exception as e:
+                    print(f"Upload of {filepath} failed: {e}")
+                    uploaded = False
+                if uploaded:
+                    summary["uploaded"].append(filepath)
+                    summary["bytes"] += journal_key[2]
+                    if journal_file:
+                        record_completed_upload(journal_key, journal_file)
+                else:
+                    summary["failed"].append(filepath)
+                _print_batch_progress(len(summary["uploaded"]) + len(summary["failed"]), len(pending),
+                                      summary["bytes"], total_bytes, started_at)
+    finally:
+        if client is None:
+            batch_client.close()
+    summary["uploaded"].sort()
+    summary["failed"].sort()
+    print(f"Batch upload finished: {len(summary['uploaded'])} uploaded, {len(summary['skipped'])} skipped, "
+          f"{len(summary['failed'])} failed.")
+    return summary
+
+# Marks the end of the body in the queue of `stream_rows_to_api`
+_STREAM_DONE = object()
+
+def _put_until_stopped(chunk_queue: queue.Queue, item, stop_event: threading.Event) -> bool:
+    """Puts an item in the queue, waiting for room. Returns False if the stream was stopped first."""
+    while not stop_event.is_set():
+        try:
+            chunk_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _produce_stream_chunks(chunks: Iterable[bytes], chunk_queue: queue.Queue, stop_event: threading.Event,
+                           tee_filepath: str | None):
+    """
+    Worker thread: reads and serializes the rows into `chunk_queue`.
+
+    Each chunk is also appended to the tee file, if any. Errors are passed
+    through the queue so they are raised in the uploading thread.
+    """
+    tee_file = None
+    try:
+        for chunk in chunks:
+            if tee_filepath:
+                tee_file = tee_file or open(tee_filepath, 'wb')
+                tee_file.write(chunk)
+            if not _put_until_stopped(chunk_queue, chunk, stop_event):
+                return
+        _put_until_stopped(chunk_queue, _STREAM_DONE, stop_event)
+    except Exception as e:
+        _put_until_stopped(chunk_queue, e, stop_event)
+    finally:
+        if tee_file:
+            tee_file.close()
+
+def _iter_stream_chunks(chunk_queue: queue.Queue) -> Iterator[bytes]:
+    """Yields the chunks produced by `_produce_stream_chunks`, raising its errors."""
+    while (chunk := chunk_queue.get()) is not _STREAM_DONE:
+        if isinstance(chunk, Exception):
+            raise chunk
+        yield chunk
+
+def stream_rows_to_api(data: Iterable[dict], file_format: str, filename: str,
+                       api_endpoint: str = settings.API_ENDPOINT, api_key: str = settings.API_KEY,
+                       compression: str | None = settings.OUTPUT_COMPRESSION,
+                       tee: bool = settings.PIPELINE_DIRECT_UPLOAD_TEE, metadata: dict | None = None,
+                       queue_size: int = settings.PIPELINE_QUEUE_SIZE, client: ApiClient | None = None) -> bool:
+    """
+    Uploads rows as a serialized document without writing it to disk first.
+
+    The rows (e.g. from `db_connector.iter_rows_from_db`) are serialized and
+    compressed by a worker thread (see `file_operations.iter_serialized_chunks`)
+    while the request body is being sent with chunked transfer encoding, so
+    reading the database overlaps with the upload and no scratch space is
+    needed. At most `queue_size` chunks are held in memory; a slow upload
+    throttles the database reads. The request carries the same Content-Type,
+    Content-Encoding and X-File-Name as a "raw" upload of the file would. A
+    streamed body cannot be replayed, so the request is not retried.
+
+    Args:
+        data (Iterable[dict]): A list or iterator of dictionaries, where each dictionary is a row.
+        file_format (str): One of `file_operations.RowSerializer.FORMATS`.
+        filename (str): The file name reported to the server. The compression extension is appended.
+        api_endpoint (str): The URL of the API endpoint.
+        api_key (str): The API key for authentication (if required by the API).
+        compression (str | None): None, "gzip" or "zstd".
+        tee (bool): Also write the uploaded bytes to `filename` in OUTPUT_FILE_DIRECTORY
+                    for auditing. The copy is kept even if the upload fails.
+        metadata (dict | None): Values for "{{ name }}" placeholders in the XML template.
+        queue_size (int): The maximum number of serialized chunks waiting to be sent.
+        client (ApiClient | None): The client to send requests with. Defaults to the shared client.
+
+    Returns:
+        bool: True if the upload was successful, False if it failed or there were no rows.
+    """
+    filename = file_operations.get_compressed_filepath(filename, compression)
+    headers = _build_auth_headers(api_key)
+    headers.update({'Content-Type': get_content_type(filename), 'X-File-Name': filename})
+    if get_content_encoding(filename):
+        headers['Content-Encoding'] = get_content_encoding(filename)
+
+    chunks = file_operations.iter_serialized_chunks(data, file_format, compression, metadata=metadata)
+    tee_filepath = file_operations.get_output_filepath(filename) if tee else None
+    chunk_queue = queue.Queue(maxsize=max(1, queue_size))
+    stop_event = threading.Event()
+    producer = threading.Thread(target=_produce_stream_chunks, args=(chunks, chunk_queue, stop_event, tee_filepath),
+                                name="stream-upload-serializer", daemon=True)
+    producer.start()
+    body = _iter_stream_chunks(chunk_queue)
+    try:
+        first_chunk = next(body, None)
+        if first_chunk is None:
+            print("No data to stream. Nothing was uploaded.")
+            return False
+        response = (client or get_default_client()).post(api_endpoint, headers=headers,
+                                                         data=itertools.chain([first_chunk], body))
+        if tee_filepath:
+            print(f"Streamed upload written to {tee_filepath} for auditing.")
+        return _handle_upload_response(response, filename, api_endpoint)
+    except requests.exceptions.RequestException as e:
+        print(f"An error occurred during API request: {e}")
+        return False
+    except Exception as e:
+        print(f"An unexpected error occurred while streaming the export: {e}")
+        return False
+    finally:
+        stop_event.set()
+        producer.join()
 
-def call_post_api(url, parameters):
+def call_post_api(url, parameters, timeout=None, client: ApiClient | None = None):
     """
     Calls an API endpoint with a POST request and prints the returned value.
 
     Args:
         url (str): The URL of the API endpoint.
         parameters (dict): A dictionary of parameters to send in the POST request body.
+        timeout (optional): A (connect, read) tuple or number of seconds for this call.
+                            Defaults to the client's timeout.
+        client (ApiClient | None): The client to send requests with. Defaults to the shared client.
     """
     try:
         # Send the POST request
         # The 'json' parameter automatically sets Content-Type to application/json
-        response = requests.post(url, json=parameters)
+        response = (client or get_default_client()).post(url, json=parameters, timeout=timeout)
 
         # Raise an HTTPError for bad responses (4xx or 5xx)
         response.raise_for_status()
@@ -100,7 +671,7 @@ def call_post_api(url, parameters):
     except requests.exceptions.RequestException as req_err:
         print(f"An unexpected error occurred: {req_err}")
 
-def call_get_api(url, parameters=None):
+def call_get_api(url, parameters=None, timeout=None, client: ApiClient | None = None):
     """
     Calls an API endpoint with a GET request and prints the returned value.
 
@@ -108,11 +679,14 @@ def call_get_api(url, parameters=None):
         url (str): The URL of the API endpoint.
         parameters (dict, optional): A dictionary of parameters to send as query strings.
                                      Defaults to None.
+        timeout (optional): A (connect, read) tuple or number of seconds for this call.
+                            Defaults to the client's timeout.
+        client (ApiClient | None): The client to send requests with. Defaults to the shared client.
     """
     try:
         # Send the GET request
         # The 'params' parameter automatically appends query parameters to the URL
-        response = requests.get(url, params=parameters)
+        response = (client or get_default_client()).get(url, params=parameters, timeout=timeout)
 
         # Raise an HTTPError for bad responses (4xx or 5xx)
         response.raise_for_status()
@@ -0,0 +1,238 @@
+# your_project_name/api_client/http_client.py
+
+import http.client
+import mmap
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from your_project_name.config import settings
+
+# Status codes that are retried with backoff
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+class FileBody:
+    """
+    A request body sent straight from an open binary file, with a Content-Length.
+
+    On plain HTTP the file is written to the socket with `socket.sendfile`
+    (os.sendfile where available), so the kernel copies it from the page
+    cache without it passing through Python. Over TLS, which has to encrypt
+    in user space, the file is memory-mapped and sent as one memoryview that
+    the socket writes in slices, without reading it into bytes objects.
+    The body is re-sent from the start when a request is retried.
+    """
+
+    def __init__(self, file_obj):
+        self.file_obj = file_obj
+        self.size = os.fstat(file_obj.fileno()).st_size
+
+    def __len__(self) -> int:
+        return self.size
+
+class ApiClient:
+    """
+    HTTP client shared by the functions in `api_sender`.
+
+    It owns a `requests.Session`, so TCP/TLS connections are kept alive and
+    reused across calls through a pool of `pool_size` connections per host.
+    Connection errors, timeouts, 429 and 5xx responses are retried with
+    exponential backoff and full jitter, honoring the Retry-After header.
+    Every request has a (connect, read) timeout unless one is given per call.
+    With a `rate_limit`, requests to each host (retries included) are spaced
+    to at most that many per second, across all threads using the client.
+    """
+
+    def __init__(self, pool_size: int = settings.API_POOL_SIZE,
+                 max_retries: int = settings.API_MAX_RETRIES,
+                 backoff_factor: float = settings.API_BACKOFF_FACTOR,
+                 max_backoff: float = settings.API_MAX_BACKOFF,
+                 timeout: tuple = (settings.API_CONNECT_TIMEOUT, settings.API_READ_TIMEOUT),
+                 rate_limit: float = settings.API_RATE_LIMIT):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.rate_limit = rate_limit
+        self._next_request_at = {} # Earliest start time of the next request, by host
+        self._rate_limit_lock = threading.Lock()
+        self.session = requests.Session()
+        # Retries are handled in request() so that they can honor Retry-After and rewind bodies
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Returns the exponential backoff delay with full jitter for a retry attempt."""
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    def _retry_after_delay(self, response) -> float | None:
+        """Parses the Retry-After header (seconds or HTTP date), capped at max_backoff."""
+        retry_after = response.headers.get("Retry-After")
+        if not retry_after:
+            return None
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        return min(max(delay, 0), self.max_backoff)
+
+    def _wait_for_rate_limit(self, url: str):
+        """Sleeps until the host of `url` may receive another request under `rate_limit`."""
+        if not self.rate_limit:
+            return
+        host = urlsplit(url).netloc
+        with self._rate_limit_lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_request_at.get(host, now))
+            self._next_request_at[host] = start_at + 1 / self.rate_limit
+        if start_at > now:
+            time.sleep(start_at - now)
+
+    @staticmethod
+    def _rewind_body(kwargs: dict) -> bool:
+        """
+        Rewinds file-like request bodies before a retry.
+
+        Returns:
+            bool: False if the body is a stream that cannot be replayed.
+        """
+        data = kwargs.get("data")
+        if data is not None and hasattr(data, "read"):
+            if not hasattr(data, "seek"):
+                return False
+            data.seek(0)
+        elif data is not None and not isinstance(data, (bytes, str, dict, list, tuple, FileBody)):
+            return False # Generators cannot be replayed
+        for value in (kwargs.get("files") or {}).values():
+            file_obj = value[1] if isinstance(value, tuple) else value
+            if hasattr(file_obj, "seek"):
+                file_obj.seek(0)
+        return True
+
+    def _send_file_body(self, method: str, url: str, timeout, kwargs: dict) -> requests.Response:
+        """Sends one attempt of a request whose `data` is a FileBody. See `FileBody`."""
+        body = kwargs["data"]
+        if urlsplit(url).scheme == "http":
+            return self._sendfile_request(method, url, timeout, body, kwargs.get("headers") or {})
+        if not body.size:
+            return self.session.request(method, url, timeout=timeout, **dict(kwargs, data=b""))
+        with mmap.mmap(body.file_obj.fileno(), body.size, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return self.session.request(method, url, timeout=timeout, **dict(kwargs, data=view))
+
+    def _sendfile_request(self, method: str, url: str, timeout, body: FileBody, headers: dict) -> requests.Response:
+        """
+        Sends a plain HTTP request with `socket.sendfile` on a dedicated connection.
+
+        requests cannot hand its socket to sendfile, so the request is written
+        with http.client and the reply wrapped in a `requests.Response`. Only
+        the `headers` are sent; the connection is not pooled.
+        """
+        parts = urlsplit(url)
+        connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=connect_timeout)
+        try:
+            conn.putrequest(method, (parts.path or "/") + (f"?{parts.query}" if parts.query else ""))
+            for name, value in headers.items():
+                conn.putheader(name, value)
+            conn.putheader("Content-Length", str(body.size))
+            conn.endheaders()
+            conn.sock.settimeout(read_timeout)
+            if body.size:
+                conn.sock.sendfile(body.file_obj, 0, body.size)
+            raw_response = conn.getresponse()
+            response = requests.Response()
+            response.status_code = raw_response.status
+            response.reason = raw_response.reason
+            response.headers = CaseInsensitiveDict(raw_response.getheaders())
+            response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+            response._content = raw_response.read()
+            response._content_consumed = True
+            response.url = url
+            return response
+        except TimeoutError as e:
+            raise requests.exceptions.Timeout(e) from e
+        except (OSError, http.client.HTTPException) as e:
+            raise requests.exceptions.ConnectionError(e) from e
+        finally:
+            conn.close()
+
+    def request(self, method: str, url: str, timeout=None, max_retries: int | None = None,
+                **kwargs) -> requests.Response:
+        """
+        Sends a request through the pooled session, retrying transient failures.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL of the request.
+            timeout: A (connect, read) tuple or number of seconds. Defaults to the client's timeout.
+            max_retries (int | None): Overrides the client's number of retries for this call.
+            **kwargs: Passed to `requests.Session.request`. `data` may be a
+                      `FileBody` to send a file without copying it.
+
+        Returns:
+            requests.Response: The last response received. Retryable status
+                               codes are returned once retries are exhausted.
+
+        Raises:
+            requests.exceptions.RequestException: If the last attempt failed without a response.
+        """
+        retries = self.max_retries if max_retries is None else max_retries
+        for attempt in range(retries + 1):
+            self._wait_for_rate_limit(url)
+            try:
+                if isinstance(kwargs.get("data"), FileBody):
+                    response = self._send_file_body(method, url, timeout or self.timeout, kwargs)
+                else:
+                    response = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt >= retries or not self._rewind_body(kwargs):
+                    raise
+                delay = self._backoff_delay(attempt)
+                print(f"{method} {url} failed: {e}. Retrying in {delay:.2f}s "
+                      f"(attempt {attempt + 1}/{retries + 1}).")
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= retries \
+                        or not self._rewind_body(kwargs):
+                    return response
+                delay = self._retry_after_delay(response)
+                if delay is None:
+                    delay = self._backoff_delay(attempt)
+                print(f"{method} {url} returned {response.status_code}. Retrying in {delay:.2f}s "
+                      f"(attempt {attempt + 1}/{retries + 1}).")
+                response.close()
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Sends a GET request. See `request`."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Sends a POST request. See `request`."""
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        """Closes all pooled connections."""
+        self.session.close()
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+def get_default_client() -> ApiClient:
+    """Returns the process-wide ApiClient, creating it on first use."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = ApiClient()
+        return _default_client
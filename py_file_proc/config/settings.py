@@ -22,15 +22,133 @@ DB_USER = os.getenv("DB_USER", "default_db_user")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "default_db_password")
 DB_PORT = os.getenv("DB_PORT", "5432")
 
+# --- Database Connection Pool ---
+# Connections are shared through database/connection_pool.py.
+DB_POOL_MIN_CONNECTIONS = int(os.getenv("DB_POOL_MIN_CONNECTIONS", "1"))
+DB_POOL_MAX_CONNECTIONS = int(os.getenv("DB_POOL_MAX_CONNECTIONS", "10"))
+# Seconds after which a pooled connection is closed and replaced.
+DB_POOL_MAX_LIFETIME = int(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))
+# Connections idle for longer than this many seconds are checked with "SELECT 1" before reuse.
+DB_POOL_HEALTH_CHECK_INTERVAL = int(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", "30"))
+# Seconds to wait for a free connection when the pool is exhausted.
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# Number of rows pulled per round trip by the server-side (streaming) cursor.
+# This bounds the memory used while streaming large result sets.
+DB_FETCH_BATCH_SIZE = int(os.getenv("DB_FETCH_BATCH_SIZE", "10000"))
+# Number of concurrent partitions used by partitioned extraction.
+DB_PARTITION_COUNT = int(os.getenv("DB_PARTITION_COUNT", "4"))
+# Batches each partition may buffer ahead of the consumer.
+DB_PARTITION_QUEUE_BATCHES = int(os.getenv("DB_PARTITION_QUEUE_BATCHES", "4"))
+
+# --- CSV Loader Configuration ---
+# Bytes read from the CSV file per chunk sent to COPY ... FROM STDIN.
+CSV_LOAD_CHUNK_SIZE = int(os.getenv("CSV_LOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+# Rows per batch when loading through execute_values.
+CSV_LOAD_BATCH_SIZE = int(os.getenv("CSV_LOAD_BATCH_SIZE", "10000"))
+# Rows read from the start of a CSV file to infer the table schema.
+CSV_INFERENCE_SAMPLE_ROWS = int(os.getenv("CSV_INFERENCE_SAMPLE_ROWS", "10000"))
+# Worker processes used by the "parallel" load method, each COPYing one byte range of the file.
+CSV_PARALLEL_WORKERS = int(os.getenv("CSV_PARALLEL_WORKERS", str(os.cpu_count() or 1)))
+# Load CSV files with the column types registered per table instead of inferring them on every run.
+CSV_SCHEMA_REGISTRY_ENABLED = os.getenv("CSV_SCHEMA_REGISTRY_ENABLED", "false").lower() == "true"
+# Directory of the registered schemas, one "<table>.json" file per table.
+CSV_SCHEMA_REGISTRY_DIRECTORY = os.getenv("CSV_SCHEMA_REGISTRY_DIRECTORY", "schemas")
+# Comma-separated SQL columns identifying a row for the "merge" load method and for
+# reloading changed files in csv_ingest.ingest_csv_files, e.g. "id".
+CSV_MERGE_KEY = os.getenv("CSV_MERGE_KEY", "")
+
+# --- CSV Directory Ingestion (database/csv_ingest.py) ---
+# Maximum number of files loaded into staging tables at once.
+CSV_INGEST_MAX_WORKERS = int(os.getenv("CSV_INGEST_MAX_WORKERS", str(os.cpu_count() or 1)))
+# JSON manifest of loaded files, used to skip them on reruns.
+CSV_INGEST_MANIFEST_FILE = os.getenv("CSV_INGEST_MANIFEST_FILE", os.path.join("state", "csv_ingest_manifest.json"))
+
 # --- API Configuration ---
 # Load API settings.
 API_ENDPOINT = os.getenv("API_ENDPOINT", "https://api.example.com/upload")
 API_KEY = os.getenv("API_KEY", "your_api_key_if_needed")
+# Upload mode used by api_sender.upload_file_to_api: "multipart", "stream", "raw" or "chunked".
+UPLOAD_MODE = os.getenv("UPLOAD_MODE", "multipart")
+# Bytes per request for chunked (resumable) uploads.
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+# Retries per chunk for chunked uploads.
+UPLOAD_CHUNK_RETRIES = int(os.getenv("UPLOAD_CHUNK_RETRIES", "3"))
+# Uploads running at once, e.g. for the part files of a sharded export.
+UPLOAD_MAX_WORKERS = int(os.getenv("UPLOAD_MAX_WORKERS", "4"))
+# Journal of completed batch uploads (api_sender.upload_files), used to resume interrupted batches.
+UPLOAD_JOURNAL_FILE = os.getenv("UPLOAD_JOURNAL_FILE", os.path.join("state", "upload_journal.jsonl"))
+
+# --- HTTP Client Configuration (api_client/http_client.py) ---
+# Keep-alive connections pooled per host.
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "10"))
+# Retries for connection errors, timeouts, 429 and 5xx responses.
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "3"))
+# Base delay and cap in seconds of the exponential backoff (also caps Retry-After).
+API_BACKOFF_FACTOR = float(os.getenv("API_BACKOFF_FACTOR", "0.5"))
+API_MAX_BACKOFF = float(os.getenv("API_MAX_BACKOFF", "60"))
+# Default connect and read timeouts in seconds.
+API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "10"))
+API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "300"))
+# Maximum requests per second to each host (retries included); 0 for no limit.
+API_RATE_LIMIT = float(os.getenv("API_RATE_LIMIT", "0"))
+
+# --- Async Pipeline Configuration (pipeline/async_runner.py) ---
+# "sync" runs main.run_data_pipeline stage by stage; "async" overlaps
+# extraction, serialization and upload with pipeline.async_runner.
+PIPELINE_ENGINE = os.getenv("PIPELINE_ENGINE", "sync")
+# Capacity of each queue between pipeline stages, in batches.
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))
+# When true, main.run_data_pipeline streams the rows straight into the upload
+# request body (api_sender.stream_rows_to_api) instead of writing a file first.
+PIPELINE_DIRECT_UPLOAD = os.getenv("PIPELINE_DIRECT_UPLOAD", "false").lower() == "true"
+# Also write the streamed body to OUTPUT_FILE_DIRECTORY, for auditing.
+PIPELINE_DIRECT_UPLOAD_TEE = os.getenv("PIPELINE_DIRECT_UPLOAD_TEE", "false").lower() == "true"
+
+# --- Job Runner Configuration (pipeline/job_runner.py) ---
+# Optional JSON/YAML manifest of export jobs; when set, main.py runs every job in it.
+JOB_MANIFEST_PATH = os.getenv("JOB_MANIFEST_PATH", "")
+# Maximum number of jobs running at once.
+JOB_MAX_WORKERS = int(os.getenv("JOB_MAX_WORKERS", str(os.cpu_count() or 1)))
+# "process" runs each job in its own worker process, "thread" shares one process.
+JOB_EXECUTOR = os.getenv("JOB_EXECUTOR", "process")
 
 # --- File Configuration ---
 # Load file output settings.
 OUTPUT_FILE_DIRECTORY = os.getenv("OUTPUT_FILE_DIRECTORY", "output_files")
 OUTPUT_FILE_NAME = os.getenv("OUTPUT_FILE_NAME", "data_export.csv")
+# JSON file holding the high-water mark of each incremental export. Mount it
+# on a persistent volume when running in a container.
+WATERMARK_STATE_FILE = os.getenv("WATERMARK_STATE_FILE", os.path.join("state", "watermarks.json"))
+# Number of characters the file writers buffer in memory between writes to disk.
+OUTPUT_FLUSH_SIZE = int(os.getenv("OUTPUT_FLUSH_SIZE", str(1024 * 1024)))
+# Compression of output files: unset for none, "gzip", or "zstd" (needs the zstandard package).
+OUTPUT_COMPRESSION = os.getenv("OUTPUT_COMPRESSION") or None
+# Compression level; unset uses the codec default (gzip 6, zstd 3).
+OUTPUT_COMPRESSION_LEVEL = int(os.getenv("OUTPUT_COMPRESSION_LEVEL")) if os.getenv("OUTPUT_COMPRESSION_LEVEL") else None
+# zstd compression threads: 0 compresses in the writing thread, -1 uses all CPUs.
+OUTPUT_COMPRESSION_THREADS = int(os.getenv("OUTPUT_COMPRESSION_THREADS", "0"))
+# Rows per Parquet row group (also per Arrow record batch built from dict rows).
+PARQUET_ROW_GROUP_SIZE = int(os.getenv("PARQUET_ROW_GROUP_SIZE", str(128 * 1024)))
+# Codec used inside Parquet/Arrow files: "zstd", "lz4" or "none" for both; "snappy" and "gzip" work
+# for Parquet only (an Arrow export with them fails).
+COLUMNAR_COMPRESSION = os.getenv("COLUMNAR_COMPRESSION", "zstd")
+# Limits of each part file written by file_operations.create_sharded_files (0 for no limit).
+# When either is set, run_data_pipeline writes part files and uploads them as they are closed.
+OUTPUT_PART_MAX_ROWS = int(os.getenv("OUTPUT_PART_MAX_ROWS", "0"))
+OUTPUT_PART_MAX_BYTES = int(os.getenv("OUTPUT_PART_MAX_BYTES", "0"))
+# XML template used by file_operations.create_xml_file_from_template,
+# resolved relative to the file_handler package.
+XML_TEMPLATE_FILE_NAME = os.getenv("XML_TEMPLATE_FILE_NAME", "xml_template.xml")
+
+# --- Export Cache Configuration (file_handler/export_cache.py) ---
+# When enabled, an export whose rows, format and template are unchanged reuses
+# the cached file and skips uploading it again to the same endpoint.
+EXPORT_CACHE_ENABLED = os.getenv("EXPORT_CACHE_ENABLED", "false").lower() == "true"
+EXPORT_CACHE_DIRECTORY = os.getenv("EXPORT_CACHE_DIRECTORY", os.path.join("cache", "exports"))
+# Eviction limits: total size of cached files in bytes and maximum entry age in seconds.
+EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+EXPORT_CACHE_MAX_AGE = int(os.getenv("EXPORT_CACHE_MAX_AGE", str(7 * 24 * 3600)))
 
 # --- Application-wide settings ---
 # You can also have a general setting for the environment name
@@ -0,0 +1,182 @@
+# your_project_name/database/connection_pool.py
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+from psycopg2 import Error
+from psycopg2.pool import ThreadedConnectionPool
+from your_project_name.config import settings
+
+# The pool is created lazily on first use and shared by every DB path in the
+# package. It is keyed by process id so that forked workers never reuse the
+# sockets of their parent process.
+_pool = None
+_pool_pid = None
+_pool_slots = None
+_pool_lock = threading.Lock()
+
+# Bookkeeping per pooled connection, keyed by id(conn)
+_created_at = {}
+_last_used_at = {}
+
+def _create_pool() -> ThreadedConnectionPool:
+    """Creates a new connection pool from the database settings."""
+    return ThreadedConnectionPool(
+        settings.DB_POOL_MIN_CONNECTIONS,
+        settings.DB_POOL_MAX_CONNECTIONS,
+        host=settings.DB_HOST,
+        database=settings.DB_NAME,
+        user=settings.DB_USER,
+        password=settings.DB_PASSWORD,
+        port=settings.DB_PORT
+    )
+
+def get_pool() -> ThreadedConnectionPool:
+    """
+    Returns the shared connection pool, creating it on first use.
+
+    Raises:
+        psycopg2.Error: If the initial connections cannot be established.
+    """
+    global _pool, _pool_pid, _pool_slots
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            # After a fork the inherited pool belongs to the parent; drop it without closing
+            _created_at.clear()
+            _last_used_at.clear()
+            _pool = _create_pool()
+            _pool_pid = os.getpid()
+            _pool_slots = threading.BoundedSemaphore(settings.DB_POOL_MAX_CONNECTIONS)
+            print(f"Database connection pool created "
+                  f"({settings.DB_POOL_MIN_CONNECTIONS}-{settings.DB_POOL_MAX_CONNECTIONS} connections).")
+        return _pool
+
+def _is_expired(conn) -> bool:
+    """Checks whether a connection has exceeded DB_POOL_MAX_LIFETIME."""
+    created_at = _created_at.setdefault(id(conn), time.monotonic())
+    return time.monotonic() - created_at > settings.DB_POOL_MAX_LIFETIME
+
+def _is_healthy(conn) -> bool:
+    """
+    Checks that a connection is still usable.
+
+    Connections that were idle for less than DB_POOL_HEALTH_CHECK_INTERVAL
+    seconds are trusted without a round trip to the server.
+    """
+    if conn.closed:
+        return False
+    last_used_at = _last_used_at.get(id(conn))
+    if last_used_at is None or time.monotonic() - last_used_at < settings.DB_POOL_HEALTH_CHECK_INTERVAL:
+        return True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except Error as e:
+        print(f"Discarding unhealthy pooled connection: {e}")
+        return False
+
+def _discard(pool, conn):
+    """Closes a pooled connection and removes it from the pool."""
+    _created_at.pop(id(conn), None)
+    _last_used_at.pop(id(conn), None)
+    pool.putconn(conn, close=True)
+
+def acquire_connection():
+    """
+    Checks out a healthy connection from the shared pool.
+
+    Blocks for up to DB_POOL_TIMEOUT seconds when all connections are in use.
+    Every connection returned by this function must be given back with
+    `release_connection`; prefer the `get_connection` context manager.
+
+    Returns:
+        connection | None: A psycopg2 connection, or None if no connection could be obtained.
+    """
+    try:
+        pool = get_pool()
+    except Error as e:
+        print(f"Error connecting to PostgreSQL database: {e}")
+        return None
+
+    if not _pool_slots.acquire(timeout=settings.DB_POOL_TIMEOUT):
+        print(f"Timed out after {settings.DB_POOL_TIMEOUT}s waiting for a pooled database connection.")
+        return None
+
+    try:
+        while True:
+            conn = pool.getconn()
+            if id(conn) not in _created_at:
+                # A connection the pool has just opened needs no further checks
+                _created_at[id(conn)] = time.monotonic()
+                return conn
+            if _is_expired(conn) or not _is_healthy(conn):
+                _discard(pool, conn)
+                continue
+            return conn
+    except Error as e:
+        _pool_slots.release()
+        print(f"Error connecting to PostgreSQL database: {e}")
+        return None
+
+def release_connection(conn):
+    """
+    Returns a connection obtained from `acquire_connection` to the pool.
+
+    Any open transaction is rolled back and closed connections are dropped by
+    the pool. Connections that have exceeded DB_POOL_MAX_LIFETIME are closed
+    instead of being reused.
+    """
+    pool = _pool
+    try:
+        if pool is None or _pool_pid != os.getpid():
+            conn.close()
+        elif _is_expired(conn):
+            _discard(pool, conn)
+        else:
+            _last_used_at[id(conn)] = time.monotonic()
+            pool.putconn(conn)
+    finally:
+        if pool is not None and _pool_pid == os.getpid():
+            _pool_slots.release()
+
+@contextmanager
+def get_connection():
+    """
+    Context manager that checks out a pooled connection and returns it on exit.
+
+    Example:
+        with get_connection() as conn:
+            if conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+
+    Yields:
+        connection | None: A psycopg2 connection, or None if no connection could be obtained.
+    """
+    conn = acquire_connection()
+    try:
+        yield conn
+    finally:
+        if conn is not None:
+            release_connection(conn)
+
+def close_pool():
+    """
+    Closes all pooled connections. The pool is re-created on next use.
+
+    Call this only when no connections are checked out, e.g. at process exit.
+    """
+    global _pool, _pool_pid, _pool_slots
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+            print("Database connection pool closed.")
+        _pool = None
+        _pool_pid = None
+        _pool_slots = None
+        _created_at.clear()
+        _last_used_at.clear()
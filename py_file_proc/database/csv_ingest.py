@@ -0,0 +1,272 @@
+# your_project_name/database/csv_ingest.py
+
+import csv
+import glob
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import psycopg2
+from your_project_name.config import settings
+from your_project_name.database import connection_pool, schema_registry
+from your_project_name.database.csv_read_and_load_into_db import (
+    copy_csv_into_table,
+    create_table_if_not_exists,
+    infer_sql_columns,
+    merge_staged_rows,
+    read_csv_sample,
+    resolve_csv_schema,
+    sanitize_column_name,
+)
+from your_project_name.file_handler.state_files import locked_file, read_json_state, write_json_atomic
+
+def discover_csv_files(source: str) -> list:
+    """
+    Returns the CSV files to ingest, sorted by path.
+
+    Args:
+        source (str): A directory, whose "*.csv" files are ingested, or a glob
+                      pattern such as "drops/2024-*/partner_*.csv".
+    """
+    pattern = os.path.join(source, "*.csv") if os.path.isdir(source) else source
+    return sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+
+def file_fingerprint(file_path: str, chunk_size: int = settings.CSV_LOAD_CHUNK_SIZE) -> str:
+    """Returns the SHA-256 hex digest of a file's content, read in `chunk_size` byte chunks."""
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def _manifest_key(table_name: str, file_path: str) -> str:
+    """Returns the manifest entry key of a file loaded into a table."""
+    return f"{table_name}:{os.path.abspath(file_path)}"
+
+def staging_table_name(table_name: str, file_path: str, fingerprint: str) -> str:
+    """
+    Returns the staging table for a file.
+
+    The name is derived from the file's path and content: a rerun after a
+    crash replaces the leftover staging table instead of adding another one,
+    and files with identical content (e.g. header-only drops) never share one.
+    """
+    digest = hashlib.sha256(f"{os.path.abspath(file_path)}:{fingerprint}".encode("utf-8")).hexdigest()
+    return f"{table_name}_staging_{digest[:16]}"
+
+def _read_header(file_path: str) -> list:
+    """Returns the sanitized column names from a CSV file's header row."""
+    with open(file_path, 'r', newline='', encoding='utf-8') as f:
+        return [sanitize_column_name(col) for col in next(csv.reader(f), [])]
+
+def load_file_into_staging(file_path: str, db_config: dict | None, table_name: str, staging_table: str,
+                           columns: list | None = None) -> dict:
+    """
+    Loads one CSV file into its own staging table with COPY. Runs in a worker process.
+
+    The file's columns are loaded into `columns`, in file order, which default
+    to the sanitized header names.
+
+    Each call uses its own connection: a new one from `db_config`, or one from
+    the worker process's own pool when `db_config` is None. The staging table
+    is an UNLOGGED copy of the target's columns, so the bulk load skips the WAL
+    and takes no locks on the target table.
+
+    Returns:
+        dict: The "file_path", "staging_table", "columns", number of "rows"
+              and an "error" message if the load failed.
+    """
+    result = {"file_path": file_path, "staging_table": staging_table, "columns": [], "rows": 0, "error": None}
+    conn = None
+    try:
+        result["columns"] = columns or _read_header(file_path)
+        conn = connection_pool.acquire_connection() if db_config is None else psycopg2.connect(**db_config)
+        if conn is None:
+            result["error"] = "No database connection available."
+            return result
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {staging_table}")
+            cur.execute(f"CREATE UNLOGGED TABLE {staging_table} (LIKE {table_name} INCLUDING DEFAULTS)")
+            result["rows"] = copy_csv_into_table(cur, file_path, staging_table, result["columns"])
+        conn.commit()
+    except (OSError, psycopg2.Error) as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        if conn:
+            conn.rollback()
+    finally:
+        if conn:
+            if db_config is None:
+                connection_pool.release_connection(conn)
+            else:
+                conn.close()
+    return result
+
+def merge_staging_tables(cursor, table_name: str, loads: list, merge_key: list | None = None) -> int:
+    """
+    Moves the staged rows into the target table and drops the staging tables.
+
+    Every file is merged with one set-based `INSERT ... SELECT`, or upserted on
+    `merge_key` with `merge_staged_rows` if one is given, and the caller
+    commits them together, so the target never contains part of a batch.
+
+    Returns:
+        int: The number of rows inserted or updated.
+    """
+    merged_rows = 0
+    for load in loads:
+        if merge_key:
+            counts = merge_staged_rows(cursor, table_name, load["staging_table"], load["columns"], merge_key)
+            merged_rows += counts["inserted"] + counts["updated"]
+        else:
+            column_names = ", ".join(load["columns"])
+            cursor.execute(f"INSERT INTO {table_name} ({column_names}) "
+                           f"SELECT {column_names} FROM {load['staging_table']}")
+            merged_rows += cursor.rowcount
+        cursor.execute(f"DROP TABLE {load['staging_table']}")
+    return merged_rows
+
+def ingest_csv_files(source: str, db_config: dict | None, table_name: str,
+                     max_workers: int = settings.CSV_INGEST_MAX_WORKERS,
+                     manifest_file: str = settings.CSV_INGEST_MANIFEST_FILE,
+                     use_schema_registry: bool = settings.CSV_SCHEMA_REGISTRY_ENABLED,
+                     merge_key: list | None = None) -> dict | None:
+    """
+    Loads every CSV file of a directory or glob pattern into one table, in parallel.
+
+    Files are COPYed into per-file staging tables by a process pool, then
+    merged into `table_name` in a single transaction. Loaded files are
+    recorded in the manifest with their content hash, so reruns skip files
+    that were already loaded. A file that fails to load is reported and left
+    out of the merge; it is retried on the next run.
+
+    Appending a file whose content changed since it was loaded would
+    duplicate the rows of its previous version, so changed files are only
+    reloaded with a `merge_key`: every file is then upserted on the key (see
+    `merge_staged_rows`). Rows removed from a file are not deleted. Without a
+    key, changed files are reported in "changed" and left as they were. With `use_schema_registry`, the target is created
+    from the table's registered schema and files whose header does not match
+    it are reported as failed without being loaded.
+
+    Args:
+        source (str): A directory or glob pattern (see `discover_csv_files`).
+        db_config (dict | None): Keyword arguments for `psycopg2.connect`, or None
+                                 to use the shared pool configured in `settings`.
+        table_name (str): The target table. It is created from the first file if it doesn't exist.
+        max_workers (int): The maximum number of files loaded at once.
+        manifest_file (str): The path of the JSON manifest of loaded files.
+        use_schema_registry (bool): Use the schema registry (see `resolve_csv_schema`).
+        merge_key (list | None): The SQL columns identifying a row. Defaults to CSV_MERGE_KEY.
+                                 A new target table gets a unique constraint on them.
+
+    Returns:
+        dict | None: The "loaded", "skipped", "changed" and "failed" file paths
+                     and the number of "rows" inserted or updated, or None if
+                     the merge failed.
+    """
+    summary = {"loaded": [], "skipped": [], "changed": [], "failed": [], "rows": 0}
+    merge_key = merge_key or [col.strip() for col in settings.CSV_MERGE_KEY.split(",") if col.strip()]
+    started_at = time.perf_counter()
+    with locked_file(manifest_file):
+        manifest = read_json_state(manifest_file)
+
+    pending = []
+    for file_path in discover_csv_files(source):
+        fingerprint = file_fingerprint(file_path)
+        loaded_sha256 = manifest.get(_manifest_key(table_name, file_path), {}).get("sha256")
+        if loaded_sha256 == fingerprint:
+            summary["skipped"].append(file_path)
+        elif loaded_sha256 and not merge_key:
+            print(f"'{file_path}' changed since it was loaded into '{table_name}'. Appending it again would "
+                  f"duplicate its rows; set a merge key (merge_key or CSV_MERGE_KEY) to upsert it.")
+            summary["changed"].append(file_path)
+        else:
+            pending.append((file_path, fingerprint))
+    print(f"Found {len(pending) + len(summary['skipped'])} CSV files, "
+          f"{len(summary['skipped'])} already loaded into '{table_name}'.")
+    schema = None
+    if use_schema_registry:
+        valid = []
+        for file_path, fingerprint in pending:
+            try:
+                # Registers the schema from the first file if the table has none yet
+                schema = resolve_csv_schema(table_name, file_path)
+                valid.append((file_path, fingerprint))
+            except ValueError as e:
+                print(f"Invalid CSV data: {e}")
+                summary["failed"].append(file_path)
+        pending = valid
+    if not pending:
+        return summary
+
+    conn = None
+    try:
+        conn = connection_pool.acquire_connection() if db_config is None else psycopg2.connect(**db_config)
+        if conn is None:
+            return None
+        cur = conn.cursor()
+        # The staging tables copy the target's columns, so it must exist before the workers start
+        if schema is not None:
+            columns_sql_definition = schema_registry.columns_sql(schema)
+        else:
+            columns_sql_definition = ", ".join(infer_sql_columns(read_csv_sample(pending[0][0])))
+        if merge_key:
+            # ON CONFLICT needs a unique constraint on the key
+            columns_sql_definition += f", UNIQUE ({', '.join(merge_key)})"
+        create_table_if_not_exists(cur, table_name, columns_sql_definition)
+        conn.commit()
+
+        # A registered schema may map headers to SQL names other than the sanitized ones
+        db_columns = [column["name"] for column in schema["columns"]] if schema is not None else None
+        loads = []
+        with ProcessPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as pool:
+            futures = {pool.submit(load_file_into_staging, file_path, db_config, table_name,
+                                   staging_table_name(table_name, file_path, fingerprint), db_columns): fingerprint
+                       for file_path, fingerprint in pending}
+            for future in as_completed(futures):
+                load = future.result()
+                if load["error"]:
+                    print(f"Error loading '{load['file_path']}': {load['error']}")
+                    summary["failed"].append(load["file_path"])
+                else:
+                    load["sha256"] = futures[future]
+                    loads.append(load)
+        loads.sort(key=lambda load: load["file_path"])
+
+        summary["rows"] = merge_staging_tables(cur, table_name, loads, merge_key)
+        conn.commit()
+        cur.close()
+    except psycopg2.Error as e:
+        print(f"Database error: {e}")
+        if conn:
+            conn.rollback()
+            print("Transaction rolled back.")
+        return None
+    finally:
+        if conn:
+            if db_config is None:
+                connection_pool.release_connection(conn)
+            else:
+                conn.close()
+
+    # Recorded only after the merge is committed, so a crash before it reloads the files
+    with locked_file(manifest_file):
+        manifest = read_json_state(manifest_file)
+        for load in loads:
+            manifest[_manifest_key(table_name, load["file_path"])] = {
+                "sha256": load["sha256"],
+                "rows": load["rows"],
+                "loaded_at": datetime.now().isoformat(),
+            }
+        write_json_atomic(manifest_file, manifest)
+    summary["loaded"] = [load["file_path"] for load in loads]
+    summary["failed"].sort()
+    elapsed = max(time.perf_counter() - started_at, 1e-9)
+    print(f"Merged {summary['rows']} rows from {len(loads)} files into '{table_name}' in {elapsed:.2f}s "
+          f"({summary['rows'] / elapsed:,.0f} rows/s).")
+    return summary
+
+if __name__ == "__main__":
+    # Loads every CSV file in the "drops" directory into "partner_data" using the shared pool
+    print(ingest_csv_files("drops", None, "partner_data"))
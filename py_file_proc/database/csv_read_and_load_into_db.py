@@ -1,7 +1,16 @@
 import psycopg2
+from psycopg2.extras import execute_values
 import csv
+import io
 import os
+import time
+import itertools
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
 import pandas as pd # Optional, but often very convenient for CSVs
+from your_project_name.config import settings
+from your_project_name.database import connection_pool, schema_registry
 
 def create_table_if_not_exists(cursor, table_name, columns_sql):
     """
@@ -15,49 +24,516 @@ def create_table_if_not_exists(cursor, table_name, columns_sql):
     cursor.execute(create_table_query)
     print(f"Table '{table_name}' checked/created successfully.")
 
-def load_csv_to_postgres(file_path, db_config, table_name):
+def sanitize_column_name(col_name: str) -> str:
+    """Sanitizes a CSV header name for use as a SQL column name."""
+    return col_name.replace(' ', '_').lower()
+
+def infer_sql_columns(df: pd.DataFrame) -> list:
+    """
+    Infers SQL column definitions from the dtypes of a DataFrame.
+
+    This is a simplified inference. For production, define your schema explicitly.
+
+    Returns:
+        list: Column definitions such as "age INTEGER", in DataFrame column order.
+    """
+    sql_columns = []
+    for col_name, dtype in df.dtypes.items():
+        col_name_sanitized = sanitize_column_name(col_name) # Sanitize column names for SQL
+        if pd.api.types.is_integer_dtype(dtype):
+            sql_columns.append(f"{col_name_sanitized} INTEGER")
+        elif pd.api.types.is_float_dtype(dtype):
+            sql_columns.append(f"{col_name_sanitized} NUMERIC")
+        elif pd.api.types.is_bool_dtype(dtype):
+            sql_columns.append(f"{col_name_sanitized} BOOLEAN")
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            sql_columns.append(f"{col_name_sanitized} TIMESTAMP")
+        else: # Default to TEXT for strings and objects
+            sql_columns.append(f"{col_name_sanitized} TEXT")
+    return sql_columns
+
+def read_csv_sample(file_path: str, sample_rows: int = settings.CSV_INFERENCE_SAMPLE_ROWS) -> pd.DataFrame:
+    """
+    Reads the first `sample_rows` rows of a CSV file for schema inference.
+
+    Columns that are empty throughout the sample are read as text, since
+    their type cannot be inferred and any value fits a TEXT column.
+    """
+    sample = pd.read_csv(file_path, nrows=sample_rows)
+    for col_name in sample.columns[sample.isna().all()]:
+        sample[col_name] = sample[col_name].astype(object)
+    return sample
+
+def infer_csv_dtypes(sample: pd.DataFrame) -> dict:
+    """
+    Returns `pd.read_csv` dtypes that keep every chunk consistent with the sample.
+
+    Integer columns use the nullable "Int64" dtype, so a chunk with missing
+    values is not turned into floats, and text columns use "string", so a
+    chunk of digits is not read as numbers. A value that does not fit the
+    inferred type makes `read_csv` raise instead of silently changing it.
+    """
+    dtypes = {}
+    for col_name, dtype in sample.dtypes.items():
+        if pd.api.types.is_integer_dtype(dtype):
+            dtypes[col_name] = "Int64"
+        elif pd.api.types.is_float_dtype(dtype):
+            dtypes[col_name] = "float64"
+        elif pd.api.types.is_bool_dtype(dtype):
+            dtypes[col_name] = "boolean"
+        else:
+            dtypes[col_name] = "string"
+    return dtypes
+
+def frame_to_records(df: pd.DataFrame) -> list:
+    """
+    Converts a DataFrame to row tuples of Python values, with None for missing values.
+
+    Nulls are replaced column-wise with `DataFrame.where` instead of testing
+    every cell with `pd.isna` in Python.
+    """
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+def copy_csv_chunks_into_table(cursor, file_path: str, table_name: str, db_columns: list, dtypes: dict,
+                               chunk_rows: int = settings.CSV_LOAD_BATCH_SIZE,
+                               parse_dates: list | None = None) -> int:
+    """
+    Loads a CSV file in chunks of `chunk_rows` rows, parsed and typed by pandas.
+
+    Each chunk is read with the `dtypes` inferred from the sample or the
+    registered schema (and `parse_dates`), so types are coerced in vectorized form and stay the same across chunks. The chunk
+    is re-encoded as CSV in memory and sent with `COPY ... FROM STDIN`, so no
+    Python code runs per row or cell and memory is bounded by one chunk.
+
+    Returns:
+        int: The number of rows copied.
+    """
+    copy_query = f"COPY {table_name} ({', '.join(db_columns)}) FROM STDIN WITH (FORMAT csv)"
+    total_rows = 0
+    for chunk in pd.read_csv(file_path, chunksize=chunk_rows, dtype=dtypes, parse_dates=parse_dates or False):
+        buffer = io.StringIO()
+        chunk.to_csv(buffer, header=False, index=False) # Missing values become unquoted empty fields (NULL)
+        buffer.seek(0)
+        cursor.copy_expert(copy_query, buffer)
+        total_rows += len(chunk)
+    return total_rows
+
+def copy_csv_into_table(cursor, file_path: str, table_name: str, db_columns: list,
+                        chunk_size: int = settings.CSV_LOAD_CHUNK_SIZE) -> int:
+    """
+    Streams a CSV file into a table with `COPY ... FROM STDIN`.
+
+    The file is never parsed in Python: psycopg2 reads it in `chunk_size`
+    byte chunks and forwards them to the server in a single COPY operation.
+    Unquoted empty fields are loaded as NULL.
+
+    Returns:
+        int: The number of rows copied.
+    """
+    copy_query = (
+        f"COPY {table_name} ({', '.join(db_columns)}) "
+        "FROM STDIN WITH (FORMAT csv, HEADER true)"
+    )
+    with open(file_path, 'r', newline='', encoding='utf-8') as f:
+        cursor.copy_expert(copy_query, f, size=chunk_size)
+    return cursor.rowcount
+
+def _count_quotes(mapped, start: int, end: int, step: int = settings.CSV_LOAD_CHUNK_SIZE) -> int:
+    """Counts the double quotes in mapped[start:end], copying at most `step` bytes at a time."""
+    return sum(mapped[offset:min(offset + step, end)].count(b'"') for offset in range(start, end, step))
+
+def _next_record_boundary(mapped, position: int, quoted: bool) -> int:
+    """
+    Returns the offset just past the first newline at or after `position` that ends a record.
+
+    `quoted` tells whether `position` lies inside a quoted field. A newline
+    only ends a record when an even number of quotes precedes it, since
+    escaped quotes ("") come in pairs and quoted newlines are skipped.
+    """
+    while position < len(mapped):
+        newline = mapped.find(b"\n", position)
+        if newline == -1:
+            break
+        quoted ^= _count_quotes(mapped, position, newline) % 2 == 1
+        if not quoted:
+            return newline + 1
+        position = newline + 1
+    return len(mapped)
+
+def split_csv_byte_ranges(file_path: str, range_count: int) -> tuple:
+    """
+    Splits a CSV file into up to `range_count` byte ranges of whole records.
+
+    The file is memory-mapped and each split point is moved forward to the
+    next record boundary, so quoted fields containing newlines are never cut.
+    Finding the boundaries needs one sequential pass counting quotes (at
+    memchr speed, without parsing); the header row is excluded from the ranges.
+
+    Returns:
+        tuple: The header bytes and a list of (start, end) byte offsets.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b"", []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            data_start = _next_record_boundary(mapped, 0, False)
+            header = mapped[:data_start]
+            target_size = max(1, -(-(len(mapped) - data_start) // max(1, range_count)))
+            ranges = []
+            start = data_start
+            while start < len(mapped):
+                target = min(start + target_size, len(mapped))
+                quoted = _count_quotes(mapped, start, target) % 2 == 1
+                end = len(mapped) if target == len(mapped) else _next_record_boundary(mapped, target, quoted)
+                ranges.append((start, end))
+                start = end
+    return header, ranges
+
+class MappedRangeReader:
+    """
+    A read-only file object over a byte range of a memory-mapped file.
+
+    `cursor.copy_expert` reads it in chunks, so the range is sent to the
+    server straight from the page cache without being loaded into memory.
+    """
+
+    def __init__(self, mapped, start: int, end: int):
+        self.mapped = mapped
+        self.position = start
+        self.end = end
+
+    def read(self, size: int = -1) -> bytes:
+        stop = self.end if size is None or size < 0 else min(self.position + size, self.end)
+        data = self.mapped[self.position:stop]
+        self.position = stop
+        return data
+
+    def readline(self, size: int = -1) -> bytes:
+        newline = self.mapped.find(b"\n", self.position, self.end)
+        stop = self.end if newline == -1 else newline + 1
+        if size is not None and size >= 0:
+            stop = min(stop, self.position + size)
+        data = self.mapped[self.position:stop]
+        self.position = stop
+        return data
+
+def copy_csv_byte_range(file_path: str, start: int, end: int, db_config: dict | None, table_name: str,
+                        db_columns: list, chunk_size: int = settings.CSV_LOAD_CHUNK_SIZE) -> dict:
+    """
+    COPYs one byte range of a CSV file into a table. Runs in a worker process.
+
+    The worker maps the file itself and commits its range on its own connection
+    (a new one from `db_config`, or one from the worker's pool when it is None).
+
+    Returns:
+        dict: The "start" offset, "bytes" and "rows" loaded, the "elapsed"
+              seconds and an "error" message if the range failed.
+    """
+    result = {"start": start, "bytes": end - start, "rows": 0, "elapsed": 0.0, "error": None}
+    started_at = time.perf_counter()
+    conn = None
+    try:
+        conn = connection_pool.acquire_connection() if db_config is None else psycopg2.connect(**db_config)
+        if conn is None:
+            result["error"] = "No database connection available."
+            return result
+        copy_query = f"COPY {table_name} ({', '.join(db_columns)}) FROM STDIN WITH (FORMAT csv)"
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with conn.cursor() as cur:
+                cur.copy_expert(copy_query, MappedRangeReader(mapped, start, end), size=chunk_size)
+                result["rows"] = cur.rowcount
+        conn.commit()
+    except (OSError, psycopg2.Error) as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        if conn:
+            conn.rollback()
+    finally:
+        if conn:
+            if db_config is None:
+                connection_pool.release_connection(conn)
+            else:
+                conn.close()
+    result["elapsed"] = time.perf_counter() - started_at
+    return result
+
+def copy_csv_in_parallel(file_path: str, db_config: dict | None, table_name: str, db_columns: list,
+                         workers: int = settings.CSV_PARALLEL_WORKERS,
+                         chunk_size: int = settings.CSV_LOAD_CHUNK_SIZE) -> int | None:
+    """
+    Loads a large CSV file by COPYing byte ranges of it from `workers` processes.
+
+    Parsing happens on the server, one backend per range, so the load scales
+    with the cores of both machines instead of being bound to one Python process.
+    Every range commits separately: if one fails, the others stay loaded and
+    None is returned, so load into an empty or staging table when that matters.
+
+    Returns:
+        int | None: The number of rows loaded, or None if any range failed.
+    """
+    _, ranges = split_csv_byte_ranges(file_path, workers)
+    if not ranges:
+        return 0
+    with ProcessPoolExecutor(max_workers=min(max(1, workers), len(ranges))) as pool:
+        futures = [pool.submit(copy_csv_byte_range, file_path, start, end, db_config, table_name,
+                               db_columns, chunk_size) for start, end in ranges]
+        results = [future.result() for future in futures]
+    failed = False
+    for index, result in enumerate(results):
+        if result["error"]:
+            print(f"Worker {index} failed at byte {result['start']}: {result['error']}")
+            failed = True
+            continue
+        elapsed = max(result["elapsed"], 1e-9)
+        print(f"Worker {index}: {result['rows']} rows, {result['bytes'] / 1024 / 1024:.1f} MiB in {elapsed:.2f}s "
+              f"({result['rows'] / elapsed:,.0f} rows/s, {result['bytes'] / 1024 / 1024 / elapsed:.1f} MiB/s).")
+    return None if failed else sum(result["rows"] for result in results)
+
+def insert_csv_with_execute_values(cursor, file_path: str, table_name: str, db_columns: list,
+                                   transform: Callable[[tuple], tuple] | None = None,
+                                   batch_size: int = settings.CSV_LOAD_BATCH_SIZE) -> int:
+    """
+    Loads a CSV file with batched multi-row INSERTs via `execute_values`.
+
+    This is the fallback for rows that must be transformed in Python before
+    loading. The file is read in batches of `batch_size` rows, so memory is
+    bounded by one batch. Empty fields are passed to `transform` as None.
+
+    Returns:
+        int: The number of rows inserted.
+    """
+    insert_query = f"INSERT INTO {table_name} ({', '.join(db_columns)}) VALUES %s"
+    total_rows = 0
+    with open(file_path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None) # Skip header row
+        while True:
+            batch = [tuple(None if value == '' else value for value in row)
+                     for row in itertools.islice(reader, batch_size)]
+            if not batch:
+                break
+            if transform:
+                batch = [transform(row) for row in batch]
+            execute_values(cursor, insert_query, batch, page_size=batch_size)
+            total_rows += len(batch)
+    return total_rows
+
+def merge_staged_rows(cursor, table_name: str, staging_table: str, db_columns: list, merge_key: list) -> dict:
+    """
+    Upserts the rows of a staging table into a table with one `INSERT ... ON CONFLICT` statement.
+
+    Rows whose key is new are inserted, and existing rows are only updated
+    when a value differs, so re-running a file leaves the table unchanged.
+    If the file repeats a key, its last row wins. The target needs a unique
+    constraint or index on `merge_key`.
+
+    Returns:
+        dict: The number of rows "inserted", "updated" and "unchanged".
+    """
+    key_names = ", ".join(merge_key)
+    column_names = ", ".join(db_columns)
+    update_columns = [col for col in db_columns if col not in merge_key]
+    if update_columns:
+        conflict_action = (
+            f"DO UPDATE SET {', '.join(f'{col} = EXCLUDED.{col}' for col in update_columns)} "
+            f"WHERE ({', '.join(f'{table_name}.{col}' for col in update_columns)}) "
+            f"IS DISTINCT FROM ({', '.join(f'EXCLUDED.{col}' for col in update_columns)})"
+        )
+    else:
+        conflict_action = "DO NOTHING"
+    # xmax is 0 only for freshly inserted row versions; unchanged rows are not returned at all
+    cursor.execute(f"""
+    WITH source AS (
+        SELECT DISTINCT ON ({key_names}) {column_names} FROM {staging_table} ORDER BY {key_names}, ctid DESC
+    ), merged AS (
+        INSERT INTO {table_name} ({column_names}) SELECT {column_names} FROM source
+        ON CONFLICT ({key_names}) {conflict_action}
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT (SELECT count(*) FROM source),
+           count(*) FILTER (WHERE inserted),
+           count(*) FILTER (WHERE NOT inserted)
+    FROM merged
+    """)
+    source_rows, inserted, updated = cursor.fetchone()
+    return {"inserted": inserted, "updated": updated, "unchanged": source_rows - inserted - updated}
+
+def resolve_csv_schema(table_name: str, file_path: str, registry_dir: str | None = None) -> dict:
+    """
+    Returns the registered schema of a table, checked against the file's header.
+
+    A table without a registered schema has one inferred from a sample of the
+    file and registered, so later runs reuse it instead of inferring again and
+    every file of the table is parsed with the same types.
+
+    Raises:
+        ValueError: If the file's header does not match the registered schema.
+    """
+    schema = schema_registry.load_schema(table_name, registry_dir)
+    if schema is None:
+        sample = read_csv_sample(file_path)
+        schema = schema_registry.schema_from_columns(list(sample.columns), infer_sql_columns(sample))
+        schema_registry.register_schema(table_name, schema, registry_dir)
+    else:
+        schema_registry.validate_header(schema, schema_registry.read_csv_header(file_path), file_path)
+    return schema
+
+def _report_throughput(method: str, row_count: int, started_at: float):
+    """Prints the number of loaded rows and the load rate."""
+    elapsed = max(time.perf_counter() - started_at, 1e-9)
+    print(f"Loaded {row_count} rows using {method} in {elapsed:.2f}s ({row_count / elapsed:,.0f} rows/s).")
+
+def load_csv_to_postgres(file_path, db_config, table_name, method: str = "insert",
+                         transform: Callable[[tuple], tuple] | None = None,
+                         chunk_size: int = settings.CSV_LOAD_CHUNK_SIZE,
+                         batch_size: int = settings.CSV_LOAD_BATCH_SIZE,
+                         workers: int = settings.CSV_PARALLEL_WORKERS,
+                         use_schema_registry: bool = settings.CSV_SCHEMA_REGISTRY_ENABLED,
+                         merge_key: list | None = None) -> int | None:
     """
     Reads data from a CSV file and loads it into a PostgreSQL table.
+
+    Args:
+        file_path (str): The path to the CSV file.
+        db_config (dict | None): Keyword arguments for `psycopg2.connect`. If None,
+                                 a connection is checked out from the shared
+                                 pool configured in `settings`.
+        table_name (str): The target table. It is created if it doesn't exist.
+        method (str): "insert" reads the whole file with pandas and uses
+                      `executemany`. "copy" streams the file with
+                      `COPY ... FROM STDIN`, or with batched `execute_values`
+                      when `transform` is given. "chunked" parses and types
+                      the file with pandas `batch_size` rows at a time and
+                      COPYs each chunk (see `copy_csv_chunks_into_table`).
+                      "parallel" COPYs byte ranges of the file from `workers`
+                      processes (see `copy_csv_in_parallel`). "merge" COPYs
+                      the file into a temporary staging table and upserts it
+                      on `merge_key` (see `merge_staged_rows`), so reloading
+                      a file does not duplicate rows.
+        transform (Callable | None): A function applied to every row tuple
+                                     before loading ("copy" and "merge" methods only).
+        chunk_size (int): The number of bytes sent per COPY chunk.
+        batch_size (int): The number of rows per `execute_values` batch or pandas chunk.
+        workers (int): The number of worker processes ("parallel" method only).
+        use_schema_registry (bool): Take the table's columns and types from the
+                                    schema registry instead of inferring them
+                                    (see `resolve_csv_schema`). The file is
+                                    parsed with the registered types, and is
+                                    rejected before loading if its header differs.
+        merge_key (list | None): The SQL columns identifying a row ("merge" method
+                                 only). Defaults to CSV_MERGE_KEY. A table created
+                                 by the merge gets a unique constraint on them.
+
+    Returns:
+        int | None: The number of rows loaded, or None if the load failed.
     """
+    if method not in ("insert", "copy", "chunked", "parallel", "merge"):
+        print(f"Unknown load method '{method}'. Expected 'insert', 'copy', 'chunked', 'parallel' or 'merge'.")
+        return None
+    if method == "merge":
+        merge_key = merge_key or [col.strip() for col in settings.CSV_MERGE_KEY.split(",") if col.strip()]
+        if not merge_key:
+            print("The merge method needs a merge key (merge_key or CSV_MERGE_KEY).")
+            return None
+
     conn = None
     try:
+        schema = resolve_csv_schema(table_name, file_path) if use_schema_registry else None
+
         # 1. Connect to PostgreSQL
-        conn = psycopg2.connect(**db_config)
+        if db_config is None:
+            conn = connection_pool.acquire_connection()
+            if conn is None:
+                return None
+        else:
+            conn = psycopg2.connect(**db_config)
         cur = conn.cursor()
         print("Successfully connected to PostgreSQL.")
 
         # --- Option 1: Using pandas (Recommended for structured CSVs) ---
         # Pandas is excellent for handling various CSV quirks (headers, delimiters, missing values)
         print(f"Reading data from '{file_path}' using pandas...")
-        df = pd.read_csv(file_path)
-
-        # Infer SQL columns based on DataFrame dtypes (you might need to adjust this)
-        # This is a simplified inference. For production, define your schema explicitly.
-        sql_columns = []
-        for col_name, dtype in df.dtypes.items():
-            col_name_sanitized = col_name.replace(' ', '_').lower() # Sanitize column names for SQL
-            if pd.api.types.is_integer_dtype(dtype):
-                sql_columns.append(f"{col_name_sanitized} INTEGER")
-            elif pd.api.types.is_float_dtype(dtype):
-                sql_columns.append(f"{col_name_sanitized} NUMERIC")
-            elif pd.api.types.is_bool_dtype(dtype):
-                sql_columns.append(f"{col_name_sanitized} BOOLEAN")
-            elif pd.api.types.is_datetime64_any_dtype(dtype):
-                sql_columns.append(f"{col_name_sanitized} TIMESTAMP")
-            else: # Default to TEXT for strings and objects
-                sql_columns.append(f"{col_name_sanitized} TEXT")
-        columns_sql_definition = ", ".join(sql_columns)
-        db_column_names = ", ".join([col.replace(' ', '_').lower() for col in df.columns])
-        placeholder_string = ", ".join(["%s"] * len(df.columns))
+        if schema is not None:
+            # The registered schema replaces inference, so the file is only read to load it
+            columns_sql_definition = schema_registry.columns_sql(schema)
+            db_columns = [column["name"] for column in schema["columns"]]
+            read_options = schema_registry.read_csv_options(schema)
+            if method == "insert":
+                df = pd.read_csv(file_path, dtype=read_options["dtype"], parse_dates=read_options["parse_dates"])
+        else:
+            if method in ("copy", "chunked", "parallel", "merge"):
+                # Only a sample is needed for the schema; the rows themselves are streamed below
+                df = read_csv_sample(file_path)
+            else:
+                df = pd.read_csv(file_path)
+
+            # Infer SQL columns based on DataFrame dtypes (you might need to adjust this)
+            columns_sql_definition = ", ".join(infer_sql_columns(df))
+            db_columns = [sanitize_column_name(col) for col in df.columns]
+            read_options = {"dtype": infer_csv_dtypes(df), "parse_dates": []}
+        db_column_names = ", ".join(db_columns)
+        placeholder_string = ", ".join(["%s"] * len(db_columns))
+
 
+        if method == "merge":
+            unknown_key_columns = [col for col in merge_key if col not in db_columns]
+            if unknown_key_columns:
+                raise ValueError(f"Merge key column(s) {', '.join(unknown_key_columns)} not found in '{file_path}'.")
+            # ON CONFLICT needs a unique constraint on the key
+            columns_sql_definition += f", UNIQUE ({', '.join(merge_key)})"
 
         # 2. Create table if not exists (based on pandas DataFrame columns)
         # You should define your actual table schema if it's fixed.
         create_table_if_not_exists(cur, table_name, columns_sql_definition)
 
+        started_at = time.perf_counter()
+        if method == "parallel":
+            conn.commit() # The workers' connections must see the table
+            print(f"Copying '{file_path}' into '{table_name}' from {workers} worker processes...")
+            row_count = copy_csv_in_parallel(file_path, db_config, table_name, db_columns, workers, chunk_size)
+            if row_count is not None:
+                _report_throughput("parallel COPY", row_count, started_at)
+            return row_count
+        if method == "chunked":
+            print(f"Copying '{file_path}' into '{table_name}' in chunks of {batch_size} rows...")
+            row_count = copy_csv_chunks_into_table(cur, file_path, table_name, db_columns, read_options["dtype"],
+                                                   batch_size, read_options["parse_dates"])
+            conn.commit() # Commit the transaction
+            _report_throughput("chunked COPY", row_count, started_at)
+            return row_count
+        if method == "merge":
+            # Temporary tables live in their own schema, so the name must not be schema-qualified
+            staging_table = f"{table_name.rsplit('.', 1)[-1]}_merge_staging"
+            # Temporary tables skip the WAL, and this one is dropped with the transaction
+            cur.execute(f"CREATE TEMPORARY TABLE {staging_table} (LIKE {table_name} INCLUDING DEFAULTS) ON COMMIT DROP")
+            print(f"Merging '{file_path}' into '{table_name}' on ({', '.join(merge_key)}) through '{staging_table}'...")
+            if transform:
+                insert_csv_with_execute_values(cur, file_path, staging_table, db_columns, transform, batch_size)
+            else:
+                copy_csv_into_table(cur, file_path, staging_table, db_columns, chunk_size)
+            counts = merge_staged_rows(cur, table_name, staging_table, db_columns, merge_key)
+            conn.commit() # Commit the transaction
+            print(f"Merge result: {counts['inserted']} inserted, {counts['updated']} updated, "
+                  f"{counts['unchanged']} unchanged.")
+            row_count = counts["inserted"] + counts["updated"] + counts["unchanged"]
+            _report_throughput("merge", row_count, started_at)
+            return row_count
+        if method == "copy":
+            if transform:
+                print(f"Inserting rows into '{table_name}' in batches of {batch_size} using execute_values...")
+                row_count = insert_csv_with_execute_values(cur, file_path, table_name, db_columns,
+                                                           transform, batch_size)
+                load_method = "execute_values"
+            else:
+                print(f"Copying rows into '{table_name}' using COPY FROM STDIN...")
+                row_count = copy_csv_into_table(cur, file_path, table_name, db_columns, chunk_size)
+                load_method = "COPY"
+            conn.commit() # Commit the transaction
+            _report_throughput(load_method, row_count, started_at)
+            return row_count
+
         # 3. Prepare data for insertion
         # Convert DataFrame rows to a list of tuples, handling None for NaN
-        data_to_insert = [tuple(None if pd.isna(x) else x for x in row) for row in df.itertuples(index=False)]
+        data_to_insert = frame_to_records(df)
 
         # 4. Insert data into the table
         insert_query = f"INSERT INTO {table_name} ({db_column_names}) VALUES ({placeholder_string})"
@@ -66,6 +542,8 @@ def load_csv_to_postgres(file_path, db_config, table_name):
         cur.executemany(insert_query, data_to_insert)
         conn.commit() # Commit the transaction
         print("Data loaded successfully using pandas and executemany.")
+        _report_throughput("executemany", len(data_to_insert), started_at)
+        return len(data_to_insert)
 
         # --- Option 2: Using csv module directly (more control, less abstraction) ---
         # This is uncommented if you prefer not to use pandas.
@@ -91,6 +569,10 @@ def load_csv_to_postgres(file_path, db_config, table_name):
 
     except FileNotFoundError:
         print(f"Error: The file '{file_path}' was not found.")
+    except ValueError as e:
+        print(f"Invalid CSV data: {e}")
+        if conn:
+            conn.rollback()
     except psycopg2.Error as e:
         print(f"Database error: {e}")
         if conn:
@@ -101,14 +583,21 @@ def load_csv_to_postgres(file_path, db_config, table_name):
     finally:
         if conn:
             cur.close()
-            conn.close()
-            print("PostgreSQL connection closed.")
+            if db_config is None:
+                connection_pool.release_connection(conn)
+                print("PostgreSQL connection returned to the pool.")
+            else:
+                conn.close()
+                print("PostgreSQL connection closed.")
 
 # --- Configuration and Usage ---
 if __name__ == "__main__":
     # --- 1. Database Configuration ---
+    # By default the shared connection pool configured in config/settings is used.
+    # To connect with explicit credentials instead, pass a dict like the one below.
     # !! IMPORTANT: Replace with your actual PostgreSQL credentials and details !!
-    db_config = {
+    db_config = None
+    explicit_db_config = {
         "host": "localhost",
         "database": "your_database_name",
         "user": "your_username",
@@ -136,6 +625,14 @@ if __name__ == "__main__":
     # --- 3. Run the data loading function ---
     print(f"\nAttempting to load '{file_name}' into table '{table_to_load}'...")
     load_csv_to_postgres(file_name, db_config, table_to_load)
+    # For large files, stream the file with COPY instead:
+    # load_csv_to_postgres(file_name, db_config, table_to_load, method="copy")
+    # Or parse and type the file with pandas one chunk at a time:
+    # load_csv_to_postgres(file_name, db_config, table_to_load, method="chunked")
+    # Or, for very large files, COPY byte ranges of the file from several processes:
+    # load_csv_to_postgres(file_name, db_config, table_to_load, method="parallel", workers=8)
+    # To reload a file without duplicating rows, upsert it on a key:
+    # load_csv_to_postgres(file_name, db_config, table_to_load, method="merge", merge_key=["id"])
 
     # You can verify the data in your PostgreSQL client:
     # SELECT * FROM my_data_table;
@@ -1,11 +1,23 @@
 # your_project_name/database/db_connector.py
 
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator
+
 import psycopg2
 from psycopg2 import Error
+from psycopg2.extensions import adapt
 from your_project_name.config import settings
+from your_project_name.database import connection_pool
 
 def get_db_connection():
-    """Establishes and returns a PostgreSQL database connection."""
+    """
+    Establishes and returns a dedicated (non-pooled) PostgreSQL database connection.
+
+    The functions in this package use `connection_pool.get_connection` instead;
+    this is kept for callers that need a connection outside of the pool.
+    """
     try:
         conn = psycopg2.connect(
             host=settings.DB_HOST,
@@ -31,27 +43,410 @@ def fetch_data_from_db(query: str) -> list:
         list: A list of dictionaries, where each dictionary represents a row
               with column names as keys. Returns an empty list on error.
     """
-    conn = None
-    try:
-        conn = get_db_connection()
-        if conn:
-            with conn.cursor() as cur:
-                cur.execute(query)
-                # Get column names from cursor description
-                columns = [desc[0] for desc in cur.description]
-                data = []
-                for row in cur.fetchall():
-                    data.append(dict(zip(columns, row)))
-                print(f"Fetched {len(data)} rows from the database.")
-                return data
+    try:
+        with connection_pool.get_connection() as conn:
+            if conn:
+                with conn.cursor() as cur:
+                    cur.execute(query)
+                    # Get column names from cursor description
+                    columns = [desc[0] for desc in cur.description]
+                    data = []
+                    for row in cur.fetchall():
+                        data.append(dict(zip(columns, row)))
+                    print(f"Fetched {len(data)} rows from the database.")
+                    return data
         return []
     except Error as e:
         print(f"Error fetching data: {e}")
         return []
+
+def iter_raw_batches_from_db(query: str, batch_size: int = settings.DB_FETCH_BATCH_SIZE,
+                             cursor_name: str = "py_file_proc_stream",
+                             require_connection: bool = False) -> Iterator[tuple]:
+    """
+    Streams the result of a query in bounded batches using a server-side cursor.
+
+    A named psycopg2 cursor keeps the result set on the PostgreSQL server and
+    only transfers `batch_size` rows per round trip, so memory stays flat no
+    matter how many rows the query returns. The rows are yielded as psycopg2
+    returns them, together with the cursor description, so consumers that
+    work column-wise (e.g. the Parquet writer) can skip building dictionaries.
+
+    Args:
+        query (str): The SQL query to execute.
+        batch_size (int): The maximum number of rows per batch. Also used as
+                          the cursor's `itersize`.
+        cursor_name (str): The name of the server-side cursor.
+        require_connection (bool): If True, raise instead of yielding nothing
+                                   when no connection can be obtained.
+
+    Yields:
+        tuple: (description, rows) where `description` is the cursor
+               description (column name and type code per column) and `rows`
+               is a list of at most `batch_size` tuples. Nothing is yielded if
+               the connection cannot be established.
+    """
+    conn = connection_pool.acquire_connection()
+    if not conn:
+        if require_connection:
+            raise psycopg2.OperationalError(f"No database connection available for cursor '{cursor_name}'.")
+        return
+    total_rows = 0
+    try:
+        # Named cursors must run inside a transaction, which psycopg2 opens implicitly.
+        with conn.cursor(name=cursor_name) as cur:
+            cur.itersize = batch_size
+            cur.execute(query)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                total_rows += len(rows)
+                # The description of a named cursor is only available after the first fetch
+                yield cur.description, rows
+        print(f"Streamed {total_rows} rows from the database.")
+    except Error as e:
+        # Re-raise so consumers do not mistake a truncated stream for a complete export
+        print(f"Error streaming data after {total_rows} rows: {e}")
+        raise
+    finally:
+        # The pool rolls back the open read transaction before the connection is reused
+        connection_pool.release_connection(conn)
+
+def iter_row_batches_from_db(query: str, batch_size: int = settings.DB_FETCH_BATCH_SIZE,
+                             cursor_name: str = "py_file_proc_stream",
+                             require_connection: bool = False) -> Iterator[list]:
+    """
+    Streams the result of a query in bounded batches of dictionaries.
+
+    See `iter_raw_batches_from_db` for the arguments.
+
+    Yields:
+        list: A list of at most `batch_size` dictionaries, where each dictionary
+              represents a row with column names as keys. Nothing is yielded if
+              the connection cannot be established.
+    """
+    raw_batches = iter_raw_batches_from_db(query, batch_size, cursor_name, require_connection)
+    try:
+        columns = None
+        for description, rows in raw_batches:
+            if columns is None:
+                columns = [desc[0] for desc in description]
+            yield [dict(zip(columns, row)) for row in rows]
+    finally:
+        # Releases the connection as soon as the consumer stops iterating
+        raw_batches.close()
+
+def iter_rows_from_db(query: str, batch_size: int = settings.DB_FETCH_BATCH_SIZE) -> Iterator[dict]:
+    """
+    Streams the result of a query row by row using a server-side cursor.
+
+    This is a flattened view of `iter_row_batches_from_db` that can be passed
+    directly to the writers in `file_operations`.
+
+    Args:
+        query (str): The SQL query to execute.
+        batch_size (int): The number of rows fetched per round trip.
+
+    Yields:
+        dict: One row with column names as keys.
+    """
+    for batch in iter_row_batches_from_db(query, batch_size):
+        yield from batch
+
+def _sql_literal(value) -> str:
+    """Renders a Python value (int, date, datetime) as a SQL literal."""
+    return adapt(value).getquoted().decode()
+
+def _strip_query(query: str) -> str:
+    """Removes trailing whitespace and semicolons so the query can be used as a subquery."""
+    return query.strip().rstrip(";").strip()
+
+def fetch_partition_bounds(query: str, partition_column: str) -> tuple:
+    """
+    Returns the minimum and maximum value of `partition_column` in the result of `query`.
+
+    Returns:
+        tuple: (min, max), or (None, None) if the result is empty or on error.
+    """
+    bounds_query = (
+        f"SELECT min({partition_column}), max({partition_column}) "
+        f"FROM ({_strip_query(query)}) AS partition_source"
+    )
+    try:
+        with connection_pool.get_connection() as conn:
+            if conn:
+                with conn.cursor() as cur:
+                    cur.execute(bounds_query)
+                    return cur.fetchone()
+        return None, None
+    except Error as e:
+        print(f"Error fetching partition bounds: {e}")
+        return None, None
+
+def build_partition_queries(query: str, partition_column: str, num_partitions: int,
+                            strategy: str = "range", bounds: tuple | None = None) -> list:
+    """
+    Splits a query into `num_partitions` queries that together return the same rows.
+
+    Strategies:
+        "range": contiguous integer ranges of `partition_column` (e.g. a primary key).
+        "time":  equal-width date/timestamp windows of `partition_column` (e.g. created_at).
+        "hash":  `hashtext(partition_column) % num_partitions`, for keys without a useful order.
+
+    Rows where `partition_column` is NULL are assigned to exactly one partition.
+
+    Args:
+        query (str): The SQL query to partition.
+        partition_column (str): A column of the query's result.
+        num_partitions (int): The number of partitions.
+        strategy (str): "range", "time" or "hash".
+        bounds (tuple | None): (min, max) of `partition_column` for "range" and
+                               "time". Fetched from the database if None.
+
+    Returns:
+        list: The partition queries in partition order. Empty if the result set is empty.
+    """
+    if strategy not in ("range", "time", "hash"):
+        raise ValueError(f"Unknown partition strategy '{strategy}'. Expected 'range', 'time' or 'hash'.")
+    base_query = f"SELECT * FROM ({_strip_query(query)}) AS partition_source WHERE "
+    null_predicate = f"{partition_column} IS NULL"
+
+    if strategy == "hash":
+        predicates = [
+            f"mod(abs(hashtext({partition_column}::text)), {num_partitions}) = {index}"
+            for index in range(num_partitions)
+        ]
+        predicates[0] = f"({predicates[0]} OR {null_predicate})"
+        return [base_query + predicate for predicate in predicates]
+
+    low, high = bounds if bounds is not None else fetch_partition_bounds(query, partition_column)
+    if low is None or high is None:
+        return []
+
+    # Split points between the bounds; equal split points are collapsed for small ranges
+    if strategy == "range":
+        span = high - low + 1
+        split_points = [low + (span * index) // num_partitions for index in range(1, num_partitions)]
+    else:
+        split_points = [low + (high - low) * index / num_partitions for index in range(1, num_partitions)]
+    split_points = sorted(set(point for point in split_points if low < point <= high))
+
+    # The first and last partitions are open-ended, so rows outside the bounds
+    # (e.g. inserted after they were read) are still returned exactly once
+    edges = [low] + split_points
+    predicates = []
+    for index in range(len(edges)):
+        conditions = []
+        if index > 0:
+            conditions.append(f"{partition_column} >= {_sql_literal(edges[index])}")
+        if index + 1 < len(edges):
+            conditions.append(f"{partition_column} < {_sql_literal(edges[index + 1])}")
+        predicate = " AND ".join(conditions) or "TRUE"
+        if index == len(edges) - 1 and index > 0:
+            predicate = f"({predicate} OR {null_predicate})"
+        predicates.append(predicate)
+    return [base_query + predicate for predicate in predicates]
+
+def _put_until_stopped(batch_queue: queue.Queue, item, stop_event: threading.Event) -> bool:
+    """Puts an item in a bounded queue, waiting for room. Returns False if the consumer stopped first."""
+    while not stop_event.is_set():
+        try:
+            batch_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _stream_partition_into_queue(partition_query: str, index: int, batch_size: int,
+                                 batch_queue: queue.Queue, stop_event: threading.Event):
+    """
+    Worker: streams one partition into a bounded queue until done or stopped.
+
+    Every put, including the end marker and errors, gives up once `stop_event`
+    is set, so a consumer that stops early never leaves the worker blocked.
+    """
+    try:
+        for batch in iter_row_batches_from_db(partition_query, batch_size,
+                                              cursor_name=f"py_file_proc_partition_{index}",
+                                              require_connection=True):
+            if not _put_until_stopped(batch_queue, batch, stop_event):
+                return
+        _put_until_stopped(batch_queue, None, stop_event)
+    except Exception as e:
+        _put_until_stopped(batch_queue, e, stop_event)
+
+def iter_rows_partitioned(query: str, partition_column: str,
+                          num_partitions: int = settings.DB_PARTITION_COUNT,
+                          strategy: str = "range", bounds: tuple | None = None,
+                          batch_size: int = settings.DB_FETCH_BATCH_SIZE,
+                          max_workers: int | None = None) -> Iterator[dict]:
+    """
+    Streams the result of a query by running its partitions concurrently.
+
+    Each partition is read on its own pooled connection by a worker thread and
+    buffered in a bounded queue of DB_PARTITION_QUEUE_BATCHES batches. Rows
+    are yielded partition by partition, in partition order, so "range" and
+    "time" partitions on the column the query is ordered by give one merged,
+    ordered stream.
+
+    Args:
+        query (str): The SQL query to execute.
+        partition_column (str): The column used to split the query.
+        num_partitions (int): The number of partitions.
+        strategy (str): "range", "time" or "hash". See `build_partition_queries`.
+        bounds (tuple | None): Optional (min, max) of `partition_column`.
+        batch_size (int): The number of rows fetched per round trip.
+        max_workers (int | None): The number of partitions read at the same time.
+                                  Defaults to `num_partitions`, capped by
+                                  DB_POOL_MAX_CONNECTIONS.
+
+    Yields:
+        dict: One row with column names as keys.
+
+    Raises:
+        psycopg2.Error: If any partition fails.
+    """
+    partition_queries = build_partition_queries(query, partition_column, num_partitions, strategy, bounds)
+    if not partition_queries:
+        return
+    workers = min(max_workers or len(partition_queries), len(partition_queries),
+                  settings.DB_POOL_MAX_CONNECTIONS)
+    queues = [queue.Queue(maxsize=settings.DB_PARTITION_QUEUE_BATCHES) for _ in partition_queries]
+    stop_event = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db_partition")
+    try:
+        # Partitions are submitted in order, so the partition being consumed is always running
+        for index, partition_query in enumerate(partition_queries):
+            executor.submit(_stream_partition_into_queue, partition_query, index, batch_size,
+                            queues[index], stop_event)
+        total_rows = 0
+        for batch_queue in queues:
+            while True:
+                item = batch_queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                total_rows += len(item)
+                yield from item
+        print(f"Streamed {total_rows} rows from {len(partition_queries)} partitions.")
     finally:
-        if conn:
-            conn.close()
-            print("Database connection closed.")
+        stop_event.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def fetch_data_partitioned(query: str, partition_column: str,
+                           num_partitions: int = settings.DB_PARTITION_COUNT,
+                           strategy: str = "range", bounds: tuple | None = None) -> list:
+    """
+    Fetches data like `fetch_data_from_db`, running the query's partitions concurrently.
+
+    Returns:
+        list: A list of dictionaries, where each dictionary represents a row
+              with column names as keys. Returns an empty list on error.
+    """
+    try:
+        data = list(iter_rows_partitioned(query, partition_column, num_partitions, strategy, bounds))
+        print(f"Fetched {len(data)} rows from the database.")
+        return data
+    except Error as e:
+        print(f"Error fetching data: {e}")
+        return []
+
+def run_partitioned(query: str, partition_column: str,
+                    writer: Callable[[int, Iterator[dict]], Any],
+                    num_partitions: int = settings.DB_PARTITION_COUNT,
+                    strategy: str = "range", bounds: tuple | None = None,
+                    batch_size: int = settings.DB_FETCH_BATCH_SIZE,
+                    max_workers: int | None = None) -> list:
+    """
+    Runs the query's partitions concurrently, feeding each one into its own writer.
+
+    Example:
+        paths = run_partitioned(
+            query, "user_id",
+            lambda index, rows: file_operations.create_csv_file(rows, f"users_part{index}.csv"),
+        )
+
+    Args:
+        query (str): The SQL query to execute.
+        partition_column (str): The column used to split the query.
+        writer (Callable): Called as `writer(partition_index, rows)` in a worker
+                           thread, where `rows` streams the partition's rows.
+        num_partitions (int): The number of partitions.
+        strategy (str): "range", "time" or "hash". See `build_partition_queries`.
+        bounds (tuple | None): Optional (min, max) of `partition_column`.
+        batch_size (int): The number of rows fetched per round trip.
+        max_workers (int | None): The number of partitions processed at the same time.
+
+    Returns:
+        list: The writers' return values in partition order.
+    """
+    partition_queries = build_partition_queries(query, partition_column, num_partitions, strategy, bounds)
+    if not partition_queries:
+        return []
+    workers = min(max_workers or len(partition_queries), len(partition_queries),
+                  settings.DB_POOL_MAX_CONNECTIONS)
+
+    def write_partition(index: int, partition_query: str):
+        rows = (
+            row
+            for batch in iter_row_batches_from_db(partition_query, batch_size,
+                                                  cursor_name=f"py_file_proc_partition_{index}",
+                                                  require_connection=True)
+            for row in batch
+        )
+        return writer(index, rows)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db_partition") as executor:
+        futures = [executor.submit(write_partition, index, partition_query)
+                   for index, partition_query in enumerate(partition_queries)]
+        return [future.result() for future in futures]
+
+def build_incremental_query(query: str, watermark_column: str, last_watermark=None) -> str:
+    """
+    Restricts a query to the rows past a high-water mark.
+
+    Example:
+        build_incremental_query("SELECT * FROM users", "updated_at", datetime(2024, 1, 1))
+        # SELECT * FROM (SELECT * FROM users) AS incremental_source
+        # WHERE updated_at > '2024-01-01T00:00:00'::timestamp ORDER BY updated_at
+
+    Args:
+        query (str): The SQL query to restrict.
+        watermark_column (str): A monotonically increasing column of the query's
+                                result, e.g. updated_at or a serial primary key.
+        last_watermark: The highest value exported so far, or None for a full export.
+
+    Returns:
+        str: The incremental query, ordered by `watermark_column`.
+    """
+    condition = "TRUE" if last_watermark is None else f"{watermark_column} > {_sql_literal(last_watermark)}"
+    return (
+        f"SELECT * FROM ({_strip_query(query)}) AS incremental_source "
+        f"WHERE {condition} ORDER BY {watermark_column}"
+    )
+
+def track_watermark(rows: Iterable[dict], watermark_column: str, tracker: dict) -> Iterator[dict]:
+    """
+    Passes rows through while recording the highest `watermark_column` value seen.
+
+    The value is stored in `tracker["watermark"]` (left untouched if no row
+    has a value) so that it can be persisted once the export is delivered.
+
+    Args:
+        rows (Iterable[dict]): The rows of an incremental query.
+        watermark_column (str): The column tracked as the high-water mark.
+        tracker (dict): Receives the highest value under the "watermark" key.
+
+    Yields:
+        dict: The rows, unchanged.
+    """
+    for row_dict in rows:
+        value = row_dict.get(watermark_column)
+        if value is not None and (tracker.get("watermark") is None or value > tracker["watermark"]):
+            tracker["watermark"] = value
+        yield row_dict
 
 # Example usage (for testing purposes, not typically called directly in production)
 if __name__ == "__main__":
@@ -0,0 +1,101 @@
+# your_project_name/database/schema_registry.py
+
+import csv
+import os
+
+from your_project_name.config import settings
+from your_project_name.file_handler.state_files import locked_file, read_json_state, write_json_atomic
+
+# pandas dtypes used to parse each SQL type, so values are coerced while reading
+PANDAS_DTYPES_BY_SQL_TYPE = {
+    "SMALLINT": "Int64",
+    "INTEGER": "Int64",
+    "BIGINT": "Int64",
+    "NUMERIC": "float64",
+    "REAL": "float32",
+    "DOUBLE PRECISION": "float64",
+    "BOOLEAN": "boolean",
+    "TEXT": "string",
+}
+
+def schema_path(table_name: str, registry_dir: str | None = None) -> str:
+    """Returns the path of a table's schema file."""
+    return os.path.join(registry_dir or settings.CSV_SCHEMA_REGISTRY_DIRECTORY, f"{table_name}.json")
+
+def load_schema(table_name: str, registry_dir: str | None = None) -> dict | None:
+    """
+    Returns the registered schema of a table, or None if it has none.
+
+    A schema file is JSON of the form:
+        {"columns": [{"header": "Full Name", "name": "full_name", "type": "TEXT"}, ...]}
+    listing the CSV header of each column in file order, its SQL column name
+    and its SQL type. Files can be written by hand or by `register_schema`.
+    """
+    path = schema_path(table_name, registry_dir)
+    with locked_file(path):
+        schema = read_json_state(path)
+    return schema or None
+
+def register_schema(table_name: str, schema: dict, registry_dir: str | None = None):
+    """Writes a table's schema to the registry, replacing any previous one."""
+    path = schema_path(table_name, registry_dir)
+    with locked_file(path):
+        write_json_atomic(path, schema)
+    print(f"Registered schema for '{table_name}' in '{path}'.")
+
+def schema_from_columns(headers: list, column_definitions: list) -> dict:
+    """Builds a schema from CSV headers and their column definitions, e.g. "age INTEGER"."""
+    columns = []
+    for header, column_sql in zip(headers, column_definitions):
+        name, sql_type = column_sql.split(" ", 1)
+        columns.append({"header": header, "name": name, "type": sql_type})
+    return {"columns": columns}
+
+def read_csv_header(file_path: str) -> list:
+    """Returns a CSV file's header row without reading the rest of the file."""
+    with open(file_path, 'r', newline='', encoding='utf-8') as f:
+        return next(csv.reader(f), [])
+
+def validate_header(schema: dict, header: list, file_path: str = "CSV file"):
+    """
+    Checks that a file's header matches the schema's columns, in order.
+
+    Only the header row is compared, so a mismatching file is rejected
+    before any of its rows are read or loaded.
+
+    Raises:
+        ValueError: If the header differs from the schema.
+    """
+    expected = [column["header"] for column in schema["columns"]]
+    if header == expected:
+        return
+    missing = [col for col in expected if col not in header]
+    unexpected = [col for col in header if col not in expected]
+    details = []
+    if missing:
+        details.append(f"missing {', '.join(missing)}")
+    if unexpected:
+        details.append(f"unexpected {', '.join(unexpected)}")
+    raise ValueError(f"Header of '{file_path}' does not match the registered schema: "
+                     f"{'; '.join(details) or 'columns are in a different order'}.")
+
+def columns_sql(schema: dict) -> str:
+    """Returns the column definitions of a schema for `CREATE TABLE`."""
+    return ", ".join(f"{column['name']} {column['type']}" for column in schema["columns"])
+
+def read_csv_options(schema: dict) -> dict:
+    """
+    Returns `pd.read_csv` keyword arguments that parse every column as its SQL type.
+
+    Timestamp and date columns are parsed with `parse_dates`; any other type
+    not in PANDAS_DTYPES_BY_SQL_TYPE is read as text and cast by PostgreSQL.
+    """
+    dtypes = {}
+    parse_dates = []
+    for column in schema["columns"]:
+        sql_type = column["type"].upper()
+        if sql_type.startswith(("TIMESTAMP", "DATE")):
+            parse_dates.append(column["header"])
+        else:
+            dtypes[column["header"]] = PANDAS_DTYPES_BY_SQL_TYPE.get(sql_type, "string")
+    return {"dtype": dtypes, "parse_dates": parse_dates}
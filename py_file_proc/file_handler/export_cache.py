@@ -0,0 +1,165 @@
+# your_project_name/file_handler/export_cache.py
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from typing import Iterable, Iterator
+
+from your_project_name.config import settings
+from your_project_name.file_handler.state_files import locked_file, read_json_state, write_json_atomic
+
+def _index_path() -> str:
+    """Returns the path of the cache index, which maps cache keys to entries."""
+    return os.path.join(settings.EXPORT_CACHE_DIRECTORY, "index.json")
+
+def iter_hashed_rows(rows: Iterable[dict], hasher) -> Iterator[dict]:
+    """
+    Passes rows through while feeding them into `hasher` (a hashlib object).
+
+    Each row is hashed as canonical JSON (sorted keys), so the digest only
+    depends on the row values and their order, not on how they are serialized.
+    """
+    for row_dict in rows:
+        hasher.update(json.dumps(row_dict, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8"))
+        hasher.update(b"\n")
+        yield row_dict
+
+def hash_rows(rows: Iterable[dict]) -> str:
+    """Returns the SHA-256 hex digest of a result set. See `iter_hashed_rows`."""
+    hasher = hashlib.sha256()
+    for _ in iter_hashed_rows(rows, hasher):
+        pass
+    return hasher.hexdigest()
+
+def build_cache_key(result_hash: str, file_format: str, template_path: str | None = None,
+                    compression: str | None = None) -> str:
+    """
+    Combines the result set hash with everything else that shapes the output file.
+
+    Args:
+        result_hash (str): The digest from `hash_rows` or `iter_hashed_rows`.
+        file_format (str): The output format, e.g. "csv" or "xml".
+        template_path (str | None): The XML template, whose content is part of the key.
+        compression (str | None): The output compression, e.g. "gzip".
+
+    Returns:
+        str: The cache key.
+    """
+    hasher = hashlib.sha256(f"{file_format}\n{compression or ''}\n{result_hash}\n".encode("utf-8"))
+    if template_path:
+        with open(template_path, 'rb') as template_file:
+            hasher.update(template_file.read())
+    return hasher.hexdigest()
+
+def _copy_atomic(source_path: str, target_path: str):
+    """
+    Copies a file so that readers of `target_path` never see a partial copy.
+
+    The copy goes to a hidden temporary file next to `target_path`, so scans
+    of the directory never pick it up, and is renamed over it when complete.
+    """
+    directory = os.path.dirname(os.path.abspath(target_path))
+    fd, temp_path = tempfile.mkstemp(prefix="." + os.path.basename(target_path) + "-", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as temp_file, open(source_path, 'rb') as source_file:
+            shutil.copyfileobj(source_file, temp_file)
+        shutil.copymode(source_path, temp_path) # mkstemp creates the file readable by its owner only
+        os.replace(temp_path, target_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def lookup(cache_key: str) -> dict | None:
+    """
+    Returns the cache entry for a key if its cached file is still present.
+
+    Returns:
+        dict | None: The entry, with the cached copy under "cache_path", or None on a miss.
+    """
+    with locked_file(_index_path()):
+        index = read_json_state(_index_path())
+        entry = index.get(cache_key)
+        if entry is None:
+            return None
+        if not os.path.exists(entry["cache_path"]):
+            del index[cache_key]
+            write_json_atomic(_index_path(), index)
+            return None
+        entry["last_used_at"] = time.time()
+        write_json_atomic(_index_path(), index)
+        return entry
+
+def store(cache_key: str, file_path: str) -> dict:
+    """
+    Copies an export file into the cache under `cache_key`.
+
+    Upload outcomes recorded for the key are kept, since the file represents
+    the same data. The cache is evicted afterwards.
+
+    Returns:
+        dict: The new cache entry.
+    """
+    cache_path = os.path.join(settings.EXPORT_CACHE_DIRECTORY, cache_key + os.path.splitext(file_path)[1])
+    os.makedirs(settings.EXPORT_CACHE_DIRECTORY, exist_ok=True)
+    # Copy rather than link: the writers truncate and rewrite output files in place
+    _copy_atomic(file_path, cache_path)
+    with locked_file(_index_path()):
+        index = read_json_state(_index_path())
+        entry = {
+            "cache_path": cache_path,
+            "size": os.path.getsize(cache_path),
+            "created_at": time.time(),
+            "last_used_at": time.time(),
+            "uploads": index.get(cache_key, {}).get("uploads", {}),
+        }
+        index[cache_key] = entry
+        _evict(index)
+        write_json_atomic(_index_path(), index)
+    return entry
+
+def restore(entry: dict, file_path: str) -> str:
+    """Copies a cached file to `file_path` and returns the path."""
+    _copy_atomic(entry["cache_path"], file_path)
+    return file_path
+
+def was_uploaded(cache_key: str, api_endpoint: str) -> bool:
+    """Checks whether the export for `cache_key` was already uploaded successfully to `api_endpoint`."""
+    with locked_file(_index_path()):
+        entry = read_json_state(_index_path()).get(cache_key)
+    return bool(entry) and entry.get("uploads", {}).get(api_endpoint, {}).get("success", False)
+
+def record_upload(cache_key: str, api_endpoint: str, success: bool):
+    """Records the outcome of uploading the export for `cache_key` to `api_endpoint`."""
+    with locked_file(_index_path()):
+        index = read_json_state(_index_path())
+        entry = index.get(cache_key)
+        if entry is None:
+            return
+        entry.setdefault("uploads", {})[api_endpoint] = {
+            "success": success,
+            "uploaded_at": datetime.now().isoformat(),
+        }
+        write_json_atomic(_index_path(), index)
+
+def _evict(index: dict, max_bytes: int | None = None, max_age: float | None = None):
+    """
+    Removes entries older than `max_age` seconds, then the least recently used
+    entries until the cached files fit in `max_bytes`. Modifies `index` in place.
+    """
+    max_bytes = settings.EXPORT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    max_age = settings.EXPORT_CACHE_MAX_AGE if max_age is None else max_age
+    now = time.time()
+    by_last_use = sorted(index.items(), key=lambda item: item[1]["last_used_at"])
+    total_size = sum(entry["size"] for _, entry in by_last_use)
+    for cache_key, entry in by_last_use:
+        if now - entry["created_at"] <= max_age and total_size <= max_bytes:
+            continue
+        total_size -= entry["size"]
+        del index[cache_key]
+        if os.path.exists(entry["cache_path"]):
+            os.remove(entry["cache_path"])
+        print(f"Evicted cached export {cache_key[:12]} ({entry['size']} bytes).")
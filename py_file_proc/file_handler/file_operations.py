@@ -1,132 +1,636 @@
 # your_project_name/file_handler/file_operations.py
 
+import io
 import os
 import csv
+import gzip
 import json
+import hashlib
+import itertools
+import math
+import re
+import threading
+import zlib
+from typing import Callable, Iterable, Iterator
+from xml.sax.saxutils import escape
 from lxml import etree # New import for XML handling
-from datetime import datetime # New import for timestamp
+from datetime import date, datetime, time # New import for timestamp
+from decimal import Decimal
 from your_project_name.config import settings
+from your_project_name.file_handler import export_cache
+from your_project_name.file_handler.state_files import write_json_atomic
 
 def get_output_filepath(filename: str = settings.OUTPUT_FILE_NAME) -> str:
     """Constructs the full path for the output file."""
     return os.path.join(settings.OUTPUT_FILE_DIRECTORY, filename)
 
-def create_csv_file(data: list, filename: str = settings.OUTPUT_FILE_NAME) -> str | None:
+# File extension appended to compressed output files
+COMPRESSION_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+def get_compressed_filepath(filepath: str, compression: str | None) -> str:
+    """Appends the compression extension (e.g. '.gz') to a path, unless it is already there."""
+    if not compression:
+        return filepath
+    if compression not in COMPRESSION_EXTENSIONS:
+        raise ValueError(f"Unknown compression '{compression}'. Expected one of: {', '.join(COMPRESSION_EXTENSIONS)}.")
+    extension = COMPRESSION_EXTENSIONS[compression]
+    return filepath if filepath.endswith(extension) else filepath + extension
+
+def open_output_file(filepath: str, compression: str | None = None, binary: bool = False,
+                     newline: str | None = None,
+                     level: int | None = settings.OUTPUT_COMPRESSION_LEVEL,
+                     threads: int = settings.OUTPUT_COMPRESSION_THREADS):
     """
-    Creates a CSV file from a list of dictionaries.
+    Opens an output file for writing, compressing it on the fly if requested.
+
+    Data is compressed as it is written, so compressed exports never exist
+    uncompressed on disk or in memory.
 
     Args:
-        data (list): A list of dictionaries, where each dictionary is a row.
+        filepath (str): The path of the file to create.
+        compression (str | None): None, "gzip", or "zstd" (requires the
+                                  optional `zstandard` package).
+        binary (bool): If True, return a binary stream instead of a UTF-8 text stream.
+        newline (str | None): Passed to the text stream, e.g. '' for CSV.
+        level (int | None): The compression level. None uses the codec's
+                            default (6 for gzip, 3 for zstd).
+        threads (int): zstd worker threads; 0 compresses in the calling
+                       thread, -1 uses one thread per CPU. Ignored by gzip.
+
+    Returns:
+        A writable file object, to be used as a context manager.
+    """
+    if not compression:
+        if binary:
+            return open(filepath, 'wb')
+        if newline is None:
+            return open(filepath, 'w', encoding='utf-8')
+        return open(filepath, 'w', newline=newline, encoding='utf-8')
+    if compression == "gzip":
+        compressed = gzip.open(filepath, 'wb', compresslevel=6 if level is None else level)
+    elif compression == "zstd":
+        compressor = _import_zstandard().ZstdCompressor(level=3 if level is None else level, threads=threads)
+        compressed = compressor.stream_writer(open(filepath, 'wb'), closefd=True)
+    else:
+        raise ValueError(f"Unknown compression '{compression}'. Expected one of: {', '.join(COMPRESSION_EXTENSIONS)}.")
+    if binary:
+        return compressed
+    return io.TextIOWrapper(compressed, encoding='utf-8', newline=newline)
+
+def _import_zstandard():
+    """Imports zstandard, which is only needed for zstd compression."""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("The zstandard package is required for zstd compression: pip install zstandard") from e
+    return zstandard
+
+def open_compressor(compression: str, level: int | None = settings.OUTPUT_COMPRESSION_LEVEL,
+                    threads: int = settings.OUTPUT_COMPRESSION_THREADS):
+    """
+    Returns an incremental compressor for data that is not written to a file.
+
+    `compress(data)` returns the compressed bytes available so far and
+    `flush()` the rest; together they form the same gzip or zstd stream that
+    `open_output_file` writes. See `open_output_file` for the arguments.
+    """
+    if compression == "gzip":
+        # wbits=31 wraps the deflate stream in a gzip header and trailer
+        return zlib.compressobj(6 if level is None else level, zlib.DEFLATED, 31)
+    if compression == "zstd":
+        return _import_zstandard().ZstdCompressor(level=3 if level is None else level, threads=threads).compressobj()
+    raise ValueError(f"Unknown compression '{compression}'. Expected one of: {', '.join(COMPRESSION_EXTENSIONS)}.")
+
+def _peek_rows(data: Iterable[dict]) -> tuple[dict | None, Iterator[dict]]:
+    """
+    Returns the first row of `data` together with an iterator over all rows.
+
+    This lets the writers accept both lists and one-shot iterators (such as
+    `db_connector.iter_rows_from_db`) without materializing the rows.
+    """
+    rows = iter(data)
+    first_row = next(rows, None)
+    if first_row is None:
+        return None, rows
+    return first_row, itertools.chain([first_row], rows)
+
+def _group_chunks(chunks: Iterable[str], flush_size: int) -> Iterator[str]:
+    """Joins `chunks` into strings of at least `flush_size` characters (except the last one)."""
+    buffer = []
+    buffered_size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered_size += len(chunk)
+        if buffered_size >= flush_size:
+            yield "".join(buffer)
+            buffer.clear()
+            buffered_size = 0
+    if buffer:
+        yield "".join(buffer)
+
+def _write_buffered(output_file, chunks: Iterable[str], flush_size: int) -> None:
+    """
+    Writes `chunks` to `output_file`, grouping them into writes of at least
+    `flush_size` characters to keep the number of write calls low.
+    """
+    for text in _group_chunks(chunks, flush_size):
+        output_file.write(text)
+
+class RowSerializer:
+    """
+    Incrementally serializes rows to text in one of the supported formats.
+
+    The output of `start`, `serialize` (called any number of times) and
+    `finish`, concatenated, is a complete document. This lets the same
+    formatting code write files and feed streaming consumers such as the
+    async pipeline.
+
+    Supported formats: "csv", "json", "jsonl" and "xml" (based on the XML template).
+    """
+
+    FORMATS = ("csv", "json", "jsonl", "xml")
+
+    def __init__(self, file_format: str, fieldnames: list | None = None, indent: int | None = 4,
+                 metadata: dict | None = None):
+        if file_format not in self.FORMATS:
+            raise ValueError(f"Unsupported format '{file_format}'. Expected one of {', '.join(self.FORMATS)}.")
+        self.file_format = file_format
+        self.fieldnames = fieldnames
+        self.indent = indent
+        self.metadata = metadata
+        self._row_count = 0
+        self._buffer = io.StringIO()
+        self._csv_writer = None
+        self._xml_suffix = ""
+        self._xml_records = None
+
+    def _take_buffer(self) -> str:
+        """Returns and clears the internal CSV buffer."""
+        text = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return text
+
+    def start(self, first_row: dict) -> str:
+        """Returns the document header. `first_row` provides the CSV header if no fieldnames were given."""
+        if self.file_format == "csv":
+            self._csv_writer = csv.DictWriter(self._buffer, fieldnames=self.fieldnames or list(first_row.keys()))
+            self._csv_writer.writeheader()
+            return self._take_buffer()
+        if self.file_format == "json":
+            return "["
+        if self.file_format == "xml":
+            template = get_compiled_xml_template()
+            prefix, suffix = template.render(self.metadata)
+            self._xml_suffix = suffix.decode("utf-8")
+            self._xml_records = XmlRecordSerializer(template.level)
+            return prefix.decode("utf-8")
+        return ""
+
+    def serialize_row(self, row_dict: dict) -> str:
+        """Returns the text of a single row."""
+        index = self._row_count
+        self._row_count += 1
+        if self.file_format == "csv":
+            self._csv_writer.writerow(row_dict)
+            return self._take_buffer()
+        if self.file_format == "jsonl":
+            return json.dumps(row_dict, separators=(",", ":"), default=str) + "\n"
+        if self.file_format == "json":
+            element = json.dumps(row_dict, indent=self.indent, default=str)
+            if self.indent is None:
+                return ("," if index else "") + element
+            separator = "\n" + " " * self.indent
+            return ("," if index else "") + separator + element.replace("\n", separator)
+        return self._xml_records.serialize(row_dict)
+
+    def serialize(self, rows: Iterable[dict]) -> str:
+        """Returns the text of a batch of rows."""
+        return "".join(self.serialize_row(row_dict) for row_dict in rows)
+
+    def finish(self) -> str:
+        """Returns the document footer."""
+        if self.file_format == "json":
+            return "]" if self.indent is None else "\n]"
+        if self.file_format == "xml":
+            return self._xml_suffix
+        return ""
+
+def _iter_document(serializer: RowSerializer, first_row: dict, rows: Iterator[dict]) -> Iterator[str]:
+    """Yields the text of a whole document: the header, every row and the footer."""
+    return itertools.chain(
+        [serializer.start(first_row)],
+        (serializer.serialize_row(row_dict) for row_dict in rows),
+        [serializer.finish()],
+    )
+
+def _write_serialized(filepath: str, serializer: RowSerializer, first_row: dict, rows: Iterator[dict],
+                      flush_size: int, newline: str | None = None, compression: str | None = None) -> None:
+    """Writes all rows through `serializer` to `filepath` in chunks of at least `flush_size` characters."""
+    with open_output_file(filepath, compression, newline=newline) as output_file:
+        _write_buffered(output_file, _iter_document(serializer, first_row, rows), flush_size)
+
+def iter_serialized_chunks(data: Iterable[dict], file_format: str, compression: str | None = None,
+                           flush_size: int = settings.OUTPUT_FLUSH_SIZE,
+                           metadata: dict | None = None) -> Iterator[bytes]:
+    """
+    Serializes rows into the bytes of a document without writing a file.
+
+    Rows are consumed as the chunks are requested, so a streamed query is
+    serialized (and compressed) while it is being read. The concatenated
+    chunks are the same bytes the matching file writer would write.
+
+    Args:
+        data (Iterable[dict]): A list or iterator of dictionaries, where each dictionary is a row.
+        file_format (str): One of `RowSerializer.FORMATS`.
+        compression (str | None): None, "gzip" or "zstd". See `open_compressor`.
+        flush_size (int): The number of characters serialized per chunk before compression.
+        metadata (dict | None): Values for "{{ name }}" placeholders in the XML template.
+
+    Yields:
+        bytes: The next part of the document. Nothing is yielded if there are no rows.
+    """
+    first_row, rows = _peek_rows(data)
+    if first_row is None:
+        return
+    serializer = RowSerializer(file_format, metadata=metadata)
+    compressor = open_compressor(compression) if compression else None
+    for text in _group_chunks(_iter_document(serializer, first_row, rows), flush_size):
+        chunk = text.encode("utf-8")
+        if compressor:
+            chunk = compressor.compress(chunk)
+        if chunk:
+            yield chunk
+    if compressor:
+        yield compressor.flush()
+
+def create_csv_file(data: Iterable[dict], filename: str = settings.OUTPUT_FILE_NAME,
+                    fieldnames: list | None = None,
+                    flush_size: int = settings.OUTPUT_FLUSH_SIZE,
+                    compression: str | None = settings.OUTPUT_COMPRESSION) -> str | None:
+    """
+    Creates a CSV file from a list or iterator of dictionaries.
+
+    Rows are formatted into an in-memory buffer that is written to disk every
+    `flush_size` characters.
+
+    Args:
+        data (Iterable[dict]): A list or iterator of dictionaries, where each dictionary is a row.
         filename (str): The name of the CSV file to create.
+        fieldnames (list | None): The header columns, e.g. taken from the cursor
+                                  description. Defaults to the keys of the first row.
+        flush_size (int): The number of characters buffered between writes.
+        compression (str | None): None, "gzip" or "zstd". The matching extension
+                                  is appended to the file name. See `open_output_file`.
 
     Returns:
         str | None: The full path to the created file if successful, None otherwise.
     """
-    if not data:
+    first_row, rows = _peek_rows(data)
+    if first_row is None:
         print("No data provided to create CSV file.")
         return None
 
-    filepath = get_output_filepath(filename)
-    keys = data[0].keys() # Assumes all dicts have the same keys
+    filepath = get_compressed_filepath(get_output_filepath(filename), compression)
 
     try:
-        with open(filepath, 'w', newline='', encoding='utf-8') as output_file:
-            dict_writer = csv.DictWriter(output_file, fieldnames=keys)
-            dict_writer.writeheader()
-            dict_writer.writerows(data)
+        _write_serialized(filepath, RowSerializer("csv", fieldnames), first_row, rows, flush_size, newline='',
+                          compression=compression)
         print(f"CSV file created successfully at: {filepath}")
         return filepath
     except IOError as e:
         print(f"Error creating CSV file {filepath}: {e}")
         return None
 
-def create_json_file(data: list, filename: str = "data_export.json") -> str | None:
+def create_json_file(data: Iterable[dict], filename: str = "data_export.json",
+                     indent: int | None = 4,
+                     flush_size: int = settings.OUTPUT_FLUSH_SIZE,
+                     compression: str | None = settings.OUTPUT_COMPRESSION) -> str | None:
     """
-    Creates a JSON file from a list of dictionaries.
+    Creates a JSON file from a list or iterator of dictionaries.
+
+    The array is streamed one element at a time, producing the same output as
+    `json.dump(data, indent=indent)` without holding all rows in memory.
+    Values that are not JSON serializable (e.g. datetimes) are written as strings.
 
     Args:
-        data (list): A list of dictionaries.
+        data (Iterable[dict]): A list or iterator of dictionaries.
         filename (str): The name of the JSON file to create.
+        indent (int | None): The indentation level. None writes a compact array.
+        flush_size (int): The number of characters buffered between writes.
+        compression (str | None): None, "gzip" or "zstd". The matching extension
+                                  is appended to the file name. See `open_output_file`.
 
     Returns:
         str | None: The full path to the created file if successful, None otherwise.
     """
-    if not data:
+    first_row, rows = _peek_rows(data)
+    if first_row is None:
         print("No data provided to create JSON file.")
         return None
 
-    filepath = get_output_filepath(filename)
+    filepath = get_compressed_filepath(get_output_filepath(filename), compression)
 
     try:
-        with open(filepath, 'w', encoding='utf-8') as output_file:
-            json.dump(data, output_file, indent=4)
+        _write_serialized(filepath, RowSerializer("json", indent=indent), first_row, rows, flush_size,
+                          compression=compression)
         print(f"JSON file created successfully at: {filepath}")
         return filepath
     except IOError as e:
         print(f"Error creating JSON file {filepath}: {e}")
         return None
 
-def create_xml_file_from_template(data: list, output_filename: str = "data_export.xml") -> str | None:
+def create_jsonl_file(data: Iterable[dict], filename: str = "data_export.jsonl",
+                      flush_size: int = settings.OUTPUT_FLUSH_SIZE,
+                      compression: str | None = settings.OUTPUT_COMPRESSION) -> str | None:
+    """
+    Creates a JSON Lines (NDJSON) file from a list or iterator of dictionaries.
+
+    Each row is written as one compact JSON object per line, so consumers can
+    split the file on newlines and process the parts in parallel.
+
+    Args:
+        data (Iterable[dict]): A list or iterator of dictionaries.
+        filename (str): The name of the JSON Lines file to create.
+        flush_size (int): The number of characters buffered between writes.
+        compression (str | None): None, "gzip" or "zstd". The matching extension
+                                  is appended to the file name. See `open_output_file`.
+
+    Returns:
+        str | None: The full path to the created file if successful, None otherwise.
+    """
+    first_row, rows = _peek_rows(data)
+    if first_row is None:
+        print("No data provided to create JSON Lines file.")
+        return None
+
+    filepath = get_compressed_filepath(get_output_filepath(filename), compression)
+
+    try:
+        _write_serialized(filepath, RowSerializer("jsonl"), first_row, rows, flush_size, compression=compression)
+        print(f"JSON Lines file created successfully at: {filepath}")
+        return filepath
+    except IOError as e:
+        print(f"Error creating JSON Lines file {filepath}: {e}")
+        return None
+
+# Namespace of the xsi:nil attribute marking missing (NULL) values
+XSI_NAMESPACE = "http://www.w3.org/2001/XMLSchema-instance"
+
+def _format_xml_double(value: float) -> str:
+    """Formats a float as xs:double, which spells the special values NaN, INF and -INF."""
+    if math.isfinite(value):
+        return repr(value)
+    if math.isnan(value):
+        return "NaN"
+    return "INF" if value > 0 else "-INF"
+
+# Characters XML 1.0 does not allow in text, except NUL, which separates the
+# texts checked together in XmlRecordSerializer.serialize and is counted instead
+XML_INVALID_CHARACTERS = re.compile("[\x01-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+
+# XML text formatters by exact value type, and whether their output can need escaping.
+# Other types fall back to str() with escaping.
+XML_VALUE_FORMATTERS = {
+    str: (str, True),
+    int: (int.__repr__, False),
+    float: (_format_xml_double, False),
+    bool: (lambda value: "true" if value else "false", False),
+    Decimal: (lambda value: format(value, "f"), False), # Never in exponent notation, as xs:decimal requires
+    datetime: (datetime.isoformat, False),
+    date: (date.isoformat, False),
+    time: (time.isoformat, False),
+}
+
+class XmlRecordSerializer:
+    """
+    Serializes rows to indented '<record>' elements at a given nesting level.
+
+    The tags, indentation and value formatter of each column are looked up
+    once, from the first value seen for it, and reused for every row, so a
+    field costs one type check and one format call instead of an element
+    built and serialized by lxml. Numbers and dates skip escaping, and the
+    text values of a record are checked and escaped together in one pass;
+    text with characters XML does not allow raises ValueError, as lxml does.
+    None is written as an empty element with xsi:nil="true".
+    """
+
+    def __init__(self, level: int):
+        self.record_indent = "\n" + "  " * level
+        self.field_indent = "\n" + "  " * (level + 1)
+        self.columns = {}
+
+    def _add_column(self, key: str, value) -> tuple:
+        """Builds and stores the table entry of a column."""
+        try:
+            etree.Element(key) # Validates the column name as an XML tag
+        except ValueError as e:
+            raise ValueError(f"Column '{key}' is not a valid XML element name.") from e
+        value_type = type(value)
+        formatter, needs_escape = XML_VALUE_FORMATTERS.get(value_type, (str, True))
+        column = (f"{self.field_indent}<{key}>", f"</{key}>", f'{self.field_indent}<{key} xsi:nil="true"/>',
+                  value_type, formatter, needs_escape)
+        if value is not None:
+            self.columns[key] = column
+        return column
+
+    def serialize(self, row_dict: dict) -> str:
+        """Returns the text of one '<record>' element, starting with its indentation."""
+        if not row_dict:
+            return self.record_indent + "<record/>"
+        parts = [self.record_indent, "<record>"]
+        escaped_positions = []
+        for key, value in row_dict.items():
+            column = self.columns.get(key) or self._add_column(key, value)
+            if value is None:
+                parts.append(column[2])
+                continue
+            if type(value) is column[3]:
+                formatter, needs_escape = column[4], column[5]
+            else:
+                formatter, needs_escape = XML_VALUE_FORMATTERS.get(type(value), (str, True))
+            parts.append(column[0])
+            if needs_escape:
+                escaped_positions.append(len(parts))
+            parts.append(formatter(value))
+            parts.append(column[1])
+        if escaped_positions:
+            texts = "\x00".join(parts[position] for position in escaped_positions)
+            if texts.count("\x00") >= len(escaped_positions) or XML_INVALID_CHARACTERS.search(texts):
+                raise ValueError("All strings must be XML compatible: Unicode or ASCII, "
+                                 "no NULL bytes or control characters")
+            if "&" in texts or "<" in texts or ">" in texts:
+                escaped = escape(texts).split("\x00")
+                for position, text in zip(escaped_positions, escaped):
+                    parts[position] = text
+        parts.append(self.record_indent)
+        parts.append("</record>")
+        return "".join(parts)
+
+def _get_template_filepath() -> str:
+    """Returns the path of the XML template next to this module."""
+    return os.path.join(os.path.dirname(__file__), settings.XML_TEMPLATE_FILE_NAME)
+
+# Placeholder slots in the XML template, e.g. "{{ current_timestamp }}"
+XML_PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+class CompiledXmlTemplate:
+    """
+    An XML template split once into the bytes before and after its records.
+
+    The text around the '<records>' element is stored as UTF-8 literal
+    segments and placeholder slots, so starting a document only joins bytes
+    and fills the slots; the template is not parsed or searched again.
+    """
+
+    def __init__(self, prefix: str, suffix: str, level: int):
+        self.prefix_parts = self._split_slots(prefix)
+        self.suffix_parts = self._split_slots(suffix)
+        self.level = level
+
+    @staticmethod
+    def _split_slots(text: str) -> list:
+        """Splits text into literal byte segments and (name, placeholder bytes) slots."""
+        parts = []
+        position = 0
+        for match in XML_PLACEHOLDER_PATTERN.finditer(text):
+            parts.append(text[position:match.start()].encode("utf-8"))
+            parts.append((match.group(1), match.group(0).encode("utf-8")))
+            position = match.end()
+        parts.append(text[position:].encode("utf-8"))
+        return parts
+
+    @staticmethod
+    def _fill(parts: list, values: dict) -> bytes:
+        """Joins the segments, replacing each slot with its value or leaving it as-is if it has none."""
+        return b"".join(part if isinstance(part, bytes) else values.get(part[0], part[1]) for part in parts)
+
+    def render(self, metadata: dict | None = None) -> tuple[bytes, bytes]:
+        """
+        Returns the document prefix and suffix with the placeholders filled.
+
+        Args:
+            metadata (dict | None): Values for the placeholders. "current_timestamp"
+                                    defaults to the current time.
+
+        Returns:
+            tuple: (prefix, suffix) as UTF-8 bytes.
+        """
+        values = {"current_timestamp": datetime.now().isoformat()}
+        values.update(metadata or {})
+        encoded = {name: escape(str(value), {'"': "&quot;"}).encode("utf-8") for name, value in values.items()}
+        return self._fill(self.prefix_parts, encoded), self._fill(self.suffix_parts, encoded)
+
+def compile_xml_template(template_filepath: str) -> CompiledXmlTemplate:
+    """
+    Parses an XML template and splits it into the text before and after the records.
+
+    The '<generated_at>' element, if any, becomes a "{{ current_timestamp }}" slot,
+    and the root element declares the xsi namespace used for missing values.
+
+    Raises:
+        etree.XMLSyntaxError: If the template is not well-formed.
+        ValueError: If the template has no '<records>' element.
+    """
+    parser = etree.XMLParser(remove_blank_text=True) # Remove whitespace-only text nodes
+    tree = etree.parse(template_filepath, parser)
+    root = tree.getroot()
+    if root.nsmap.get("xsi") != XSI_NAMESPACE:
+        # lxml cannot add a namespace declaration to an element, so the root is rebuilt with it
+        template_root = root
+        root = etree.Element(template_root.tag, dict(template_root.attrib),
+                             nsmap={**template_root.nsmap, "xsi": XSI_NAMESPACE})
+        root.text = template_root.text
+        root.extend(list(template_root))
+
+    timestamp_element = root.find(".//generated_at")
+    if timestamp_element is not None:
+        timestamp_element.text = "{{ current_timestamp }}"
+
+    records_element = root.find(".//records")
+    if records_element is None:
+        raise ValueError("'<records>' element not found in XML template.")
+
+    marker = "__py_file_proc_records__"
+    records_element.text = marker
+    level = sum(1 for _ in records_element.iterancestors()) + 1
+    etree.indent(root)
+    document = etree.tostring(root, encoding="unicode")
+    prefix, suffix = document.split(marker)
+    declaration = "<?xml version='1.0' encoding='utf-8'?>\n"
+    return CompiledXmlTemplate(declaration + prefix, "\n" + "  " * (level - 1) + suffix + "\n", level)
+
+# Compiled templates by path, with the (mtime, size) they were compiled from
+_compiled_xml_templates = {}
+_compiled_xml_templates_lock = threading.Lock()
+
+def get_compiled_xml_template(template_filepath: str | None = None) -> CompiledXmlTemplate:
+    """
+    Returns the compiled XML template, compiling it only when the file has changed.
+
+    Compiled templates are shared by all calls and threads of the process and
+    are recompiled when the file's modification time or size changes.
     """
-    Creates an XML file from a list of dictionaries using a predefined template.
+    template_filepath = template_filepath or _get_template_filepath()
+    stat = os.stat(template_filepath)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _compiled_xml_templates_lock:
+        cached = _compiled_xml_templates.get(template_filepath)
+        if cached is None or cached[0] != version:
+            cached = (version, compile_xml_template(template_filepath))
+            _compiled_xml_templates[template_filepath] = cached
+        return cached[1]
+
+def create_xml_file_from_template(data: Iterable[dict], output_filename: str = "data_export.xml",
+                                  compression: str | None = settings.OUTPUT_COMPRESSION,
+                                  flush_size: int = settings.OUTPUT_FLUSH_SIZE,
+                                  metadata: dict | None = None) -> str | None:
+    """
+    Creates an XML file from a list or iterator of dictionaries using a predefined template.
 
     The template is expected to have a '<records>' element where individual
-    '<record>' elements (representing each row of data) will be appended.
+    '<record>' elements (representing each row of data) will be written.
     Metadata like 'current_timestamp' in the template will be replaced.
 
+    The template is compiled once per process (see `get_compiled_xml_template`),
+    so each file only costs its rows: the cached header is written first, each
+    record as its row arrives, and the cached footer at the end. Peak memory
+    therefore does not depend on the number of rows.
+
     Args:
-        data (list): A list of dictionaries, where each dictionary is a row.
+        data (Iterable[dict]): A list or iterator of dictionaries, where each dictionary is a row.
         output_filename (str): The name of the XML file to create.
+        compression (str | None): None, "gzip" or "zstd". The matching extension
+                                  is appended to the file name. See `open_output_file`.
+        flush_size (int): The number of characters buffered between writes.
+        metadata (dict | None): Values for "{{ name }}" placeholders in the template.
 
     Returns:
         str | None: The full path to the created file if successful, None otherwise.
     """
-    if not data:
+    first_row, rows = _peek_rows(data)
+    if first_row is None:
         print("No data provided to create XML file.")
         return None
 
-    template_filepath = os.path.join(
-        os.path.dirname(__file__), settings.XML_TEMPLATE_FILE_NAME
-    )
+    template_filepath = _get_template_filepath()
     if not os.path.exists(template_filepath):
         print(f"XML template file not found: {template_filepath}")
         return None
 
-    output_filepath = get_output_filepath(output_filename)
+    output_filepath = get_compressed_filepath(get_output_filepath(output_filename), compression)
 
     try:
-        # Parse the XML template
-        parser = etree.XMLParser(remove_blank_text=True) # Remove whitespace-only text nodes
-        tree = etree.parse(template_filepath, parser)
-        root = tree.getroot()
-
-        # Replace placeholders in metadata
-        timestamp_element = root.find(".//generated_at")
-        if timestamp_element is not None:
-            timestamp_element.text = datetime.now().isoformat()
-
-        # Find the <records> element to append data
-        records_element = root.find(".//records")
-        if records_element is None:
-            print("Error: '<records>' element not found in XML template.")
-            return None
-
-        # Populate the <records> element with data
-        for row_dict in data:
-            record_element = etree.SubElement(records_element, "record")
-            for key, value in row_dict.items():
-                field_element = etree.SubElement(record_element, key)
-                field_element.text = str(value) # Convert all values to string
-
-        # Write the modified XML to the output file
-        with open(output_filepath, 'wb') as f: # 'wb' for binary write with etree
-            f.write(etree.tostring(tree, pretty_print=True, encoding='utf-8', xml_declaration=True))
-
+        serializer = RowSerializer("xml", metadata=metadata)
+        _write_serialized(output_filepath, serializer, first_row, rows, flush_size, compression=compression)
         print(f"XML file created successfully at: {output_filepath}")
         return output_filepath
     except etree.XMLSyntaxError as e:
         print(f"Error parsing XML template: {e}")
         return None
+    except ValueError as e:
+        print(f"Error: {e}")
+        return None
     except IOError as e:
         print(f"Error creating XML file {output_filepath}: {e}")
         return None
@@ -134,6 +638,455 @@ def create_xml_file_from_template(data: list, output_filename: str = "data_expor
         print(f"An unexpected error occurred during XML creation: {e}")
         return None
 
+# PostgreSQL type OIDs mapped to Arrow type names; other types are exported as strings
+ARROW_TYPES_BY_OID = {
+    16: "bool",
+    20: "int64",
+    21: "int16",
+    23: "int32",
+    26: "int64",
+    700: "float32",
+    701: "float64",
+    1082: "date32",
+    1083: "time64",
+    1114: "timestamp",
+    1184: "timestamptz",
+    17: "binary",
+}
+
+def _import_pyarrow():
+    """Imports pyarrow, which is only needed for the Parquet and Arrow formats."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        import pyarrow.ipc
+    except ImportError as e:
+        raise ImportError("pyarrow is required for Parquet and Arrow exports: pip install pyarrow") from e
+    return pyarrow
+
+def _arrow_type(pa, description_column):
+    """Returns the Arrow type for a psycopg2 cursor description column."""
+    type_name = ARROW_TYPES_BY_OID.get(description_column.type_code)
+    if description_column.type_code == 1700 and description_column.precision \
+            and 0 < description_column.precision <= 38 and description_column.scale is not None:
+        return pa.decimal128(description_column.precision, description_column.scale)
+    if type_name == "time64":
+        return pa.time64("us")
+    if type_name == "timestamp":
+        return pa.timestamp("us")
+    if type_name == "timestamptz":
+        return pa.timestamp("us", tz="UTC")
+    if type_name is None:
+        return pa.string()
+    return getattr(pa, type_name)()
+
+def arrow_schema_from_description(description):
+    """
+    Builds an Arrow schema from a psycopg2 cursor description.
+
+    Integer, float, boolean, date, time, timestamp, bytea and declared
+    numeric(p, s) columns keep their types. Everything else (text, uuid,
+    json, undeclared numeric, ...) is exported as strings.
+    """
+    pa = _import_pyarrow()
+    return pa.schema([pa.field(column.name, _arrow_type(pa, column)) for column in description])
+
+def _to_arrow_column(pa, values: list, arrow_type):
+    """Converts one column of Python values to an Arrow array of `arrow_type`."""
+    if pa.types.is_string(arrow_type):
+        values = [None if value is None else
+                  value if isinstance(value, str) else
+                  json.dumps(value, default=str) if isinstance(value, (dict, list)) else str(value)
+                  for value in values]
+    elif pa.types.is_binary(arrow_type):
+        values = [None if value is None else bytes(value) for value in values]
+    return pa.array(values, type=arrow_type)
+
+def iter_record_batches(raw_batches: Iterable[tuple]) -> Iterator:
+    """
+    Converts the (description, rows) batches of `db_connector.iter_raw_batches_from_db`
+    into typed Arrow record batches, column by column, without building a
+    dictionary per row.
+
+    Yields:
+        pyarrow.RecordBatch: One record batch per fetched batch.
+    """
+    pa = _import_pyarrow()
+    schema = None
+    for description, rows in raw_batches:
+        if schema is None:
+            schema = arrow_schema_from_description(description)
+        columns = list(zip(*rows))
+        yield pa.RecordBatch.from_arrays(
+            [_to_arrow_column(pa, list(values), field.type) for values, field in zip(columns, schema)],
+            schema=schema
+        )
+
+def _iter_arrow_batches(pa, data: Iterable, batch_size: int) -> Iterator:
+    """
+    Yields Arrow record batches from either record batches or dict rows.
+
+    Dict rows are grouped into batches of `batch_size`, with the schema
+    inferred from the first batch and applied to all later ones.
+    """
+    schema = None
+    rows = []
+    for item in data:
+        if isinstance(item, pa.RecordBatch):
+            yield item
+            continue
+        rows.append(item)
+        if len(rows) >= batch_size:
+            batch = pa.RecordBatch.from_pylist(rows, schema=schema)
+            schema = batch.schema
+            rows = []
+            yield batch
+    if rows:
+        yield pa.RecordBatch.from_pylist(rows, schema=schema)
+
+def create_parquet_file(data: Iterable, filename: str = "data_export.parquet",
+                        codec: str | None = None,
+                        row_group_size: int = settings.PARQUET_ROW_GROUP_SIZE,
+                        use_dictionary: bool = True) -> str | None:
+    """
+    Creates a Parquet file from record batches or dictionaries.
+
+    Batches are buffered until `row_group_size` rows are available and then
+    written as one row group, so peak memory is about one row group. Typed
+    record batches from `iter_record_batches` are written as-is; dict rows
+    are converted with their types inferred from the first batch.
+
+    Args:
+        data (Iterable): pyarrow.RecordBatch objects (e.g. from `iter_record_batches`)
+                         or a list or iterator of dictionaries.
+        filename (str): The name of the Parquet file to create.
+        codec (str | None): The codec used inside the file ("zstd", "snappy",
+                            "gzip" or "none"). Defaults to COLUMNAR_COMPRESSION.
+        row_group_size (int): The number of rows per row group.
+        use_dictionary (bool): Dictionary-encode columns, which shrinks
+                               low-cardinality columns considerably.
+
+    Returns:
+        str | None: The full path to the created file if successful, None otherwise.
+    """
+    pa = _import_pyarrow()
+    batches = _iter_arrow_batches(pa, data, row_group_size)
+    first_batch = next(batches, None)
+    if first_batch is None:
+        print("No data provided to create Parquet file.")
+        return None
+
+    filepath = get_output_filepath(filename)
+    try:
+        with pa.parquet.ParquetWriter(filepath, first_batch.schema,
+                                      compression=codec or settings.COLUMNAR_COMPRESSION,
+                                      use_dictionary=use_dictionary) as writer:
+            pending = []
+            pending_rows = 0
+            for batch in itertools.chain([first_batch], batches):
+                pending.append(batch)
+                pending_rows += batch.num_rows
+                if pending_rows >= row_group_size:
+                    writer.write_table(pa.Table.from_batches(pending), row_group_size=row_group_size)
+                    pending = []
+                    pending_rows = 0
+            if pending:
+                writer.write_table(pa.Table.from_batches(pending), row_group_size=row_group_size)
+        print(f"Parquet file created successfully at: {filepath}")
+        return filepath
+    except (IOError, ValueError, pa.ArrowException) as e:
+        print(f"Error creating Parquet file {filepath}: {e}")
+        return None
+
+def create_arrow_file(data: Iterable, filename: str = "data_export.arrow",
+                      codec: str | None = None,
+                      batch_size: int = settings.PARQUET_ROW_GROUP_SIZE) -> str | None:
+    """
+    Creates an Arrow IPC file from record batches or dictionaries.
+
+    Each record batch is written as it arrives, so the file can be
+    memory-mapped and scanned by readers without any decoding.
+
+    Args:
+        data (Iterable): pyarrow.RecordBatch objects (e.g. from `iter_record_batches`)
+                         or a list or iterator of dictionaries.
+        filename (str): The name of the Arrow file to create.
+        codec (str | None): The buffer codec ("zstd", "lz4" or "none").
+                            Defaults to COLUMNAR_COMPRESSION; a Parquet-only
+                            codec such as "snappy" fails the export.
+        batch_size (int): The number of dict rows per record batch.
+
+    Returns:
+        str | None: The full path to the created file if successful, None otherwise.
+    """
+    pa = _import_pyarrow()
+    batches = _iter_arrow_batches(pa, data, batch_size)
+    first_batch = next(batches, None)
+    if first_batch is None:
+        print("No data provided to create Arrow file.")
+        return None
+
+    filepath = get_output_filepath(filename)
+    codec = codec or settings.COLUMNAR_COMPRESSION
+    try:
+        options = pa.ipc.IpcWriteOptions(compression=None if codec == "none" else codec)
+        with pa.ipc.new_file(filepath, first_batch.schema, options=options) as writer:
+            for batch in itertools.chain([first_batch], batches):
+                writer.write_batch(batch)
+        print(f"Arrow file created successfully at: {filepath}")
+        return filepath
+    except (IOError, ValueError, pa.ArrowException) as e:
+        print(f"Error creating Arrow file {filepath}: {e}")
+        return None
+
+# Writer for each supported output format, called as writer(data, filename). Only the
+# text formats take compression=...; use `write_file` to pass it for any format.
+FILE_WRITERS = {
+    "csv": create_csv_file,
+    "json": create_json_file,
+    "jsonl": create_jsonl_file,
+    "xml": create_xml_file_from_template,
+    "parquet": create_parquet_file,
+    "arrow": create_arrow_file,
+}
+
+def output_compression(file_format: str, compression: str | None) -> str | None:
+    """
+    Returns the compression applied to a whole file of `file_format`.
+
+    Parquet and Arrow files compress their data internally (see
+    COLUMNAR_COMPRESSION) and are never wrapped in gzip or zstd.
+    """
+    return compression if file_format in RowSerializer.FORMATS else None
+
+def write_file(data: Iterable, file_format: str, filename: str,
+               compression: str | None = settings.OUTPUT_COMPRESSION) -> str | None:
+    """Writes `data` with the FILE_WRITERS entry of `file_format`, compressing text formats with `compression`."""
+    writer = FILE_WRITERS[file_format]
+    if file_format in RowSerializer.FORMATS:
+        return writer(data, filename, compression=compression)
+    return writer(data, filename)
+
+def create_file_cached(data: Iterable[dict], file_format: str, filename: str,
+                       compression: str | None = settings.OUTPUT_COMPRESSION) -> tuple[str | None, str | None]:
+    """
+    Creates an export file, reusing the output of an identical earlier export.
+
+    The cache key combines a hash of the rows with the format, the compression
+    and, for XML, the template (see `export_cache.build_cache_key`). When `data` is a list
+    it is hashed first and, on a cache hit, the cached file is copied to the
+    output path without serializing anything. Iterators are hashed while
+    they are written, since they can only be consumed once. Either way the
+    returned key lets `api_sender.upload_file_to_api` skip an upload of the
+    same data to the same endpoint.
+
+    Args:
+        data (Iterable[dict]): A list or iterator of dictionaries, where each dictionary is a row.
+        file_format (str): A FILE_WRITERS format.
+        filename (str): The name of the file to create.
+        compression (str | None): None, "gzip" or "zstd" for the text formats. See `open_output_file`.
+
+    Returns:
+        tuple: (file_path, cache_key). `file_path` is None if no file was created.
+    """
+    compression = output_compression(file_format, compression)
+    template_path = _get_template_filepath() if file_format == "xml" else None
+
+    if isinstance(data, list):
+        cache_key = export_cache.build_cache_key(export_cache.hash_rows(data), file_format, template_path,
+                                                 compression)
+        entry = export_cache.lookup(cache_key)
+        if entry is not None:
+            filepath = export_cache.restore(entry, get_compressed_filepath(get_output_filepath(filename), compression))
+            print(f"Data unchanged since the last export. Reused cached file at: {filepath}")
+            return filepath, cache_key
+        filepath = write_file(data, file_format, filename, compression)
+    else:
+        hasher = hashlib.sha256()
+        filepath = write_file(export_cache.iter_hashed_rows(data, hasher), file_format, filename, compression)
+        cache_key = export_cache.build_cache_key(hasher.hexdigest(), file_format, template_path, compression)
+
+    if filepath is None:
+        return None, None
+    try:
+        export_cache.store(cache_key, filepath)
+    except (OSError, ValueError) as e:
+        # A broken cache must never fail the export itself
+        print(f"Error caching export {filepath}: {e}")
+    return filepath, cache_key
+
+def get_part_filepath(filename: str, part_number: int, compression: str | None = None) -> str:
+    """Returns the path of a part file, e.g. 'export.part-00001.csv' for part 1 of 'export.csv'."""
+    root, extension = os.path.splitext(filename)
+    return get_compressed_filepath(get_output_filepath(f"{root}.part-{part_number:05d}{extension}"), compression)
+
+def _encoded_size(text: str) -> int:
+    """Returns the UTF-8 size of text, without encoding it when it is ASCII."""
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+def _write_text_parts(rows: Iterator[dict], file_format: str, filename: str, max_rows: int, max_bytes: int,
+                      compression: str | None, flush_size: int, metadata: dict | None, on_close: Callable):
+    """
+    Writes rows into consecutive part files of a text format, each a complete document.
+
+    A part is closed before a row that would take it past `max_rows` rows or
+    `max_bytes` bytes (uncompressed, including its footer). A part always
+    holds at least one row, so a single row larger than `max_bytes` gets a part of its own.
+    If a row fails to serialize, the open part is closed and deleted before
+    the error is raised; parts already passed to `on_close` are kept.
+    """
+    part = None
+    part_number = 0
+    fieldnames = None
+    try:
+        for row_dict in rows:
+            if fieldnames is None:
+                fieldnames = list(row_dict.keys()) # Every CSV part repeats the same header
+            if part is not None:
+                row_text = part["serializer"].serialize_row(row_dict)
+                row_size = _encoded_size(row_text)
+                if (max_rows and part["rows"] >= max_rows) or \
+                        (max_bytes and part["bytes"] + row_size + part["footer_size"] > max_bytes):
+                    closed_path, closed_rows = _close_text_part(part), part["rows"]
+                    part = None
+                    on_close(closed_path, closed_rows)
+            if part is None:
+                serializer = RowSerializer(file_format, fieldnames, metadata=metadata)
+                part_number += 1
+                part_path = get_part_filepath(filename, part_number, compression)
+                part = {
+                    "path": part_path,
+                    "file": open_output_file(part_path, compression, newline='' if file_format == "csv" else None),
+                    "serializer": serializer,
+                    "buffer": [serializer.start(row_dict)],
+                    "rows": 0,
+                }
+                part["bytes"] = _encoded_size(part["buffer"][0])
+                part["footer_size"] = _encoded_size(serializer.finish())
+                part["buffered"] = len(part["buffer"][0])
+                row_text = serializer.serialize_row(row_dict)
+                row_size = _encoded_size(row_text)
+            part["buffer"].append(row_text)
+            part["buffered"] += len(row_text)
+            part["bytes"] += row_size
+            part["rows"] += 1
+            if part["buffered"] >= flush_size:
+                part["file"].write("".join(part["buffer"]))
+                part["buffer"].clear()
+                part["buffered"] = 0
+        if part is not None:
+            closed_path, closed_rows = _close_text_part(part), part["rows"]
+            part = None
+            on_close(closed_path, closed_rows)
+    except BaseException:
+        # A part left open by a failing row or footer is incomplete: close and remove it
+        if part is not None:
+            part["file"].close()
+            if os.path.exists(part["path"]):
+                os.remove(part["path"])
+        raise
+
+def _close_text_part(part: dict) -> str:
+    """Writes the footer and closes a part opened by `_write_text_parts`, returning its path."""
+    part["buffer"].append(part["serializer"].finish())
+    with part["file"] as output_file:
+        output_file.write("".join(part["buffer"]))
+    return part["path"]
+
+def create_sharded_files(data: Iterable[dict], file_format: str, filename: str,
+                         max_rows: int = settings.OUTPUT_PART_MAX_ROWS,
+                         max_bytes: int = settings.OUTPUT_PART_MAX_BYTES,
+                         compression: str | None = settings.OUTPUT_COMPRESSION,
+                         on_part: Callable[[str], None] | None = None,
+                         flush_size: int = settings.OUTPUT_FLUSH_SIZE,
+                         metadata: dict | None = None) -> str | None:
+    """
+    Writes an export as a series of part files, starting a new part after `max_rows` rows or `max_bytes` bytes.
+
+    Every part is a complete document of its format: CSV parts repeat the
+    header, JSON parts are arrays of their own, and XML parts repeat the
+    template with the same metadata. Parts are named like
+    'export.part-00001.csv' and listed, once all are written, in the manifest
+    'export.manifest.json' with their row counts and sizes.
+
+    Each part is passed to `on_part` as soon as it is closed, e.g.
+    `api_sender.PartUploader.submit`, so parts can be uploaded while later ones
+    are still being written.
+
+    Args:
+        data (Iterable[dict]): A list or iterator of dictionaries, where each dictionary is a row.
+        file_format (str): One of FILE_WRITERS. Parquet and Arrow parts are split
+                           by `max_rows` only, since their size is known once
+                           written; `max_bytes` then fails the export if a part
+                           exceeds it, and cannot be used without `max_rows`.
+        filename (str): The name the part and manifest names are derived from.
+        max_rows (int): The maximum number of rows per part; 0 for no limit.
+        max_bytes (int): The maximum uncompressed size of a part in bytes; 0 for no limit.
+        compression (str | None): None, "gzip" or "zstd" for the text formats. See `open_output_file`.
+        on_part (Callable | None): Called with the path of each part once it is complete.
+        flush_size (int): The number of characters buffered between writes.
+        metadata (dict | None): Values for "{{ name }}" placeholders in the XML template.
+
+    Returns:
+        str | None: The path of the manifest, or None if no file was created.
+    """
+    first_row, rows = _peek_rows(data)
+    if first_row is None:
+        print(f"No data provided to create {file_format} part files.")
+        return None
+    if file_format not in FILE_WRITERS:
+        print(f"Unsupported format '{file_format}'. Expected one of: {', '.join(FILE_WRITERS)}.")
+        return None
+    if file_format not in RowSerializer.FORMATS and max_bytes and not max_rows:
+        print(f"{file_format} parts can only be split by rows. Set a row limit (OUTPUT_PART_MAX_ROWS) "
+              f"that keeps parts within {max_bytes} bytes.")
+        return None
+
+    parts = []
+    def close_part(filepath: str, row_count: int):
+        parts.append({"file": os.path.basename(filepath), "rows": row_count, "bytes": os.path.getsize(filepath)})
+        print(f"Part {len(parts)} with {row_count} rows written to: {filepath}")
+        if on_part:
+            on_part(filepath)
+
+    try:
+        if file_format in RowSerializer.FORMATS:
+            # All XML parts carry the same generation time
+            metadata = {"current_timestamp": datetime.now().isoformat(), **(metadata or {})}
+            _write_text_parts(rows, file_format, filename, max_rows, max_bytes, compression, flush_size,
+                              metadata, close_part)
+        else:
+            while True:
+                part_first_row, part_rows = _peek_rows(itertools.islice(rows, max_rows) if max_rows else rows)
+                if part_first_row is None:
+                    break
+                # zip stops before drawing from the counter once the rows run out, so it ends at the row count
+                row_count = itertools.count()
+                counted_rows = (row_dict for row_dict, _ in zip(part_rows, row_count))
+                part_filename = os.path.basename(get_part_filepath(filename, len(parts) + 1))
+                filepath = FILE_WRITERS[file_format](counted_rows, part_filename)
+                if filepath is None:
+                    return None
+                if max_bytes and os.path.getsize(filepath) > max_bytes:
+                    print(f"Part {filepath} is {os.path.getsize(filepath)} bytes, over the {max_bytes} byte limit. "
+                          f"Lower the row limit (OUTPUT_PART_MAX_ROWS).")
+                    return None
+                close_part(filepath, next(row_count))
+    except (IOError, ValueError) as e:
+        print(f"Error creating {file_format} part files for {filename}: {e}")
+        return None
+
+    manifest_path = get_output_filepath(f"{os.path.splitext(filename)[0]}.manifest.json")
+    write_json_atomic(manifest_path, {
+        "format": file_format,
+        "compression": output_compression(file_format, compression),
+        "created_at": datetime.now().isoformat(),
+        "total_rows": sum(part["rows"] for part in parts),
+        "parts": parts,
+    })
+    print(f"Wrote {len(parts)} part files, listed in manifest: {manifest_path}")
+    return manifest_path
+
 # Example usage
 if __name__ == "__main__":
     sample_data = [
@@ -143,11 +1096,14 @@ if __name__ == "__main__":
     ]
     csv_path = create_csv_file(sample_data, "sample_data.csv")
     json_path = create_json_file(sample_data, "sample_data.json")
+    jsonl_path = create_jsonl_file(sample_data, "sample_data.jsonl")
     xml_path = create_xml_file_from_template(sample_data, "sample_data.xml") # New example
 
     if csv_path:
         print(f"CSV file available at: {csv_path}")
     if json_path:
         print(f"JSON file available at: {json_path}")
+    if jsonl_path:
+        print(f"JSON Lines file available at: {jsonl_path}")
     if xml_path:
         print(f"XML file available at: {xml_path}")
\ No newline at end of file
@@ -0,0 +1,68 @@
+# your_project_name/file_handler/state_files.py
+
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError: # Windows: only threads of one process are synchronized
+    fcntl = None
+
+# One in-process lock per locked path
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+@contextmanager
+def locked_file(path: str):
+    """
+    Holds an exclusive lock on `path` for a read-modify-write cycle.
+
+    Threads are serialized with an in-process lock, and processes (e.g. the
+    workers of pipeline.job_runner) by flocking a "<path>.lock" file next to it.
+    The locked file itself does not need to exist.
+    """
+    path = os.path.abspath(path)
+    with _thread_locks_guard:
+        thread_lock = _thread_locks.setdefault(path, threading.Lock())
+    with thread_lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".lock", 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def read_json_state(path: str) -> dict:
+    """Reads a JSON state file, returning an empty state if it does not exist."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def write_json_atomic(path: str, state: dict):
+    """
+    Writes a JSON state file atomically.
+
+    The data goes to a temporary file in the same directory that is fsynced
+    and renamed over `path`, so a crash never leaves a partially written file.
+    Hold `locked_file(path)` around the read-modify-write cycle.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix="." + os.path.basename(path) + "-", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=4, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
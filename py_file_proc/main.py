@@ -1,45 +1,150 @@
 # your_project_name/main.py
 
 import os
+import sys
+import asyncio
 from your_project_name.database import db_connector
 from your_project_name.file_handler import file_operations
 from your_project_name.api_client import api_sender
+from your_project_name.pipeline import async_runner, job_runner, watermark_store
 from your_project_name.config import settings
 
-def run_data_pipeline():
+def run_data_pipeline(stream: bool = False, partitions: int = 1, engine: str = settings.PIPELINE_ENGINE,
+                      incremental: bool = False, output_format: str = "xml",
+                      direct_upload: bool = settings.PIPELINE_DIRECT_UPLOAD):
     """
     Orchestrates the data extraction, file creation, and API upload process.
+
+    Args:
+        stream (bool): If True, rows are streamed from a server-side cursor
+                       straight into the file writer instead of being loaded
+                       into memory first. Recommended for large exports.
+        partitions (int): If greater than 1, the query is split into this many
+                          user_id ranges that are read concurrently on pooled
+                          connections.
+        engine (str): "sync" runs the steps below one after another. "async"
+                      runs extraction, serialization and upload concurrently
+                      with bounded queues between them (see
+                      pipeline.async_runner). The upload overlaps the
+                      other stages only with UPLOAD_MODE "chunked"; other
+                      modes upload the finished file. `stream`,
+                      `partitions` and `incremental` do not apply to it,
+                      and it cannot write Parquet or Arrow or part files
+                      (OUTPUT_PART_MAX_ROWS/BYTES) or be combined with
+                      `direct_upload`.
+        incremental (bool): If True, only rows with a created_at later than
+                            the watermark saved by the last successful run
+                            are exported. The watermark advances only after
+                            the upload succeeds.
+        output_format (str): "xml", "csv", "json", "jsonl", "parquet" or "arrow".
+                             With `stream`, Parquet and Arrow files are built
+                             from the cursor's typed result batches directly.
+        direct_upload (bool): If True, rows are streamed from a server-side
+                              cursor through the serializer (and compressor)
+                              into the upload request body, without writing
+                              a file (see api_sender.stream_rows_to_api). Not
+                              available for Parquet and Arrow or with the
+                              async engine; part files and the export cache
+                              do not apply.
     """
     print("Starting data pipeline...")
+    sharded = bool(settings.OUTPUT_PART_MAX_ROWS or settings.OUTPUT_PART_MAX_BYTES) and not direct_upload
+    if direct_upload and output_format not in file_operations.RowSerializer.FORMATS:
+        print(f"Direct upload does not support the '{output_format}' format. Aborting.")
+        return
 
     # 1. Define your SQL query to fetch data
     # IMPORTANT: Replace with your actual table and column names
     sql_query = "SELECT user_id, username, email, created_at FROM users WHERE status = 'active';"
 
+    if engine == "async":
+        if output_format not in file_operations.RowSerializer.FORMATS:
+            print(f"The async engine does not support the '{output_format}' format. Aborting.")
+            return
+        if direct_upload:
+            print("The async engine does not support direct upload; disable PIPELINE_DIRECT_UPLOAD "
+                  "or use the sync engine. Aborting.")
+            return
+        if sharded:
+            print("The async engine does not write part files; unset OUTPUT_PART_MAX_ROWS and "
+                  "OUTPUT_PART_MAX_BYTES or use the sync engine. Aborting.")
+            return
+        upload_success = asyncio.run(async_runner.run_pipeline_async(
+            sql_query, f"active_users_export.{output_format}", output_format))
+        if upload_success:
+            print("Data pipeline completed successfully: Data fetched, file created, and uploaded.")
+        else:
+            print("Data pipeline completed with errors.")
+        return
+
+    watermark_tracker = {}
+    if incremental:
+        last_watermark = watermark_store.load_watermark("active_users")
+        print(f"Incremental export of rows with created_at after {last_watermark}.")
+        sql_query = db_connector.build_incremental_query(sql_query, "created_at", last_watermark)
+
     # 2. Fetch data from PostgreSQL
-    data = db_connector.fetch_data_from_db(sql_query)
+    if stream or direct_upload:
+        # Rows are pulled lazily in batches of settings.DB_FETCH_BATCH_SIZE;
+        # an empty result is detected by the file writer below.
+        if partitions > 1:
+            data = db_connector.iter_rows_partitioned(sql_query, "user_id", partitions)
+        elif output_format in ("parquet", "arrow") and not incremental and not settings.EXPORT_CACHE_ENABLED \
+                and not sharded:
+            # Columnar formats skip the per-row dictionaries (the watermark, cache and part files need them)
+            data = file_operations.iter_record_batches(db_connector.iter_raw_batches_from_db(sql_query))
+        else:
+            data = db_connector.iter_rows_from_db(sql_query)
+        if incremental:
+            data = db_connector.track_watermark(data, "created_at", watermark_tracker)
+    else:
+        if partitions > 1:
+            data = db_connector.fetch_data_partitioned(sql_query, "user_id", partitions)
+        else:
+            data = db_connector.fetch_data_from_db(sql_query)
+        if incremental:
+            data = list(db_connector.track_watermark(data, "created_at", watermark_tracker))
 
-    if not data:
-        print("No data fetched from the database. Aborting file creation and upload.")
-        return
+        if not data:
+            print("No data fetched from the database. Aborting file creation and upload.")
+            return
 
     # 3. Create a file with the fetched data
-    # You can choose to create CSV, JSON, or XML
-    output_filename = "active_users_export.xml" # Changed to XML for demonstration
-    file_path = file_operations.create_xml_file_from_template(data, output_filename)
-    # Uncomment below for other formats if needed:
-    # file_path = file_operations.create_csv_file(data, "active_users_export.csv")
-    # file_path = file_operations.create_json_file(data, "active_users_export.json")
-
-    if not file_path:
-        print("Failed to create the output file. Aborting upload.")
-        return
+    # You can choose to create CSV, JSON, JSON Lines, XML, Parquet or Arrow (XML by default)
+    output_filename = f"active_users_export.{output_format}"
+    if direct_upload:
+        # 3-4. Serialize the rows into the upload request body as they are read; no file is written
+        print(f"Streaming {output_filename} directly to the API endpoint.")
+        upload_success = api_sender.stream_rows_to_api(data, output_format, output_filename)
+    elif sharded:
+        # 3-4. Write part files within OUTPUT_PART_MAX_ROWS/BYTES, uploading each as soon as it is
+        # closed, then upload the manifest listing them once all parts are delivered
+        with api_sender.PartUploader() as uploader:
+            manifest_path = file_operations.create_sharded_files(data, output_format, output_filename,
+                                                                 on_part=uploader.submit)
+        if not manifest_path:
+            print("Failed to create the output files. Aborting upload.")
+            return
+        upload_success = uploader.succeeded and api_sender.upload_file_to_api(manifest_path)
+    else:
+        cache_key = None
+        if settings.EXPORT_CACHE_ENABLED:
+            # Reuses the previous file (and skips its upload) when the data has not changed
+            file_path, cache_key = file_operations.create_file_cached(data, output_format, output_filename)
+        else:
+            file_path = file_operations.FILE_WRITERS[output_format](data, output_filename)
 
-    # 4. Push the created file to the API endpoint
-    print(f"Attempting to upload file: {file_path}")
-    upload_success = api_sender.upload_file_to_api(file_path)
+        if not file_path:
+            print("Failed to create the output file. Aborting upload.")
+            return
+
+        # 4. Push the created file to the API endpoint
+        print(f"Attempting to upload file: {file_path}")
+        upload_success = api_sender.upload_file_to_api(file_path, cache_key=cache_key)
 
     if upload_success:
+        if watermark_tracker.get("watermark") is not None:
+            watermark_store.save_watermark("active_users", watermark_tracker["watermark"])
         print("Data pipeline completed successfully: Data fetched, file created, and uploaded.")
         # Optional: Clean up the local file after successful upload
         # os.remove(file_path)
@@ -47,5 +152,34 @@ def run_data_pipeline():
     else:
         print("Data pipeline completed with errors: File upload failed.")
 
+def run_job_manifest(manifest_path: str) -> bool:
+    """
+    Runs every export job listed in a JSON/YAML manifest in this process.
+
+    Jobs run concurrently on a pool of JOB_MAX_WORKERS workers (see
+    pipeline.job_runner), so a single container run can replace one
+    container per export.
+
+    Args:
+        manifest_path (str): The path of the job manifest.
+
+    Returns:
+        bool: True if no job failed.
+    """
+    print(f"Starting export jobs from manifest: {manifest_path}")
+    try:
+        jobs = job_runner.load_job_manifest(manifest_path)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"Error reading job manifest '{manifest_path}': {e}")
+        return False
+
+    results = job_runner.run_jobs(jobs)
+    job_runner.print_job_summary(results)
+    return all(result["status"] != "failed" for result in results)
+
 if __name__ == "__main__":
+    # A manifest can be passed as the first argument or through JOB_MANIFEST_PATH
+    manifest_path = sys.argv[1] if len(sys.argv) > 1 else settings.JOB_MANIFEST_PATH
+    if manifest_path:
+        sys.exit(0 if run_job_manifest(manifest_path) else 1)
     run_data_pipeline()
\ No newline at end of file
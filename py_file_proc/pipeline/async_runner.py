@@ -0,0 +1,213 @@
+# your_project_name/pipeline/async_runner.py
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+import uuid
+
+from your_project_name.database import db_connector
+from your_project_name.file_handler import file_operations
+from your_project_name.api_client import api_sender
+from your_project_name.config import settings
+
+# Marks the end of a stage's output in the queues between stages
+_DONE = object()
+
+def _extract_into_queue(query: str, batch_size: int, batch_queue: asyncio.Queue,
+                        loop: asyncio.AbstractEventLoop, stop_event: threading.Event):
+    """
+    Worker thread: streams row batches from the database into `batch_queue`.
+
+    Each put waits until the queue has room, so a slow consumer throttles the
+    database reads instead of letting batches pile up in memory.
+    """
+    batches = db_connector.iter_row_batches_from_db(query, batch_size, require_connection=True)
+    try:
+        for batch in batches:
+            future = asyncio.run_coroutine_threadsafe(batch_queue.put(batch), loop)
+            while True:
+                if stop_event.is_set():
+                    future.cancel()
+                    return
+                try:
+                    future.result(timeout=0.1)
+                    break
+                except concurrent.futures.TimeoutError:
+                    continue
+    finally:
+        batches.close() # Returns the connection to the pool right away
+
+async def _extract_stage(query: str, batch_size: int, batch_queue: asyncio.Queue, stop_event: threading.Event):
+    """Stage 1: database extraction, offloaded to a thread because psycopg2 is blocking."""
+    loop = asyncio.get_running_loop()
+    await asyncio.to_thread(_extract_into_queue, query, batch_size, batch_queue, loop, stop_event)
+    await batch_queue.put(_DONE)
+
+def _append_to_file(filepath: str, data: bytes, mode: str = 'ab'):
+    """Writes serialized bytes to the local output file."""
+    with open(filepath, mode) as output_file:
+        output_file.write(data)
+
+def _serialize_batch(serializer: file_operations.RowSerializer, batch: list, first: bool, compressor=None) -> bytes:
+    """Serializes (and compresses) a batch of rows, preceded by the file header for the first batch."""
+    text = serializer.start(batch[0]) if first else ""
+    data = (text + serializer.serialize(batch)).encode("utf-8")
+    return compressor.compress(data) if compressor else data
+
+def _finish_serialization(serializer: file_operations.RowSerializer, compressor=None) -> bytes:
+    """Returns the file footer, followed by the rest of the compressed stream."""
+    data = serializer.finish().encode("utf-8")
+    return compressor.compress(data) + compressor.flush() if compressor else data
+
+async def _serialize_stage(file_format: str, filepath: str, batch_queue: asyncio.Queue,
+                           upload_queue: asyncio.Queue, compression: str | None = None) -> int:
+    """
+    Stage 2: serializes row batches, compresses them with `compression` (if
+    any), writes them to the local file and hands the bytes to the upload stage.
+
+    Returns:
+        int: The number of rows serialized.
+    """
+    serializer = file_operations.RowSerializer(file_format)
+    compressor = file_operations.open_compressor(compression) if compression else None
+    row_count = 0
+    while True:
+        batch = await batch_queue.get()
+        if batch is _DONE:
+            break
+        if not batch:
+            continue
+        data = await asyncio.to_thread(_serialize_batch, serializer, batch, row_count == 0, compressor)
+        await asyncio.to_thread(_append_to_file, filepath, data, 'ab' if row_count else 'wb')
+        row_count += len(batch)
+        if data: # The compressor may hold the batch back until it has a full block
+            await upload_queue.put(data)
+    if row_count:
+        data = await asyncio.to_thread(_finish_serialization, serializer, compressor)
+        await asyncio.to_thread(_append_to_file, filepath, data)
+        await upload_queue.put(data)
+    await upload_queue.put(_DONE)
+    return row_count
+
+async def _upload_stage(filepath: str, upload_queue: asyncio.Queue, upload_mode: str,
+                        api_endpoint: str, api_key: str) -> bool:
+    """
+    Stage 3: uploads the export.
+
+    In "chunked" mode every UPLOAD_CHUNK_SIZE bytes are sent as soon as they
+    are serialized, overlapping the upload with extraction and serialization.
+    Other modes upload the finished file once serialization is complete, so
+    they only overlap extraction with serialization.
+
+    Returns:
+        bool: True if the upload succeeded or there was nothing to upload.
+
+    Raises:
+        RuntimeError: If a chunk is rejected, so that the other stages are cancelled
+                      instead of waiting on a queue nobody reads any more.
+    """
+    if upload_mode != "chunked":
+        received = False
+        while (data := await upload_queue.get()) is not _DONE:
+            received = True
+        if not received:
+            return True
+        return await asyncio.to_thread(api_sender.upload_file_to_api, filepath, api_endpoint, api_key, upload_mode)
+
+    upload_id = uuid.uuid4().hex
+    filename = os.path.basename(filepath)
+    content_type = api_sender.get_content_type(filepath)
+    content_encoding = api_sender.get_content_encoding(filepath)
+    buffer = bytearray()
+    offset = 0
+    received = False
+    while True:
+        data = await upload_queue.get()
+        if data is _DONE:
+            break
+        received = True
+        buffer.extend(data)
+        while len(buffer) >= settings.UPLOAD_CHUNK_SIZE:
+            chunk = bytes(buffer[:settings.UPLOAD_CHUNK_SIZE])
+            del buffer[:settings.UPLOAD_CHUNK_SIZE]
+            if not await asyncio.to_thread(api_sender.send_upload_chunk, chunk, offset, upload_id, filename,
+                                           content_type, None, api_endpoint, api_key,
+                                           content_encoding=content_encoding):
+                raise RuntimeError(f"Upload {upload_id} failed at offset {offset}.")
+            offset += len(chunk)
+    if not received:
+        return True
+    # The last chunk carries the total size, which tells the server the upload is complete
+    chunk = bytes(buffer)
+    if not await asyncio.to_thread(api_sender.send_upload_chunk, chunk, offset, upload_id, filename,
+                                   content_type, offset + len(chunk), api_endpoint, api_key,
+                                   content_encoding=content_encoding):
+        raise RuntimeError(f"Upload {upload_id} failed at offset {offset}.")
+    print(f"File '{filename}' uploaded successfully to {api_endpoint} in chunks (upload id {upload_id}).")
+    return True
+
+async def run_pipeline_async(query: str, output_filename: str, file_format: str = "xml",
+                             api_endpoint: str = settings.API_ENDPOINT, api_key: str = settings.API_KEY,
+                             upload_mode: str = settings.UPLOAD_MODE,
+                             batch_size: int = settings.DB_FETCH_BATCH_SIZE,
+                             queue_size: int = settings.PIPELINE_QUEUE_SIZE,
+                             compression: str | None = settings.OUTPUT_COMPRESSION) -> bool:
+    """
+    Runs extraction, serialization and upload as concurrent stages.
+
+    The stages are connected by queues of at most `queue_size` items, so while
+    one batch is being serialized the next is already being fetched, and
+    memory stays bounded because a slow stage blocks the stage before it. If
+    any stage fails, the others are cancelled.
+
+    Args:
+        query (str): The SQL query to export.
+        output_filename (str): The name of the local output file.
+        file_format (str): "csv", "json", "jsonl" or "xml".
+        api_endpoint (str): The URL of the upload endpoint.
+        api_key (str): The API key for authentication (if required by the API).
+        upload_mode (str): An `api_sender.upload_file_to_api` mode. Only
+                           "chunked" uploads while the file is still being
+                           written; the other modes wait for the whole file.
+        batch_size (int): The number of rows fetched per round trip.
+        queue_size (int): The capacity of each queue between stages.
+        compression (str | None): "gzip" or "zstd" to compress the file (and
+                                  the uploaded bytes) as it is written; the
+                                  extension is appended to `output_filename`.
+
+    Returns:
+        bool: True if data was exported and uploaded, False otherwise.
+    """
+    filepath = file_operations.get_compressed_filepath(file_operations.get_output_filepath(output_filename),
+                                                       compression)
+    batch_queue = asyncio.Queue(maxsize=queue_size)
+    upload_queue = asyncio.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+
+    extract_task = asyncio.create_task(_extract_stage(query, batch_size, batch_queue, stop_event))
+    serialize_task = asyncio.create_task(_serialize_stage(file_format, filepath, batch_queue, upload_queue,
+                                                            compression))
+    upload_task = asyncio.create_task(_upload_stage(filepath, upload_queue, upload_mode, api_endpoint, api_key))
+    tasks = [extract_task, serialize_task, upload_task]
+
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            if task.exception() is not None:
+                raise task.exception()
+    except Exception as e:
+        print(f"Async pipeline failed: {e}")
+        return False
+    finally:
+        stop_event.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    row_count = serialize_task.result()
+    if not row_count:
+        print("No data fetched from the database. Nothing was uploaded.")
+        return False
+    print(f"Exported {row_count} rows to {filepath}.")
+    return upload_task.result()
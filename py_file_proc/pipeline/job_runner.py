@@ -0,0 +1,188 @@
+# your_project_name/pipeline/job_runner.py
+
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from your_project_name.database import db_connector
+from your_project_name.file_handler import file_operations
+from your_project_name.api_client import api_sender
+from your_project_name.pipeline import watermark_store
+from your_project_name.config import settings
+
+REQUIRED_JOB_KEYS = ("name", "query", "format", "filename")
+
+def load_job_manifest(manifest_path: str) -> list:
+    """
+    Reads a job manifest listing the exports to run.
+
+    The manifest is a JSON or YAML file (chosen by extension) containing
+    either a list of jobs or a mapping with a "jobs" list. Each job needs
+    "name", "query", "format" (csv, json, jsonl or xml) and "filename", and
+    may set "endpoint", "upload_mode" and "compression" to override
+    API_ENDPOINT, UPLOAD_MODE and OUTPUT_COMPRESSION. A job with a
+    "watermark_column" is incremental: it only exports rows past the
+    watermark saved by its last successful run.
+
+    Example (YAML):
+        jobs:
+          - name: active_users
+            query: SELECT user_id, username, email FROM users WHERE status = 'active';
+            format: xml
+            filename: active_users_export.xml
+
+    Args:
+        manifest_path (str): The path of the manifest file.
+
+    Returns:
+        list: The job dictionaries.
+
+    Raises:
+        ValueError: If the manifest is malformed.
+        ImportError: If a YAML manifest is given and PyYAML is not installed.
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as manifest_file:
+        if manifest_path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError("PyYAML is required for YAML job manifests: pip install PyYAML") from e
+            try:
+                manifest = yaml.safe_load(manifest_file)
+            except yaml.YAMLError as e:
+                raise ValueError(f"Invalid YAML in job manifest: {e}") from e
+        else:
+            manifest = json.load(manifest_file)
+
+    jobs = manifest.get("jobs") if isinstance(manifest, dict) else manifest
+    if not isinstance(jobs, list) or not jobs:
+        raise ValueError(f"Job manifest '{manifest_path}' does not contain a list of jobs.")
+
+    names = set()
+    for index, job in enumerate(jobs):
+        if not isinstance(job, dict):
+            raise ValueError(f"Job #{index + 1} in '{manifest_path}' is not a mapping.")
+        missing = [key for key in REQUIRED_JOB_KEYS if not job.get(key)]
+        if missing:
+            raise ValueError(f"Job #{index + 1} in '{manifest_path}' is missing: {', '.join(missing)}.")
+        if job["format"] not in file_operations.FILE_WRITERS:
+            raise ValueError(f"Job '{job['name']}' has unsupported format '{job['format']}'. "
+                             f"Expected one of: {', '.join(file_operations.FILE_WRITERS)}.")
+        if job["name"] in names:
+            raise ValueError(f"Job name '{job['name']}' is used more than once in '{manifest_path}'.")
+        names.add(job["name"])
+    return jobs
+
+def _count_rows(rows, result: dict):
+    """Passes rows through while counting them into result["rows"]."""
+    for row_dict in rows:
+        result["rows"] += 1
+        yield row_dict
+
+def run_export_job(job: dict) -> dict:
+    """
+    Runs a single export job: streams the query into a file and uploads it.
+
+    Any exception is caught and reported in the result, so one failing job
+    never affects the others.
+
+    Args:
+        job (dict): A job from `load_job_manifest`.
+
+    Returns:
+        dict: The job "name", its "status" ("success", "no_data" or "failed"),
+              the number of "rows" exported, the "file_path", the "duration"
+              in seconds and an "error" message.
+    """
+    result = {"name": job["name"], "status": "failed", "rows": 0, "file_path": None, "duration": 0.0, "error": None}
+    started_at = time.perf_counter()
+    try:
+        print(f"[{job['name']}] Starting export job...")
+        query = job["query"]
+        watermark_column = job.get("watermark_column")
+        watermark_tracker = {}
+        if watermark_column:
+            last_watermark = watermark_store.load_watermark(job["name"])
+            query = db_connector.build_incremental_query(query, watermark_column, last_watermark)
+        rows = db_connector.iter_rows_from_db(query)
+        if watermark_column:
+            rows = db_connector.track_watermark(rows, watermark_column, watermark_tracker)
+        compression = job.get("compression", settings.OUTPUT_COMPRESSION)
+        cache_key = None
+        if settings.EXPORT_CACHE_ENABLED:
+            file_path, cache_key = file_operations.create_file_cached(_count_rows(rows, result), job["format"],
+                                                                      job["filename"], compression)
+        else:
+            file_path = file_operations.write_file(_count_rows(rows, result), job["format"], job["filename"],
+                                                   compression)
+        if not file_path:
+            if result["rows"]:
+                result["error"] = "File creation failed."
+            else:
+                result["status"] = "no_data"
+        else:
+            result["file_path"] = file_path
+            uploaded = api_sender.upload_file_to_api(
+                file_path,
+                job.get("endpoint") or settings.API_ENDPOINT,
+                settings.API_KEY,
+                job.get("upload_mode") or settings.UPLOAD_MODE,
+                cache_key=cache_key
+            )
+            if not uploaded:
+                result["error"] = "File upload failed."
+            else:
+                # The watermark only advances once the rows past it have been delivered
+                if watermark_tracker.get("watermark") is not None:
+                    watermark_store.save_watermark(job["name"], watermark_tracker["watermark"])
+                result["status"] = "success"
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["duration"] = time.perf_counter() - started_at
+    print(f"[{job['name']}] Finished with status '{result['status']}' in {result['duration']:.2f}s.")
+    return result
+
+def run_jobs(jobs: list, max_workers: int = settings.JOB_MAX_WORKERS,
+             executor: str = settings.JOB_EXECUTOR) -> list:
+    """
+    Runs export jobs concurrently, at most `max_workers` at a time.
+
+    With the "process" executor each job runs in a separate worker process,
+    which isolates crashes and uses multiple cores for serialization; each
+    worker opens its own database connection pool. The "thread" executor
+    shares one process and pool, which suits I/O-bound jobs.
+
+    Args:
+        jobs (list): The jobs from `load_job_manifest`.
+        max_workers (int): The maximum number of jobs running at once.
+        executor (str): "process" or "thread".
+
+    Returns:
+        list: One result per job (see `run_export_job`), in manifest order.
+    """
+    if executor not in ("process", "thread"):
+        raise ValueError(f"Unknown job executor '{executor}'. Expected 'process' or 'thread'.")
+    executor_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    results = {}
+    with executor_class(max_workers=max(1, min(max_workers, len(jobs)))) as pool:
+        futures = {pool.submit(run_export_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                results[job["name"]] = future.result()
+            except Exception as e:
+                # Raised when the worker process itself died, e.g. BrokenProcessPool
+                results[job["name"]] = {"name": job["name"], "status": "failed", "rows": 0, "file_path": None,
+                                        "duration": 0.0, "error": f"{type(e).__name__}: {e}"}
+    return [results[job["name"]] for job in jobs]
+
+def print_job_summary(results: list):
+    """Prints one line per job and the overall totals."""
+    print("Job summary:")
+    for result in results:
+        line = f"  {result['name']}: {result['status']}, {result['rows']} rows ({result['duration']:.2f}s)"
+        if result["error"]:
+            line += f" - {result['error']}"
+        print(line)
+    failed = sum(1 for result in results if result["status"] == "failed")
+    print(f"{len(results) - failed}/{len(results)} jobs completed without errors.")
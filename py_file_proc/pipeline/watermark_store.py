@@ -0,0 +1,72 @@
+# your_project_name/pipeline/watermark_store.py
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from your_project_name.config import settings
+from your_project_name.file_handler.state_files import locked_file, read_json_state, write_json_atomic
+
+def _encode_value(value) -> dict:
+    """Encodes a watermark value with its type so that it round-trips through JSON."""
+    if isinstance(value, datetime):
+        return {"type": "datetime", "value": value.isoformat()}
+    if isinstance(value, date):
+        return {"type": "date", "value": value.isoformat()}
+    if isinstance(value, bool) or not isinstance(value, (int, Decimal, str)):
+        raise TypeError(f"Unsupported watermark type: {type(value).__name__}")
+    if isinstance(value, int):
+        return {"type": "int", "value": value}
+    if isinstance(value, Decimal):
+        return {"type": "decimal", "value": str(value)}
+    return {"type": "str", "value": value}
+
+def _decode_value(entry: dict):
+    """Decodes a watermark value written by `_encode_value`."""
+    decoders = {
+        "datetime": datetime.fromisoformat,
+        "date": date.fromisoformat,
+        "int": int,
+        "decimal": Decimal,
+        "str": str,
+    }
+    return decoders[entry["type"]](entry["value"])
+
+def load_watermark(job_name: str, state_file: str = settings.WATERMARK_STATE_FILE):
+    """
+    Returns the high-water mark persisted for a job.
+
+    Args:
+        job_name (str): The name identifying the export.
+        state_file (str): The path of the JSON state file.
+
+    Returns:
+        The last exported value (datetime, date, int, Decimal or str), or None
+        if the job has no watermark yet, in which case a full export is run.
+
+    Raises:
+        OSError, ValueError: If the state file cannot be read or parsed.
+    """
+    with locked_file(state_file):
+        entry = read_json_state(state_file).get(job_name)
+    return _decode_value(entry) if entry else None
+
+def save_watermark(job_name: str, value, state_file: str = settings.WATERMARK_STATE_FILE):
+    """
+    Persists a job's high-water mark.
+
+    The state file is rewritten atomically under a lock, so a crash never
+    leaves a partially written file and the watermarks of other jobs, possibly
+    saved concurrently by other processes, are preserved.
+
+    Args:
+        job_name (str): The name identifying the export.
+        value: The highest exported value of the job's watermark column.
+        state_file (str): The path of the JSON state file.
+    """
+    entry = _encode_value(value)
+    entry["updated_at"] = datetime.now().isoformat()
+    with locked_file(state_file):
+        state = read_json_state(state_file)
+        state[job_name] = entry
+        write_json_atomic(state_file, state)
+    print(f"Watermark for '{job_name}' advanced to {entry['value']}.")
@@ -0,0 +1,140 @@
+# tests/test_async_runner.py
+
+import asyncio
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from your_project_name.pipeline import async_runner
+
+def fake_batches(batches, error=None):
+    """Returns a replacement for iter_row_batches_from_db yielding `batches`, then raising `error`."""
+    def iter_row_batches(query, batch_size, require_connection=False):
+        for batch in batches:
+            yield batch
+        if error is not None:
+            raise error
+    return iter_row_batches
+
+class TestAsyncPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.dir_patcher = patch('your_project_name.config.settings.OUTPUT_FILE_DIRECTORY', self.temp_dir)
+        self.dir_patcher.start()
+
+    def tearDown(self):
+        self.dir_patcher.stop()
+        shutil.rmtree(self.temp_dir)
+
+    @patch('your_project_name.pipeline.async_runner.api_sender.upload_file_to_api', return_value=True)
+    def test_run_pipeline_async_writes_file_and_uploads(self, mock_upload):
+        """
+        Test that all batches are serialized to the local file before it is uploaded.
+        """
+        batches = [[{'id': 1}, {'id': 2}], [{'id': 3}]]
+        with patch('your_project_name.pipeline.async_runner.db_connector.iter_row_batches_from_db',
+                   fake_batches(batches)):
+            result = asyncio.run(async_runner.run_pipeline_async(
+                "SELECT 1", "export.jsonl", "jsonl", "http://api", "key", upload_mode="multipart", queue_size=1))
+
+        self.assertTrue(result)
+        filepath = os.path.join(self.temp_dir, "export.jsonl")
+        with open(filepath) as f:
+            self.assertEqual([json.loads(line) for line in f], [{'id': 1}, {'id': 2}, {'id': 3}])
+        mock_upload.assert_called_once_with(filepath, "http://api", "key", "multipart")
+
+    @patch('your_project_name.pipeline.async_runner.api_sender.send_upload_chunk', return_value=True)
+    def test_run_pipeline_async_chunked_upload_overlaps_serialization(self, mock_send_chunk):
+        """
+        Test that chunked mode sends full chunks as they are produced and the total size with the last one.
+        """
+        batches = [[{'id': i}] for i in range(10, 20)]
+        with patch('your_project_name.pipeline.async_runner.db_connector.iter_row_batches_from_db',
+                   fake_batches(batches)), \
+                patch('your_project_name.config.settings.UPLOAD_CHUNK_SIZE', 25):
+            result = asyncio.run(async_runner.run_pipeline_async(
+                "SELECT 1", "export.jsonl", "jsonl", "http://api", "key", upload_mode="chunked"))
+
+        self.assertTrue(result)
+        with open(os.path.join(self.temp_dir, "export.jsonl"), 'rb') as f:
+            content = f.read()
+        chunks = [call.args[0] for call in mock_send_chunk.call_args_list]
+        offsets = [call.args[1] for call in mock_send_chunk.call_args_list]
+        totals = [call.args[5] for call in mock_send_chunk.call_args_list]
+        self.assertEqual(b"".join(chunks), content)
+        self.assertTrue(all(len(chunk) == 25 for chunk in chunks[:-1]))
+        self.assertEqual(offsets, [25 * i for i in range(len(chunks))])
+        self.assertEqual(totals, [None] * (len(chunks) - 1) + [len(content)])
+
+    @patch('your_project_name.pipeline.async_runner.api_sender.send_upload_chunk', return_value=True)
+    def test_run_pipeline_async_compresses_file_and_chunks(self, mock_send_chunk):
+        """
+        Test that OUTPUT_COMPRESSION is applied to the file and the chunks, which carry its Content-Encoding.
+        """
+        batches = [[{'id': i}] for i in range(100)]
+        with patch('your_project_name.pipeline.async_runner.db_connector.iter_row_batches_from_db',
+                   fake_batches(batches)), \
+                patch('your_project_name.config.settings.UPLOAD_CHUNK_SIZE', 64):
+            result = asyncio.run(async_runner.run_pipeline_async(
+                "SELECT 1", "export.jsonl", "jsonl", "http://api", "key", upload_mode="chunked",
+                compression="gzip"))
+
+        self.assertTrue(result)
+        with open(os.path.join(self.temp_dir, "export.jsonl.gz"), 'rb') as f:
+            content = f.read()
+        self.assertEqual([json.loads(line) for line in gzip.decompress(content).splitlines()],
+                         [{'id': i} for i in range(100)])
+        self.assertEqual(b"".join(call.args[0] for call in mock_send_chunk.call_args_list), content)
+        self.assertEqual({call.args[3] for call in mock_send_chunk.call_args_list}, {"export.jsonl.gz"})
+        self.assertEqual({call.kwargs['content_encoding'] for call in mock_send_chunk.call_args_list}, {"gzip"})
+
+    @patch('your_project_name.pipeline.async_runner.api_sender.send_upload_chunk', return_value=False)
+    def test_run_pipeline_async_chunk_failure_stops_all_stages(self, mock_send_chunk):
+        """
+        Test that a rejected chunk fails the pipeline instead of leaving the other stages blocked on full queues.
+        """
+        batches = [[{'id': i, 'name': 'x' * 50}] for i in range(100)]
+
+        async def run():
+            return await asyncio.wait_for(async_runner.run_pipeline_async(
+                "SELECT 1", "export.jsonl", "jsonl", "http://api", "key", upload_mode="chunked", queue_size=2), 5)
+
+        with patch('your_project_name.pipeline.async_runner.db_connector.iter_row_batches_from_db',
+                   fake_batches(batches)), \
+                patch('your_project_name.config.settings.UPLOAD_CHUNK_SIZE', 100):
+            result = asyncio.run(run())
+
+        self.assertFalse(result)
+        mock_send_chunk.assert_called_once()
+
+    @patch('your_project_name.pipeline.async_runner.api_sender.upload_file_to_api')
+    def test_run_pipeline_async_no_data(self, mock_upload):
+        """
+        Test that nothing is uploaded when the query returns no rows.
+        """
+        with patch('your_project_name.pipeline.async_runner.db_connector.iter_row_batches_from_db',
+                   fake_batches([])):
+            result = asyncio.run(async_runner.run_pipeline_async("SELECT 1", "export.xml", "xml"))
+
+        self.assertFalse(result)
+        mock_upload.assert_not_called()
+
+    @patch('your_project_name.pipeline.async_runner.api_sender.upload_file_to_api')
+    def test_run_pipeline_async_extraction_failure_cancels_upload(self, mock_upload):
+        """
+        Test that a database error mid-stream fails the pipeline without uploading a partial file.
+        """
+        with patch('your_project_name.pipeline.async_runner.db_connector.iter_row_batches_from_db',
+                   fake_batches([[{'id': 1}]], error=RuntimeError("connection lost"))):
+            result = asyncio.run(async_runner.run_pipeline_async("SELECT 1", "export.csv", "csv"))
+
+        self.assertFalse(result)
+        mock_upload.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# tests/test_connection_pool.py
+
+import unittest
+from unittest.mock import patch, MagicMock
+import psycopg2
+from your_project_name.database import connection_pool
+
+def make_mock_connection():
+    conn = MagicMock()
+    conn.closed = 0
+    return conn
+
+@patch('your_project_name.config.settings.DB_POOL_MIN_CONNECTIONS', 1)
+@patch('your_project_name.config.settings.DB_POOL_MAX_CONNECTIONS', 2)
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        connection_pool.close_pool()
+
+    def tearDown(self):
+        connection_pool.close_pool()
+
+    @patch('psycopg2.connect', side_effect=lambda *args, **kwargs: make_mock_connection())
+    def test_get_connection_reuses_connections(self, mock_connect):
+        """
+        Test that connections are returned to the pool and reused instead of reconnecting.
+        """
+        with connection_pool.get_connection() as first:
+            pass
+        with connection_pool.get_connection() as second:
+            pass
+
+        self.assertIs(first, second)
+        mock_connect.assert_called_once()
+        first.close.assert_not_called()
+
+    @patch('your_project_name.config.settings.DB_POOL_MAX_LIFETIME', -1)
+    @patch('psycopg2.connect', side_effect=lambda *args, **kwargs: make_mock_connection())
+    def test_expired_connection_is_replaced(self, mock_connect):
+        """
+        Test that a connection past DB_POOL_MAX_LIFETIME is closed instead of reused.
+        """
+        with connection_pool.get_connection() as conn:
+            self.assertIsNotNone(conn)
+
+        conn.close.assert_called_once()
+
+    @patch('your_project_name.config.settings.DB_POOL_HEALTH_CHECK_INTERVAL', -1)
+    @patch('psycopg2.connect', side_effect=lambda *args, **kwargs: make_mock_connection())
+    def test_unhealthy_connection_is_discarded(self, mock_connect):
+        """
+        Test that an idle connection failing the health check is replaced by a new one.
+        """
+        with connection_pool.get_connection() as first:
+            pass
+        first.cursor.return_value.__enter__.return_value.execute.side_effect = psycopg2.OperationalError("gone")
+
+        with connection_pool.get_connection() as second:
+            pass
+
+        self.assertIsNot(first, second)
+        first.close.assert_called_once()
+        self.assertEqual(mock_connect.call_count, 2)
+
+    @patch('your_project_name.config.settings.DB_POOL_TIMEOUT', 0)
+    @patch('psycopg2.connect', side_effect=lambda *args, **kwargs: make_mock_connection())
+    def test_exhausted_pool_returns_none(self, mock_connect):
+        """
+        Test that checking out more than DB_POOL_MAX_CONNECTIONS connections times out.
+        """
+        first = connection_pool.acquire_connection()
+        second = connection_pool.acquire_connection()
+
+        self.assertIsNone(connection_pool.acquire_connection())
+
+        connection_pool.release_connection(first)
+        connection_pool.release_connection(second)
+
+    @patch('psycopg2.connect', side_effect=psycopg2.OperationalError("refused"))
+    def test_connection_error_returns_none(self, mock_connect):
+        """
+        Test that a failing pool creation is reported as no connection.
+        """
+        with connection_pool.get_connection() as conn:
+            self.assertIsNone(conn)
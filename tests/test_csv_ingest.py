@@ -0,0 +1,189 @@
+# tests/test_csv_ingest.py
+
+import csv
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
+
+import psycopg2
+
+from your_project_name.database import csv_ingest, schema_registry
+
+class TestCsvIngest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.drop_dir = os.path.join(self.temp_dir.name, "drops")
+        os.makedirs(self.drop_dir)
+        self.manifest_file = os.path.join(self.temp_dir.name, "state", "manifest.json")
+        for name, rows in (("a.csv", [[1, "Alice"]]), ("b.csv", [[2, "Bob"], [3, "Carol"]])):
+            self.write_csv(name, rows)
+        with open(os.path.join(self.drop_dir, "notes.txt"), 'w') as f:
+            f.write("not a csv")
+        self.db_config = {"host": "localhost", "database": "test"}
+        self.pool_patcher = patch('your_project_name.database.csv_ingest.ProcessPoolExecutor', ThreadPoolExecutor)
+        self.pool_patcher.start()
+
+    def tearDown(self):
+        self.pool_patcher.stop()
+        self.temp_dir.cleanup()
+
+    def write_csv(self, name, rows):
+        with open(os.path.join(self.drop_dir, name), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "Full Name"])
+            writer.writerows(rows)
+
+    def test_discover_csv_files_accepts_directories_and_globs(self):
+        """
+        Test that a directory yields its CSV files and a glob pattern is expanded, both sorted.
+        """
+        expected = [os.path.join(self.drop_dir, "a.csv"), os.path.join(self.drop_dir, "b.csv")]
+        self.assertEqual(csv_ingest.discover_csv_files(self.drop_dir), expected)
+        self.assertEqual(csv_ingest.discover_csv_files(os.path.join(self.drop_dir, "b*.csv")), expected[1:])
+
+    @patch('your_project_name.database.csv_ingest.psycopg2.connect')
+    def test_ingest_csv_files_merges_staging_tables_and_skips_loaded_files(self, mock_connect):
+        """
+        Test that files are staged, merged with INSERT ... SELECT in one commit, and skipped or held back on a rerun.
+        """
+        mock_conn = MagicMock()
+        mock_cur = MagicMock()
+        mock_cur.rowcount = 1
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cur
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cur
+
+        summary = csv_ingest.ingest_csv_files(self.drop_dir, self.db_config, "people", max_workers=2,
+                                              manifest_file=self.manifest_file)
+
+        self.assertEqual(summary["loaded"], [os.path.join(self.drop_dir, "a.csv"), os.path.join(self.drop_dir, "b.csv")])
+        self.assertEqual(summary["skipped"], [])
+        self.assertEqual(summary["rows"], 2)
+        statements = [call.args[0] for call in mock_cur.execute.call_args_list]
+        staging_creates = [s for s in statements if s.startswith("CREATE UNLOGGED TABLE people_staging_")]
+        merges = [s for s in statements if s.startswith("INSERT INTO people (id, full_name) SELECT id, full_name FROM")]
+        self.assertEqual(len(staging_creates), 2)
+        self.assertEqual(len(merges), 2)
+        self.assertEqual(mock_cur.copy_expert.call_count, 2)
+
+        mock_cur.reset_mock()
+        self.write_csv("b.csv", [[2, "Bob"], [3, "Carol"], [4, "Dan"]])
+        summary = csv_ingest.ingest_csv_files(self.drop_dir, self.db_config, "people", max_workers=2,
+                                              manifest_file=self.manifest_file)
+
+        # Appending the changed file again would duplicate the rows of its first version
+        self.assertEqual(summary["skipped"], [os.path.join(self.drop_dir, "a.csv")])
+        self.assertEqual(summary["changed"], [os.path.join(self.drop_dir, "b.csv")])
+        self.assertEqual(summary["loaded"], [])
+        self.assertEqual(mock_cur.copy_expert.call_count, 0)
+
+    @patch('your_project_name.database.csv_ingest.psycopg2.connect')
+    def test_ingest_csv_files_upserts_changed_files_on_merge_key(self, mock_connect):
+        """
+        Test that with a merge key a changed file is reloaded with an upsert instead of being appended.
+        """
+        mock_conn = MagicMock()
+        mock_cur = MagicMock()
+        mock_cur.rowcount = 1
+        mock_cur.fetchone.return_value = (3, 1, 0)
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cur
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cur
+        csv_ingest.ingest_csv_files(self.drop_dir, self.db_config, "people", merge_key=["id"],
+                                    manifest_file=self.manifest_file)
+        create_statement = next(call.args[0] for call in mock_cur.execute.call_args_list
+                                if "CREATE TABLE" in call.args[0])
+        self.assertIn("UNIQUE (id)", create_statement)
+
+        mock_cur.reset_mock()
+        self.write_csv("b.csv", [[2, "Bob"], [3, "Caroline"], [4, "Dan"]])
+        summary = csv_ingest.ingest_csv_files(self.drop_dir, self.db_config, "people", merge_key=["id"],
+                                              manifest_file=self.manifest_file)
+
+        self.assertEqual(summary["loaded"], [os.path.join(self.drop_dir, "b.csv")])
+        self.assertEqual(summary["rows"], 1)
+        statements = [call.args[0] for call in mock_cur.execute.call_args_list]
+        self.assertTrue(any("ON CONFLICT (id)" in s for s in statements))
+        self.assertFalse(any(s.startswith("INSERT INTO people (id, full_name) SELECT") for s in statements))
+
+    @patch('your_project_name.database.csv_ingest.psycopg2.connect')
+    def test_ingest_csv_files_stages_identical_files_separately(self, mock_connect):
+        """
+        Test that files with the same content get their own staging tables instead of racing on one.
+        """
+        mock_conn = MagicMock()
+        mock_cur = MagicMock()
+        mock_cur.rowcount = 0
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cur
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cur
+        self.write_csv("a.csv", [])
+        self.write_csv("b.csv", [])
+
+        summary = csv_ingest.ingest_csv_files(self.drop_dir, self.db_config, "people",
+                                              manifest_file=self.manifest_file)
+
+        self.assertEqual(len(summary["loaded"]), 2)
+        statements = [call.args[0] for call in mock_cur.execute.call_args_list]
+        staging_creates = {s for s in statements if s.startswith("CREATE UNLOGGED TABLE people_staging_")}
+        self.assertEqual(len(staging_creates), 2)
+
+    @patch('your_project_name.database.csv_ingest.psycopg2.connect')
+    def test_ingest_csv_files_loads_registered_column_names(self, mock_connect):
+        """
+        Test that staging and merging use the SQL names of a registered schema, not the sanitized headers.
+        """
+        mock_conn = MagicMock()
+        mock_cur = MagicMock()
+        mock_cur.rowcount = 1
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cur
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cur
+        registry_dir = os.path.join(self.temp_dir.name, "schemas")
+        schema = schema_registry.schema_from_columns(["id", "Full Name"], ["person_id INTEGER", "display_name TEXT"])
+        schema_registry.register_schema("people", schema, registry_dir)
+
+        with patch('your_project_name.config.settings.CSV_SCHEMA_REGISTRY_DIRECTORY', registry_dir):
+            summary = csv_ingest.ingest_csv_files(self.drop_dir, self.db_config, "people", use_schema_registry=True,
+                                                  manifest_file=self.manifest_file)
+
+        self.assertEqual(len(summary["loaded"]), 2)
+        statements = [call.args[0] for call in mock_cur.execute.call_args_list]
+        merges = [s for s in statements if s.startswith("INSERT INTO people (person_id, display_name) "
+                                                        "SELECT person_id, display_name FROM")]
+        self.assertEqual(len(merges), 2)
+        self.assertIn("(person_id, display_name)", mock_cur.copy_expert.call_args.args[0])
+
+    @patch('your_project_name.database.csv_ingest.psycopg2.connect')
+    def test_ingest_csv_files_leaves_failed_files_for_the_next_run(self, mock_connect):
+        """
+        Test that a file whose staging load fails is reported, not merged and not recorded in the manifest.
+        """
+        mock_conn = MagicMock()
+        mock_cur = MagicMock()
+        mock_cur.rowcount = 1
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cur
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cur
+
+        def copy_expert(query, f, size=None):
+            if "Bob" in f.read():
+                raise psycopg2.DataError("invalid input syntax")
+        mock_cur.copy_expert.side_effect = copy_expert
+
+        summary = csv_ingest.ingest_csv_files(self.drop_dir, self.db_config, "people",
+                                              manifest_file=self.manifest_file)
+
+        self.assertEqual(summary["loaded"], [os.path.join(self.drop_dir, "a.csv")])
+        self.assertEqual(summary["failed"], [os.path.join(self.drop_dir, "b.csv")])
+        mock_cur.copy_expert.side_effect = None
+        mock_cur.copy_expert.reset_mock()
+        summary = csv_ingest.ingest_csv_files(self.drop_dir, self.db_config, "people",
+                                              manifest_file=self.manifest_file)
+        self.assertEqual(summary["loaded"], [os.path.join(self.drop_dir, "b.csv")])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,299 @@
+# tests/test_csv_read_and_load_into_db.py
+
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import csv
+import io
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from your_project_name.database.csv_read_and_load_into_db import (
+    copy_csv_into_table,
+    insert_csv_with_execute_values,
+    load_csv_to_postgres,
+    read_csv_sample,
+    infer_csv_dtypes,
+    frame_to_records,
+    split_csv_byte_ranges,
+)
+
+class TestCsvLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.temp_dir.name, "sample.csv")
+        with open(self.csv_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "Full Name", "age"])
+            writer.writerow([1, "Alice Smith", 30])
+            writer.writerow([2, "Bob Johnson", ""])
+            writer.writerow([3, "Charlie Brown", 35])
+        self.db_config = {"host": "localhost", "database": "test"}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_copy_csv_into_table(self):
+        """
+        Test that copy_csv_into_table streams the file through copy_expert.
+        """
+        mock_cur = MagicMock()
+        mock_cur.rowcount = 3
+
+        row_count = copy_csv_into_table(mock_cur, self.csv_path, "people", ["id", "full_name", "age"], chunk_size=1024)
+
+        self.assertEqual(row_count, 3)
+        copy_query, file_obj = mock_cur.copy_expert.call_args.args
+        self.assertEqual(copy_query, "COPY people (id, full_name, age) FROM STDIN WITH (FORMAT csv, HEADER true)")
+        self.assertEqual(mock_cur.copy_expert.call_args.kwargs, {'size': 1024})
+
+    @patch('your_project_name.database.csv_read_and_load_into_db.execute_values')
+    def test_insert_csv_with_execute_values_batches_and_transforms(self, mock_execute_values):
+        """
+        Test that the execute_values fallback batches rows, maps empty fields to None and applies the transform.
+        """
+        mock_cur = MagicMock()
+        transform = lambda row: (int(row[0]), row[1].upper(), row[2])
+
+        row_count = insert_csv_with_execute_values(mock_cur, self.csv_path, "people", ["id", "full_name", "age"],
+                                                   transform, batch_size=2)
+
+        self.assertEqual(row_count, 3)
+        self.assertEqual(mock_execute_values.call_count, 2)
+        first_batch = mock_execute_values.call_args_list[0].args[2]
+        second_batch = mock_execute_values.call_args_list[1].args[2]
+        self.assertEqual(first_batch, [(1, "ALICE SMITH", "30"), (2, "BOB JOHNSON", None)])
+        self.assertEqual(second_batch, [(3, "CHARLIE BROWN", "35")])
+        self.assertEqual(mock_execute_values.call_args_list[0].args[1],
+                         "INSERT INTO people (id, full_name, age) VALUES %s")
+
+    @patch('your_project_name.database.csv_read_and_load_into_db.psycopg2.connect')
+    def test_load_csv_to_postgres_copy_method(self, mock_connect):
+        """
+        Test that the copy method creates the table from a sample and loads with COPY.
+        """
+        mock_conn = MagicMock()
+        mock_cur = MagicMock()
+        mock_cur.rowcount = 3
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cur
+
+        row_count = load_csv_to_postgres(self.csv_path, self.db_config, "people", method="copy")
+
+        self.assertEqual(row_count, 3)
+        create_query = mock_cur.execute.call_args.args[0]
+        self.assertIn("CREATE TABLE IF NOT EXISTS people", create_query)
+        self.assertIn("full_name TEXT", create_query)
+        mock_cur.copy_expert.assert_called_once()
+        mock_cur.executemany.assert_not_called()
+        mock_conn.commit.assert_called_once()
+        mock_conn.close.assert_called_once()
+
+    @patch('your_project_name.database.csv_read_and_load_into_db.psycopg2.connect')
+    def test_load_csv_to_postgres_chunked_method_keeps_sample_types(self, mock_connect):
+        """
+        Test that every chunk is typed like the sample and COPYed without per-row conversion.
+        """
+        with open(self.csv_path, 'a', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow([4, "", ""])
+            writer.writerow([5, "00123", 40])
+        mock_conn = MagicMock()
+        mock_cur = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cur
+        copied = []
+        mock_cur.copy_expert.side_effect = lambda query, buffer: copied.append((query, buffer.read()))
+
+        with patch('your_project_name.config.settings.CSV_INFERENCE_SAMPLE_ROWS', 3):
+            row_count = load_csv_to_postgres(self.csv_path, self.db_config, "people", method="chunked",
+                                             batch_size=2)
+
+        self.assertEqual(row_count, 5)
+        self.assertIn("age NUMERIC", mock_cur.execute.call_args.args[0])
+        self.assertEqual(copied[0][0], "COPY people (id, full_name, age) FROM STDIN WITH (FORMAT csv)")
+        self.assertEqual([data for _, data in copied],
+                         ["1,Alice Smith,30.0\n2,Bob Johnson,\n", "3,Charlie Brown,35.0\n4,,\n", "5,00123,40.0\n"])
+        mock_conn.commit.assert_called_once()
+
+    def test_infer_csv_dtypes_and_frame_to_records(self):
+        """
+        Test that nullable dtypes are inferred from the sample and nulls become None.
+        """
+        with open(self.csv_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "active", "note"])
+            writer.writerow([1, True, ""])
+            writer.writerow([2, False, ""])
+
+        sample = read_csv_sample(self.csv_path)
+        self.assertEqual(infer_csv_dtypes(sample), {"id": "Int64", "active": "boolean", "note": "string"})
+        self.assertEqual(frame_to_records(sample), [(1, True, None), (2, False, None)])
+
+    def test_split_csv_byte_ranges_keeps_quoted_newlines_together(self):
+        """
+        Test that ranges cover every record exactly once and never split a quoted field.
+        """
+        with open(self.csv_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "note"])
+            for i in range(50):
+                writer.writerow([i, f'line one\nline "two"\n{i}' if i % 3 == 0 else f"plain {i}"])
+        with open(self.csv_path, 'rb') as f:
+            content = f.read()
+
+        header, ranges = split_csv_byte_ranges(self.csv_path, 7)
+
+        self.assertEqual(header, b"id,note\r\n")
+        self.assertGreater(len(ranges), 1)
+        self.assertEqual(b"".join(content[start:end] for start, end in ranges), content[len(header):])
+        ids = []
+        for start, end in ranges:
+            ids.extend(int(row[0]) for row in csv.reader(io.StringIO(content[start:end].decode(), newline='')))
+        self.assertEqual(ids, list(range(50)))
+
+    @patch('your_project_name.database.csv_read_and_load_into_db.ProcessPoolExecutor', ThreadPoolExecutor)
+    @patch('your_project_name.database.csv_read_and_load_into_db.psycopg2.connect')
+    def test_load_csv_to_postgres_parallel_method(self, mock_connect):
+        """
+        Test that the parallel method COPYs every data row once, split across workers.
+        """
+        copied = []
+        def make_connection(**kwargs):
+            mock_conn = MagicMock()
+            mock_cur = mock_conn.cursor.return_value
+            mock_cur.__enter__.return_value = mock_cur
+            def copy_expert(query, reader, size=None):
+                data = reader.read(size)
+                copied.append((query, data))
+                mock_cur.rowcount = data.count(b"\n")
+            mock_cur.copy_expert.side_effect = copy_expert
+            return mock_conn
+        mock_connect.side_effect = make_connection
+
+        row_count = load_csv_to_postgres(self.csv_path, self.db_config, "people", method="parallel", workers=2)
+
+        self.assertEqual(row_count, 3)
+        self.assertEqual(len(copied), 2)
+        self.assertEqual(copied[0][0], "COPY people (id, full_name, age) FROM STDIN WITH (FORMAT csv)")
+        # The workers run concurrently, so the ranges may be copied in any order
+        self.assertEqual(b"".join(sorted(data for _, data in copied)),
+                         b"1,Alice Smith,30\r\n2,Bob Johnson,\r\n3,Charlie Brown,35\r\n")
+
+    @patch('your_project_name.database.csv_read_and_load_into_db.psycopg2.connect')
+    def test_load_csv_to_postgres_uses_schema_registry(self, mock_connect):
+        """
+        Test that the first load registers the schema, later loads reuse it and mismatching headers are rejected early.
+        """
+        mock_conn = MagicMock()
+        mock_cur = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cur
+        copied = []
+        mock_cur.copy_expert.side_effect = lambda query, buffer: copied.append(buffer.read())
+
+        with patch('your_project_name.config.settings.CSV_SCHEMA_REGISTRY_DIRECTORY', self.temp_dir.name):
+            self.assertEqual(load_csv_to_postgres(self.csv_path, self.db_config, "people", method="chunked",
+                                                  use_schema_registry=True), 3)
+            self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, "people.json")))
+
+            # A file of digits only would be inferred as numbers; the registered TEXT type keeps them as text
+            with open(self.csv_path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(["id", "Full Name", "age"])
+                writer.writerow([4, "007", 41])
+            with patch('your_project_name.database.csv_read_and_load_into_db.read_csv_sample') as mock_sample:
+                self.assertEqual(load_csv_to_postgres(self.csv_path, self.db_config, "people", method="chunked",
+                                                      use_schema_registry=True), 1)
+                mock_sample.assert_not_called()
+            self.assertEqual(copied[-1], "4,007,41.0\n")
+
+            mock_connect.reset_mock()
+            with open(self.csv_path, 'w', newline='') as f:
+                csv.writer(f).writerow(["id", "name", "age"])
+            self.assertIsNone(load_csv_to_postgres(self.csv_path, self.db_config, "people", method="copy",
+                                                   use_schema_registry=True))
+            mock_connect.assert_not_called()
+
+    @patch('your_project_name.database.csv_read_and_load_into_db.psycopg2.connect')
+    def test_load_csv_to_postgres_merge_method(self, mock_connect):
+        """
+        Test that the merge method stages the file with COPY and upserts it on the key with one statement.
+        """
+        mock_conn = MagicMock()
+        mock_cur = MagicMock()
+        mock_cur.fetchone.return_value = (3, 1, 1)
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cur
+
+        row_count = load_csv_to_postgres(self.csv_path, self.db_config, "people", method="merge", merge_key=["id"])
+
+        self.assertEqual(row_count, 3)
+        statements = [call.args[0] for call in mock_cur.execute.call_args_list]
+        self.assertIn("UNIQUE (id)", statements[0])
+        self.assertEqual(statements[1], "CREATE TEMPORARY TABLE people_merge_staging "
+                                        "(LIKE people INCLUDING DEFAULTS) ON COMMIT DROP")
+        self.assertEqual(mock_cur.copy_expert.call_args.args[0],
+                         "COPY people_merge_staging (id, full_name, age) FROM STDIN WITH (FORMAT csv, HEADER true)")
+        self.assertIn("ON CONFLICT (id) DO UPDATE SET full_name = EXCLUDED.full_name, age = EXCLUDED.age "
+                      "WHERE (people.full_name, people.age) IS DISTINCT FROM (EXCLUDED.full_name, EXCLUDED.age)",
+                      statements[2])
+        mock_conn.commit.assert_called_once()
+
+    @patch('your_project_name.database.csv_read_and_load_into_db.psycopg2.connect')
+    def test_load_csv_to_postgres_merge_method_with_schema_qualified_table(self, mock_connect):
+        """
+        Test that the temporary staging table gets an unqualified name, which PostgreSQL requires.
+        """
+        mock_conn = MagicMock()
+        mock_cur = MagicMock()
+        mock_cur.fetchone.return_value = (3, 0, 0)
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cur
+
+        load_csv_to_postgres(self.csv_path, self.db_config, "staging.people", method="merge", merge_key=["id"])
+
+        statements = [call.args[0] for call in mock_cur.execute.call_args_list]
+        self.assertEqual(statements[1], "CREATE TEMPORARY TABLE people_merge_staging "
+                                        "(LIKE staging.people INCLUDING DEFAULTS) ON COMMIT DROP")
+
+    @patch('your_project_name.database.csv_read_and_load_into_db.psycopg2.connect')
+    def test_load_csv_to_postgres_merge_method_requires_known_key(self, mock_connect):
+        """
+        Test that the merge method fails without a key or with a key missing from the file.
+        """
+        mock_conn = MagicMock()
+        mock_cur = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cur
+
+        with patch('your_project_name.config.settings.CSV_MERGE_KEY', ""):
+            self.assertIsNone(load_csv_to_postgres(self.csv_path, self.db_config, "people", method="merge"))
+        self.assertIsNone(load_csv_to_postgres(self.csv_path, self.db_config, "people", method="merge",
+                                               merge_key=["email"]))
+        mock_cur.copy_expert.assert_not_called()
+
+    def test_load_csv_to_postgres_unknown_method(self):
+        """
+        Test that an unknown method is rejected before connecting.
+        """
+        with patch('your_project_name.database.csv_read_and_load_into_db.psycopg2.connect') as mock_connect:
+            self.assertIsNone(load_csv_to_postgres(self.csv_path, self.db_config, "people", method="bulk"))
+            mock_connect.assert_not_called()
+
+    @patch('your_project_name.database.csv_read_and_load_into_db.connection_pool')
+    @patch('your_project_name.database.csv_read_and_load_into_db.psycopg2.connect')
+    def test_load_csv_to_postgres_uses_pool_without_db_config(self, mock_connect, mock_pool):
+        """
+        Test that the shared pool is used when no db_config is given.
+        """
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.rowcount = 3
+        mock_pool.acquire_connection.return_value = mock_conn
+
+        row_count = load_csv_to_postgres(self.csv_path, None, "people", method="copy")
+
+        self.assertEqual(row_count, 3)
+        mock_connect.assert_not_called()
+        mock_pool.release_connection.assert_called_once_with(mock_conn)
+        mock_conn.close.assert_not_called()
@@ -0,0 +1,203 @@
+# tests/test_db_connector.py
+
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from datetime import datetime
+from your_project_name.database.db_connector import (
+    iter_row_batches_from_db,
+    iter_rows_from_db,
+    build_partition_queries,
+    iter_rows_partitioned,
+    fetch_data_partitioned,
+    run_partitioned,
+    build_incremental_query,
+    track_watermark,
+)
+from your_project_name.database import connection_pool
+
+class TestIterRowsFromDb(unittest.TestCase):
+
+    def setUp(self):
+        connection_pool.close_pool()
+
+    def tearDown(self):
+        connection_pool.close_pool()
+
+    @patch('your_project_name.database.db_connector.psycopg2.connect')
+    def test_iter_row_batches_from_db_uses_named_cursor(self, mock_connect):
+        """
+        Test that iter_row_batches_from_db streams bounded batches from a server-side cursor.
+        """
+        mock_conn = MagicMock()
+        mock_conn.closed = 0
+        mock_cur = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cur
+
+        mock_cur.description = [('id',), ('name',)]
+        mock_cur.fetchmany.side_effect = [
+            [(1, 'Alice'), (2, 'Bob')],
+            [(3, 'Charlie')],
+            []
+        ]
+
+        query = "SELECT id, name FROM users;"
+        batches = list(iter_row_batches_from_db(query, batch_size=2))
+
+        self.assertEqual(batches, [
+            [{'id': 1, 'name': 'Alice'}, {'id': 2, 'name': 'Bob'}],
+            [{'id': 3, 'name': 'Charlie'}]
+        ])
+        mock_conn.cursor.assert_called_once_with(name='py_file_proc_stream')
+        self.assertEqual(mock_cur.itersize, 2)
+        mock_cur.fetchmany.assert_called_with(2)
+        mock_cur.execute.assert_called_once_with(query)
+        mock_conn.close.assert_not_called() # Returned to the pool
+        mock_conn.rollback.assert_called() # Read transaction ended before reuse
+
+    @patch('your_project_name.database.db_connector.psycopg2.connect')
+    def test_iter_rows_from_db_flattens_batches(self, mock_connect):
+        """
+        Test that iter_rows_from_db yields individual rows.
+        """
+        mock_conn = MagicMock()
+        mock_conn.closed = 0
+        mock_cur = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cur
+
+        mock_cur.description = [('id',)]
+        mock_cur.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+
+        rows = list(iter_rows_from_db("SELECT id FROM users;", batch_size=2))
+
+        self.assertEqual(rows, [{'id': 1}, {'id': 2}, {'id': 3}])
+        mock_conn.close.assert_not_called() # Returned to the pool
+        mock_conn.rollback.assert_called() # Read transaction ended before reuse
+
+
+class TestPartitionedExtraction(unittest.TestCase):
+
+    def fake_partition_batches(self, partition_query, batch_size, cursor_name, require_connection):
+        """Serves the rows configured for the partition encoded in the cursor name, two per batch."""
+        index = int(cursor_name.rsplit("_", 1)[1])
+        rows = [{'user_id': user_id} for user_id in self.partition_rows[index]]
+        return iter([rows[i:i + 2] for i in range(0, len(rows), 2)])
+
+    def test_build_partition_queries_range(self):
+        """
+        Test that range partitions are contiguous, open-ended and cover NULL keys once.
+        """
+        queries = build_partition_queries("SELECT * FROM users;", "user_id", 3, bounds=(1, 9))
+
+        self.assertEqual(queries, [
+            "SELECT * FROM (SELECT * FROM users) AS partition_source WHERE user_id < 4",
+            "SELECT * FROM (SELECT * FROM users) AS partition_source WHERE user_id >= 4 AND user_id < 7",
+            "SELECT * FROM (SELECT * FROM users) AS partition_source WHERE (user_id >= 7 OR user_id IS NULL)",
+        ])
+
+    def test_build_partition_queries_time_and_hash(self):
+        """
+        Test the created_at window and hash modulus strategies.
+        """
+        time_queries = build_partition_queries("SELECT * FROM users", "created_at", 2, strategy="time",
+                                               bounds=(datetime(2024, 1, 1), datetime(2024, 1, 3)))
+        self.assertTrue(time_queries[0].endswith("WHERE created_at < '2024-01-02T00:00:00'::timestamp"))
+
+        hash_queries = build_partition_queries("SELECT * FROM users", "email", 2, strategy="hash")
+        self.assertTrue(hash_queries[0].endswith("(mod(abs(hashtext(email::text)), 2) = 0 OR email IS NULL)"))
+        self.assertTrue(hash_queries[1].endswith("mod(abs(hashtext(email::text)), 2) = 1"))
+
+    def test_build_partition_queries_small_range_and_empty_result(self):
+        """
+        Test that a range smaller than the partition count collapses and an empty result gives no partitions.
+        """
+        self.assertEqual(len(build_partition_queries("SELECT * FROM users", "user_id", 4, bounds=(5, 5))), 1)
+        self.assertEqual(build_partition_queries("SELECT * FROM users", "user_id", 4, bounds=(None, None)), [])
+        with self.assertRaises(ValueError):
+            build_partition_queries("SELECT * FROM users", "user_id", 4, strategy="random", bounds=(1, 2))
+
+    def test_iter_rows_partitioned_merges_in_partition_order(self):
+        """
+        Test that concurrently read partitions are merged into one ordered stream.
+        """
+        self.partition_rows = [[1, 2, 3], [4, 5, 6], [7, 8, 9, 10]]
+        with patch('your_project_name.database.db_connector.iter_row_batches_from_db',
+                   side_effect=self.fake_partition_batches):
+            rows = list(iter_rows_partitioned("SELECT * FROM users", "user_id", 3, bounds=(1, 10)))
+
+        self.assertEqual([row['user_id'] for row in rows], list(range(1, 11)))
+
+    def test_iter_rows_partitioned_close_does_not_block_on_full_queues(self):
+        """
+        Test that closing the stream early stops workers whose queues are full, instead of deadlocking.
+        """
+        self.partition_rows = [[1, 2, 3, 4], [5, 6, 7, 8]]
+        def consume_one_row():
+            rows = iter_rows_partitioned("SELECT * FROM users", "user_id", 2, bounds=(1, 8))
+            next(rows)
+            time.sleep(0.2) # Lets both workers fill their queues
+            rows.close()
+
+        with patch('your_project_name.database.db_connector.iter_row_batches_from_db',
+                   side_effect=self.fake_partition_batches), \
+                patch('your_project_name.config.settings.DB_PARTITION_QUEUE_BATCHES', 2):
+            consumer = threading.Thread(target=consume_one_row, daemon=True)
+            consumer.start()
+            consumer.join(5)
+
+        self.assertFalse(consumer.is_alive())
+
+    def test_fetch_data_partitioned_returns_empty_list_on_error(self):
+        """
+        Test that a failing partition makes fetch_data_partitioned return an empty list like fetch_data_from_db.
+        """
+        import psycopg2
+        with patch('your_project_name.database.db_connector.iter_row_batches_from_db',
+                   side_effect=psycopg2.OperationalError("partition failed")):
+            self.assertEqual(fetch_data_partitioned("SELECT * FROM users", "user_id", 2, bounds=(1, 10)), [])
+
+    def test_run_partitioned_feeds_one_writer_per_partition(self):
+        """
+        Test that each partition is passed to its own writer call.
+        """
+        self.partition_rows = [[1, 2], [3, 4, 5]]
+        with patch('your_project_name.database.db_connector.iter_row_batches_from_db',
+                   side_effect=self.fake_partition_batches):
+            results = run_partitioned("SELECT * FROM users", "user_id",
+                                      lambda index, rows: (index, [row['user_id'] for row in rows]),
+                                      num_partitions=2, bounds=(1, 5))
+
+        self.assertEqual(results, [(0, [1, 2]), (1, [3, 4, 5])])
+
+class TestIncrementalExtraction(unittest.TestCase):
+
+    def test_build_incremental_query(self):
+        """
+        Test that the query is restricted to rows past the watermark, or left whole without one.
+        """
+        self.assertEqual(
+            build_incremental_query("SELECT * FROM users;", "updated_at", datetime(2024, 1, 1)),
+            "SELECT * FROM (SELECT * FROM users) AS incremental_source "
+            "WHERE updated_at > '2024-01-01T00:00:00'::timestamp ORDER BY updated_at"
+        )
+        self.assertEqual(
+            build_incremental_query("SELECT * FROM users", "user_id"),
+            "SELECT * FROM (SELECT * FROM users) AS incremental_source WHERE TRUE ORDER BY user_id"
+        )
+
+    def test_track_watermark_records_highest_value(self):
+        """
+        Test that rows pass through unchanged while the highest non-null value is recorded.
+        """
+        rows = [{'user_id': 3}, {'user_id': None}, {'user_id': 7}, {'user_id': 5}]
+        tracker = {}
+
+        self.assertEqual(list(track_watermark(rows, 'user_id', tracker)), rows)
+        self.assertEqual(tracker, {'watermark': 7})
+
+        empty_tracker = {}
+        self.assertEqual(list(track_watermark([], 'user_id', empty_tracker)), [])
+        self.assertEqual(empty_tracker, {})
@@ -0,0 +1,131 @@
+# tests/test_export_cache.py
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from your_project_name.file_handler import export_cache, file_operations
+from your_project_name.api_client import api_sender
+
+class TestExportCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.temp_dir, "output")
+        self.cache_dir = os.path.join(self.temp_dir, "cache")
+        os.makedirs(self.output_dir)
+        self.patchers = [
+            patch('your_project_name.config.settings.OUTPUT_FILE_DIRECTORY', self.output_dir),
+            patch('your_project_name.config.settings.EXPORT_CACHE_DIRECTORY', self.cache_dir),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+        self.rows = [{'id': 1, 'name': 'Alice'}, {'id': 2, 'name': 'Bob'}]
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def test_cache_key_depends_on_rows_format_and_template(self):
+        """
+        Test that the key changes with the rows, the format and the template content, but not with key order.
+        """
+        template_path = os.path.join(self.temp_dir, "template.xml")
+        with open(template_path, 'w') as f:
+            f.write("<export><records/></export>")
+
+        result_hash = export_cache.hash_rows(self.rows)
+        self.assertEqual(result_hash, export_cache.hash_rows([{'name': 'Alice', 'id': 1}, {'name': 'Bob', 'id': 2}]))
+        self.assertNotEqual(result_hash, export_cache.hash_rows(self.rows[:1]))
+
+        xml_key = export_cache.build_cache_key(result_hash, "xml", template_path)
+        self.assertNotEqual(xml_key, export_cache.build_cache_key(result_hash, "csv"))
+        with open(template_path, 'w') as f:
+            f.write("<export version='2'><records/></export>")
+        self.assertNotEqual(xml_key, export_cache.build_cache_key(result_hash, "xml", template_path))
+
+    def test_create_file_cached_reuses_output_for_unchanged_list(self):
+        """
+        Test that an unchanged result set is restored from the cache without calling the writer.
+        """
+        first_path, first_key = file_operations.create_file_cached(self.rows, "csv", "users.csv")
+        with open(first_path) as f:
+            first_content = f.read()
+        os.remove(first_path)
+
+        with patch.dict(file_operations.FILE_WRITERS, {"csv": lambda data, filename: self.fail("re-serialized")}):
+            second_path, second_key = file_operations.create_file_cached(list(self.rows), "csv", "users.csv")
+
+        self.assertEqual((second_path, second_key), (first_path, first_key))
+        with open(second_path) as f:
+            self.assertEqual(f.read(), first_content)
+
+    def test_restored_copy_leaves_no_visible_temp_file(self):
+        """
+        Test that a failed restore removes its hidden temporary file and leaves no partial copy in the output directory.
+        """
+        first_path, _ = file_operations.create_file_cached(self.rows, "csv", "users.csv")
+        os.remove(first_path)
+
+        with patch('your_project_name.file_handler.export_cache.shutil.copyfileobj', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                file_operations.create_file_cached(list(self.rows), "csv", "users.csv")
+        self.assertEqual(os.listdir(self.output_dir), [])
+
+    def test_create_file_cached_hashes_iterators_while_writing(self):
+        """
+        Test that streamed rows produce the same key as the equivalent list.
+        """
+        _, list_key = file_operations.create_file_cached(self.rows, "jsonl", "users.jsonl")
+        file_path, iter_key = file_operations.create_file_cached(iter(self.rows), "jsonl", "users.jsonl")
+
+        self.assertEqual(iter_key, list_key)
+        self.assertTrue(os.path.exists(file_path))
+        self.assertIsNone(file_operations.create_file_cached(iter([]), "jsonl", "empty.jsonl")[0])
+
+    @patch('your_project_name.api_client.api_sender._send_file', return_value=True)
+    def test_upload_skipped_after_successful_upload_of_same_data(self, mock_send_file):
+        """
+        Test that the same data is uploaded once per endpoint, and retried after a failed upload.
+        """
+        file_path, cache_key = file_operations.create_file_cached(self.rows, "json", "users.json")
+
+        mock_send_file.return_value = False
+        self.assertFalse(api_sender.upload_file_to_api(file_path, "http://api", "key", cache_key=cache_key))
+        mock_send_file.return_value = True
+        self.assertTrue(api_sender.upload_file_to_api(file_path, "http://api", "key", cache_key=cache_key))
+        self.assertTrue(api_sender.upload_file_to_api(file_path, "http://api", "key", cache_key=cache_key))
+        self.assertTrue(api_sender.upload_file_to_api(file_path, "http://other-api", "key", cache_key=cache_key))
+
+        self.assertEqual([call.args[1] for call in mock_send_file.call_args_list],
+                         ["http://api", "http://api", "http://other-api"])
+
+    def test_store_evicts_by_age_and_size(self):
+        """
+        Test that old entries and the least recently used entries beyond the size limit are evicted.
+        """
+        file_path = os.path.join(self.output_dir, "export.csv")
+        with open(file_path, 'w') as f:
+            f.write("x" * 100)
+
+        with patch('your_project_name.config.settings.EXPORT_CACHE_MAX_BYTES', 250):
+            for cache_key in ("a", "b", "c"):
+                export_cache.store(cache_key, file_path)
+        self.assertIsNone(export_cache.lookup("a"))
+        self.assertIsNotNone(export_cache.lookup("b"))
+        self.assertIsNotNone(export_cache.lookup("c"))
+
+        with patch('your_project_name.file_handler.export_cache.time.time', return_value=time.time() - 3600):
+            export_cache.store("old", file_path)
+        with patch('your_project_name.config.settings.EXPORT_CACHE_MAX_AGE', 60):
+            export_cache.store("new", file_path)
+        self.assertIsNone(export_cache.lookup("old"))
+        self.assertEqual(sorted(name for name in os.listdir(self.cache_dir) if name.endswith(".csv")),
+                         ["b.csv", "c.csv", "new.csv"])
+
+if __name__ == '__main__':
+    unittest.main()
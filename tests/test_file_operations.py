@@ -0,0 +1,490 @@
+# tests/test_file_operations.py
+
+import unittest
+from unittest.mock import patch, mock_open
+import os
+import json
+import tempfile
+import gzip
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from lxml import etree
+from psycopg2.extensions import Column
+from your_project_name.file_handler.file_operations import (
+    create_csv_file,
+    create_json_file,
+    create_jsonl_file,
+    create_xml_file_from_template,
+    create_file_cached,
+    open_output_file,
+    iter_record_batches,
+    create_parquet_file,
+    create_arrow_file,
+    get_compiled_xml_template,
+    create_sharded_files,
+    iter_serialized_chunks,
+)
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+class TestStreamingInput(unittest.TestCase):
+
+    @patch('builtins.open', new_callable=mock_open)
+    def test_create_csv_file_accepts_iterator(self, mock_file_open):
+        """
+        Test that create_csv_file consumes a one-shot iterator without indexing it.
+        """
+        rows = iter([{'id': 1, 'name': 'Test1'}, {'id': 2, 'name': 'Test2'}])
+        filepath = create_csv_file(rows, "iter.csv")
+
+        self.assertIsNotNone(filepath)
+        written = "".join(call.args[0] for call in mock_file_open().write.call_args_list)
+        self.assertEqual(written, "id,name\r\n1,Test1\r\n2,Test2\r\n")
+
+    def test_create_csv_file_empty_iterator(self):
+        """
+        Test that create_csv_file returns None for an empty iterator.
+        """
+        self.assertIsNone(create_csv_file(iter([]), "empty.csv"))
+
+    @patch('builtins.open', new_callable=mock_open)
+    def test_create_json_file_matches_json_dump(self, mock_file_open):
+        """
+        Test that the element-by-element JSON output matches json.dump(indent=4).
+        """
+        data = [{'id': 1, 'tags': ['a', 'b']}, {'id': 2, 'tags': []}]
+        filepath = create_json_file(iter(data), "iter.json")
+
+        self.assertIsNotNone(filepath)
+        written = "".join(call.args[0] for call in mock_file_open().write.call_args_list)
+        self.assertEqual(written, json.dumps(data, indent=4))
+
+
+class TestBufferedWriters(unittest.TestCase):
+
+    @patch('builtins.open', new_callable=mock_open)
+    def test_create_csv_file_flushes_in_chunks(self, mock_file_open):
+        """
+        Test that create_csv_file groups rows into writes of at least flush_size characters.
+        """
+        rows = ({'id': i, 'name': f'Name{i}'} for i in range(100))
+        create_csv_file(rows, "chunks.csv", flush_size=256)
+
+        writes = [call.args[0] for call in mock_file_open().write.call_args_list]
+        self.assertGreater(len(writes), 1)
+        self.assertLess(len(writes), 101)
+        self.assertTrue(all(len(chunk) >= 256 for chunk in writes[:-1]))
+        self.assertTrue("".join(writes).endswith("99,Name99\r\n"))
+
+    @patch('builtins.open', new_callable=mock_open)
+    def test_create_csv_file_uses_given_fieldnames(self, mock_file_open):
+        """
+        Test that an explicit header (e.g. from cursor metadata) overrides the first row's keys.
+        """
+        create_csv_file([{'name': 'Test1', 'id': 1}], "header.csv", fieldnames=['id', 'name'])
+
+        written = "".join(call.args[0] for call in mock_file_open().write.call_args_list)
+        self.assertEqual(written, "id,name\r\n1,Test1\r\n")
+
+    @patch('builtins.open', new_callable=mock_open)
+    def test_create_json_file_compact_array(self, mock_file_open):
+        """
+        Test that indent=None writes a compact streaming JSON array.
+        """
+        data = [{'id': 1}, {'id': 2}]
+        create_json_file(iter(data), "compact.json", indent=None)
+
+        written = "".join(call.args[0] for call in mock_file_open().write.call_args_list)
+        self.assertEqual(json.loads(written), data)
+        self.assertNotIn("\n", written)
+
+    @patch('builtins.open', new_callable=mock_open)
+    def test_create_jsonl_file_writes_one_object_per_line(self, mock_file_open):
+        """
+        Test that create_jsonl_file writes newline-delimited JSON and stringifies datetimes.
+        """
+        from datetime import datetime
+        data = [{'id': 1, 'created_at': datetime(2024, 1, 1, 8, 0)}, {'id': 2, 'created_at': None}]
+        filepath = create_jsonl_file(iter(data), "rows.jsonl")
+
+        self.assertIsNotNone(filepath)
+        mock_file_open.assert_called_once_with(filepath, 'w', encoding='utf-8')
+        written = "".join(call.args[0] for call in mock_file_open().write.call_args_list)
+        self.assertEqual(written.splitlines(), [
+            '{"id":1,"created_at":"2024-01-01 08:00:00"}',
+            '{"id":2,"created_at":null}'
+        ])
+
+    def test_create_jsonl_file_no_data(self):
+        """
+        Test that create_jsonl_file returns None if no data is provided.
+        """
+        self.assertIsNone(create_jsonl_file([], "empty.jsonl"))
+
+
+class TestStreamingXml(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.TemporaryDirectory()
+        self.dir_patcher = patch('your_project_name.config.settings.OUTPUT_FILE_DIRECTORY', self.output_dir.name)
+        self.dir_patcher.start()
+
+    def tearDown(self):
+        self.dir_patcher.stop()
+        self.output_dir.cleanup()
+
+    def test_create_xml_file_from_template_streams_records(self):
+        """
+        Test that the streamed XML keeps the template metadata and contains one record per row.
+        """
+        rows = iter([{'item_id': 'A1', 'value': 100}, {'item_id': 'B&2', 'value': 200}])
+        filepath = create_xml_file_from_template(rows, "stream.xml")
+
+        self.assertEqual(filepath, os.path.join(self.output_dir.name, "stream.xml"))
+        root = etree.parse(filepath).getroot()
+        self.assertEqual(root.tag, 'data_export')
+        self.assertNotEqual(root.findtext('.//generated_at'), '{{ current_timestamp }}')
+        self.assertEqual(root.findtext('.//source'), 'PostgreSQL Database')
+        records = root.findall('.//records/record')
+        self.assertEqual([record.findtext('item_id') for record in records], ['A1', 'B&2'])
+        self.assertEqual(records[1].findtext('value'), '200')
+
+    def test_create_xml_file_from_template_empty_iterator(self):
+        """
+        Test that no file is written for an empty iterator.
+        """
+        self.assertIsNone(create_xml_file_from_template(iter([]), "empty.xml"))
+        self.assertEqual(os.listdir(self.output_dir.name), [])
+
+    def test_create_xml_file_from_template_serializes_typed_values(self):
+        """
+        Test that values are written in their XML Schema form and None as xsi:nil instead of "None".
+        """
+        rows = [
+            {'id': 1, 'amount': Decimal('1E+2'), 'created': datetime(2024, 1, 2, 3, 4, 5), 'active': True,
+             'note': 'a < b & c'},
+            {'id': 2, 'amount': None, 'created': date(2024, 1, 3), 'active': False, 'note': None},
+        ]
+        filepath = create_xml_file_from_template(rows, "typed.xml")
+
+        records = etree.parse(filepath).getroot().findall('.//records/record')
+        self.assertEqual([child.text for child in records[0]], ['1', '100', '2024-01-02T03:04:05', 'true', 'a < b & c'])
+        nil_attribute = '{http://www.w3.org/2001/XMLSchema-instance}nil'
+        self.assertEqual(records[1].find('amount').get(nil_attribute), 'true')
+        self.assertEqual(records[1].find('note').get(nil_attribute), 'true')
+        self.assertEqual(records[1].findtext('created'), '2024-01-03')
+
+    def test_create_xml_file_from_template_rejects_invalid_text_and_spells_special_floats(self):
+        """
+        Test that control characters fail the export like lxml did, and NaN/infinity use their xs:double names.
+        """
+        filepath = create_xml_file_from_template([{'score': float('nan'), 'high': float('inf'),
+                                                   'low': float('-inf'), 'note': 'ok'}], "floats.xml")
+        record = etree.parse(filepath).getroot().find('.//records/record')
+        self.assertEqual([child.text for child in record], ['NaN', 'INF', '-INF', 'ok'])
+
+        self.assertIsNone(create_xml_file_from_template([{'id': 1, 'note': 'x\x01y'}], "control.xml"))
+        self.assertIsNone(create_xml_file_from_template([{'note': 'a', 'other': 'x\x00y'}], "null.xml"))
+
+    def test_compiled_xml_template_is_cached_until_the_file_changes(self):
+        """
+        Test that the template is parsed once, reused across files, and recompiled when it is modified.
+        """
+        template_path = os.path.join(self.output_dir.name, "template.xml")
+        with open(template_path, 'w', encoding='utf-8') as f:
+            f.write("<export><tenant name=\"{{ tenant }}\">{{ tenant }}</tenant><records/></export>")
+
+        with patch('your_project_name.config.settings.XML_TEMPLATE_FILE_NAME', template_path), \
+                patch('your_project_name.file_handler.file_operations.etree.parse', wraps=etree.parse) as mock_parse:
+            first_path = create_xml_file_from_template([{'id': 1}], "a.xml", metadata={"tenant": 'A&"B"'})
+            create_xml_file_from_template([{'id': 2}], "b.xml", metadata={"tenant": "C"})
+            self.assertEqual(mock_parse.call_count, 1)
+
+            with open(template_path, 'w', encoding='utf-8') as f:
+                f.write("<export><records/><count>{{ unknown }}</count></export>")
+            os.utime(template_path, ns=(0, 0))
+            third_path = create_xml_file_from_template([{'id': 3}], "c.xml")
+            self.assertEqual(mock_parse.call_count, 2)
+
+        root = etree.parse(first_path).getroot()
+        self.assertEqual(root.find('tenant').get('name'), 'A&"B"')
+        self.assertEqual(root.findtext('tenant'), 'A&"B"')
+        self.assertEqual(root.findtext('records/record/id'), '1')
+        self.assertEqual(etree.parse(third_path).getroot().findtext('count'), '{{ unknown }}')
+        self.assertIs(get_compiled_xml_template(template_path), get_compiled_xml_template(template_path))
+
+class TestCompressedOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.TemporaryDirectory()
+        self.dir_patcher = patch('your_project_name.config.settings.OUTPUT_FILE_DIRECTORY', self.output_dir.name)
+        self.dir_patcher.start()
+        self.rows = [{'id': i, 'name': f'Name{i}'} for i in range(50)]
+
+    def tearDown(self):
+        self.dir_patcher.stop()
+        self.output_dir.cleanup()
+
+    def test_gzip_writers_append_extension_and_round_trip(self):
+        """
+        Test that gzip-compressed CSV, JSON and XML files decompress to the uncompressed output.
+        """
+        csv_path = create_csv_file(self.rows, "users.csv", compression="gzip")
+        plain_csv_path = create_csv_file(self.rows, "plain_users.csv")
+        json_path = create_json_file(iter(self.rows), "users.json", compression="gzip")
+        xml_path = create_xml_file_from_template(self.rows, "users.xml", compression="gzip")
+
+        self.assertTrue(csv_path.endswith("users.csv.gz"))
+        with gzip.open(csv_path, 'rb') as f, open(plain_csv_path, 'rb') as plain_file:
+            self.assertEqual(f.read(), plain_file.read())
+        with gzip.open(json_path, 'rt', encoding='utf-8') as f:
+            self.assertEqual(json.load(f), self.rows)
+        with gzip.open(xml_path, 'rb') as f:
+            records = etree.parse(f).getroot().findall('.//records/record')
+        self.assertEqual(len(records), 50)
+
+    def test_zstd_output(self):
+        """
+        Test that zstd output decompresses to the written text, or fails clearly without zstandard.
+        """
+        filepath = os.path.join(self.output_dir.name, "users.jsonl.zst")
+        try:
+            import zstandard
+        except ImportError:
+            with self.assertRaises(ImportError):
+                open_output_file(filepath, "zstd")
+            return
+        with open_output_file(filepath, "zstd", level=1) as f:
+            f.write('{"id":1}\n')
+        with open(filepath, 'rb') as f:
+            self.assertEqual(zstandard.ZstdDecompressor().stream_reader(f).read(), b'{"id":1}\n')
+
+    def test_serialized_chunks_match_written_file(self):
+        """
+        Test that the streamed chunks, plain or gzipped, are the bytes the CSV writer puts in the file.
+        """
+        with open(create_csv_file(self.rows, "users.csv"), 'rb') as f:
+            expected = f.read()
+
+        chunks = list(iter_serialized_chunks(iter(self.rows), "csv", flush_size=100))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b"".join(chunks), expected)
+        self.assertEqual(gzip.decompress(b"".join(iter_serialized_chunks(self.rows, "csv", "gzip"))), expected)
+        self.assertEqual(list(iter_serialized_chunks([], "csv")), [])
+
+    def test_unknown_compression_is_rejected(self):
+        """
+        Test that an unsupported codec name raises ValueError.
+        """
+        with self.assertRaises(ValueError):
+            create_csv_file(self.rows, "users.csv", compression="lzma")
+
+    def test_cache_keys_differ_by_compression(self):
+        """
+        Test that compressed and uncompressed exports of the same rows are cached separately.
+        """
+        with patch('your_project_name.config.settings.EXPORT_CACHE_DIRECTORY',
+                   os.path.join(self.output_dir.name, "cache")):
+            plain_path, plain_key = create_file_cached(self.rows, "csv", "users.csv", compression=None)
+            gzip_path, gzip_key = create_file_cached(self.rows, "csv", "users.csv", compression="gzip")
+
+        self.assertNotEqual(plain_key, gzip_key)
+        self.assertEqual(gzip_path, plain_path + ".gz")
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class TestShardedOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.TemporaryDirectory()
+        self.dir_patcher = patch('your_project_name.config.settings.OUTPUT_FILE_DIRECTORY', self.output_dir.name)
+        self.dir_patcher.start()
+        self.rows = [{'id': i, 'name': f'Name{i}'} for i in range(10)]
+
+    def tearDown(self):
+        self.dir_patcher.stop()
+        self.output_dir.cleanup()
+
+    def read_manifest(self, manifest_path):
+        with open(manifest_path) as f:
+            return json.load(f)
+
+    def test_row_limit_writes_complete_csv_and_json_parts(self):
+        """
+        Test that every part is a complete document, listed in the manifest and reported when closed.
+        """
+        closed = []
+        manifest_path = create_sharded_files(iter(self.rows), "csv", "users.csv", max_rows=4, max_bytes=0,
+                                             compression=None, on_part=closed.append)
+
+        manifest = self.read_manifest(manifest_path)
+        self.assertEqual(manifest_path, os.path.join(self.output_dir.name, "users.manifest.json"))
+        self.assertEqual([part["file"] for part in manifest["parts"]],
+                         ["users.part-00001.csv", "users.part-00002.csv", "users.part-00003.csv"])
+        self.assertEqual([part["rows"] for part in manifest["parts"]], [4, 4, 2])
+        self.assertEqual(manifest["total_rows"], 10)
+        self.assertEqual(closed, [os.path.join(self.output_dir.name, part["file"]) for part in manifest["parts"]])
+        with open(closed[2], newline='') as f:
+            self.assertEqual(f.read(), "id,name\r\n8,Name8\r\n9,Name9\r\n")
+
+        manifest = self.read_manifest(create_sharded_files(self.rows, "json", "users.json", max_rows=6,
+                                                           max_bytes=0, compression="gzip"))
+        parts = []
+        for part in manifest["parts"]:
+            with gzip.open(os.path.join(self.output_dir.name, part["file"]), 'rt') as f:
+                parts.append(json.load(f))
+        self.assertEqual(parts, [self.rows[:6], self.rows[6:]])
+
+    def test_byte_limit_keeps_xml_parts_within_size_with_template_metadata(self):
+        """
+        Test that XML parts stay within the byte limit and each repeats the template metadata.
+        """
+        manifest = self.read_manifest(create_sharded_files(self.rows, "xml", "users.xml", max_rows=0,
+                                                           max_bytes=700, compression=None))
+
+        self.assertGreater(len(manifest["parts"]), 1)
+        record_ids = []
+        timestamps = set()
+        for part in manifest["parts"]:
+            self.assertLessEqual(part["bytes"], 700)
+            root = etree.parse(os.path.join(self.output_dir.name, part["file"])).getroot()
+            timestamps.add(root.findtext('.//generated_at'))
+            self.assertEqual(root.findtext('.//source'), 'PostgreSQL Database')
+            record_ids.extend(int(record.findtext('id')) for record in root.findall('.//records/record'))
+        self.assertEqual(record_ids, list(range(10)))
+        self.assertEqual(len(timestamps), 1)
+
+    def test_failing_row_removes_the_open_part(self):
+        """
+        Test that a row failing to serialize closes and deletes the part left open, keeping the parts already closed.
+        """
+        rows = [{'id': 1, 'note': 'ok'}, {'id': 2, 'note': 'ok'}, {'id': 3, 'note': 'x\x01y'}]
+
+        self.assertIsNone(create_sharded_files(iter(rows), "xml", "users.xml", max_rows=1, max_bytes=0,
+                                               compression="gzip"))
+        self.assertEqual(os.listdir(self.output_dir.name), ["users.part-00001.xml.gz"])
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_row_limit_splits_parquet_parts(self):
+        """
+        Test that Parquet parts are split by rows.
+        """
+        manifest = self.read_manifest(create_sharded_files(self.rows, "parquet", "users.parquet", max_rows=4))
+
+        self.assertEqual([part["rows"] for part in manifest["parts"]], [4, 4, 2])
+        table = pyarrow.parquet.read_table(os.path.join(self.output_dir.name, "users.part-00003.parquet"))
+        self.assertEqual(table.column('id').to_pylist(), [8, 9])
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_byte_limit_is_enforced_for_parquet_parts(self):
+        """
+        Test that a Parquet byte limit needs a row limit, and that a part over it fails the export before upload.
+        """
+        uploaded = []
+
+        self.assertIsNone(create_sharded_files(self.rows, "parquet", "users.parquet", max_bytes=10 ** 6,
+                                               on_part=uploaded.append))
+        self.assertIsNone(create_sharded_files(self.rows, "parquet", "users.parquet", max_rows=4, max_bytes=100,
+                                               on_part=uploaded.append))
+        self.assertEqual(uploaded, [])
+
+class TestColumnarOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.TemporaryDirectory()
+        self.dir_patcher = patch('your_project_name.config.settings.OUTPUT_FILE_DIRECTORY', self.output_dir.name)
+        self.dir_patcher.start()
+        self.description = [
+            Column(name='user_id', type_code=23),
+            Column(name='status', type_code=25),
+            Column(name='balance', type_code=1700, precision=10, scale=2),
+            Column(name='created_at', type_code=1184),
+            Column(name='birthday', type_code=1082),
+            Column(name='profile', type_code=3802),
+        ]
+        created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.raw_batches = [
+            (self.description, [(i, 'active' if i % 2 else 'inactive', Decimal('10.50'), created_at,
+                                 date(1990, 1, 1), {'tier': i}) for i in range(batch * 3, batch * 3 + 3)])
+            for batch in range(4)
+        ]
+        self.raw_batches[0][1][0] = (0, None, None, None, None, None)
+
+    def tearDown(self):
+        self.dir_patcher.stop()
+        self.output_dir.cleanup()
+
+    def test_iter_record_batches_uses_cursor_types(self):
+        """
+        Test that record batches are typed from the cursor description, keeping nulls.
+        """
+        batches = list(iter_record_batches(self.raw_batches))
+
+        self.assertEqual(len(batches), 4)
+        schema = batches[0].schema
+        self.assertEqual(schema.field('user_id').type, pyarrow.int32())
+        self.assertEqual(schema.field('balance').type, pyarrow.decimal128(10, 2))
+        self.assertEqual(schema.field('created_at').type, pyarrow.timestamp('us', tz='UTC'))
+        self.assertEqual(schema.field('birthday').type, pyarrow.date32())
+        self.assertEqual(schema.field('profile').type, pyarrow.string())
+        self.assertEqual(batches[0].column('status').null_count, 1)
+        self.assertEqual(batches[1].column('profile').to_pylist()[0], '{"tier": 3}')
+
+    def test_create_parquet_file_sizes_row_groups_and_encodes_dictionaries(self):
+        """
+        Test that batches are regrouped into row groups of row_group_size rows with dictionary encoding.
+        """
+        filepath = create_parquet_file(iter_record_batches(self.raw_batches), "users.parquet", row_group_size=5)
+
+        parquet_file = pyarrow.parquet.ParquetFile(filepath)
+        self.assertEqual(parquet_file.metadata.num_rows, 12)
+        self.assertEqual([parquet_file.metadata.row_group(i).num_rows
+                          for i in range(parquet_file.metadata.num_row_groups)], [5, 1, 5, 1])
+        status_column = parquet_file.metadata.row_group(0).column(1)
+        self.assertIn('RLE_DICTIONARY', status_column.encodings)
+        self.assertEqual(status_column.compression, 'ZSTD')
+        table = parquet_file.read()
+        self.assertEqual(table.column('user_id').to_pylist(), list(range(12)))
+        self.assertEqual(table.column('balance').to_pylist()[1], Decimal('10.50'))
+
+    def test_columnar_writers_accept_dict_rows(self):
+        """
+        Test that dictionaries are also accepted, and that empty input creates no file.
+        """
+        rows = [{'id': i, 'name': f'Name{i}'} for i in range(10)]
+
+        parquet_path = create_parquet_file(iter(rows), "rows.parquet", codec="snappy", row_group_size=4)
+        arrow_path = create_arrow_file(rows, "rows.arrow", batch_size=3)
+
+        self.assertEqual(pyarrow.parquet.read_table(parquet_path).to_pylist(), rows)
+        with pyarrow.ipc.open_file(arrow_path) as reader:
+            self.assertEqual(reader.num_record_batches, 4)
+            self.assertEqual(reader.read_all().to_pylist(), rows)
+        self.assertIsNone(create_parquet_file(iter([]), "empty.parquet"))
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir.name, "empty.parquet")))
+
+    def test_arrow_file_rejects_parquet_only_codec(self):
+        """
+        Test that a codec Arrow cannot write, such as "snappy", fails the export instead of raising.
+        """
+        self.assertIsNone(create_arrow_file([{'id': 1}], "rows.arrow", codec="snappy"))
+
+    def test_cached_columnar_files_ignore_output_compression(self):
+        """
+        Test that OUTPUT_COMPRESSION neither changes the Parquet codec nor wraps a cached Parquet file in gzip.
+        """
+        rows = [{'id': i, 'name': f'Name{i}'} for i in range(10)]
+        with patch('your_project_name.config.settings.EXPORT_CACHE_DIRECTORY',
+                   os.path.join(self.output_dir.name, "cache")):
+            first_path, first_key = create_file_cached(rows, "parquet", "rows.parquet", compression="gzip")
+            cached_path, cached_key = create_file_cached(rows, "parquet", "rows.parquet", compression="gzip")
+
+        self.assertEqual(first_path, os.path.join(self.output_dir.name, "rows.parquet"))
+        self.assertEqual(cached_path, first_path)
+        self.assertEqual(cached_key, first_key)
+        metadata = pyarrow.parquet.ParquetFile(cached_path).metadata
+        self.assertEqual(metadata.row_group(0).column(0).compression, 'ZSTD')
@@ -0,0 +1,144 @@
+# tests/test_http_client.py
+
+import unittest
+from unittest.mock import patch, MagicMock
+import io
+import tempfile
+import requests
+from your_project_name.api_client.http_client import ApiClient, FileBody
+
+def make_response(status_code, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+@patch('your_project_name.api_client.http_client.time.sleep')
+class TestApiClient(unittest.TestCase):
+
+    def setUp(self):
+        self.client = ApiClient(pool_size=4, max_retries=3, backoff_factor=1, max_backoff=10, timeout=(1, 2))
+
+    def test_adapter_pool_size(self, mock_sleep):
+        """
+        Test that the session mounts a pooled adapter for http and https.
+        """
+        adapter = self.client.session.get_adapter("https://api.example.com")
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertIs(self.client.session.get_adapter("http://api.example.com"), adapter)
+
+    @patch('requests.Session.request')
+    def test_retries_5xx_with_backoff(self, mock_request, mock_sleep):
+        """
+        Test that 5xx responses are retried with jittered exponential backoff.
+        """
+        mock_request.side_effect = [make_response(503), make_response(502), make_response(200)]
+
+        response = self.client.post("https://api.example.com/data", json={"a": 1})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_request.call_count, 3)
+        delays = [call.args[0] for call in mock_sleep.call_args_list]
+        self.assertTrue(0 <= delays[0] <= 1)
+        self.assertTrue(0 <= delays[1] <= 2)
+        self.assertEqual(mock_request.call_args.kwargs['timeout'], (1, 2))
+
+    @patch('requests.Session.request')
+    def test_honors_retry_after(self, mock_request, mock_sleep):
+        """
+        Test that the Retry-After header of a 429 response sets the delay, capped at max_backoff.
+        """
+        mock_request.side_effect = [
+            make_response(429, {"Retry-After": "7"}),
+            make_response(429, {"Retry-After": "120"}),
+            make_response(200),
+        ]
+
+        self.client.get("https://api.example.com/data")
+
+        self.assertEqual([call.args[0] for call in mock_sleep.call_args_list], [7.0, 10])
+
+    @patch('requests.Session.request')
+    def test_returns_last_response_when_retries_exhausted(self, mock_request, mock_sleep):
+        """
+        Test that the last retryable response is returned after max_retries retries.
+        """
+        mock_request.return_value = make_response(500)
+
+        response = self.client.get("https://api.example.com/data", max_retries=1)
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch('requests.Session.request')
+    def test_does_not_retry_client_errors(self, mock_request, mock_sleep):
+        """
+        Test that 4xx responses other than 429 are returned immediately.
+        """
+        mock_request.return_value = make_response(404)
+
+        self.assertEqual(self.client.get("https://api.example.com/data").status_code, 404)
+        mock_request.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    @patch('requests.Session.request')
+    def test_retries_connection_errors_and_rewinds_body(self, mock_request, mock_sleep):
+        """
+        Test that connection errors are retried and a file body is rewound before the retry.
+        """
+        body = io.BytesIO(b"payload")
+        positions = []
+
+        def send(method, url, **kwargs):
+            positions.append(kwargs['data'].tell())
+            kwargs['data'].read()
+            if len(positions) == 1:
+                raise requests.exceptions.ConnectionError("reset")
+            return make_response(200)
+
+        mock_request.side_effect = send
+
+        response = self.client.post("https://api.example.com/upload", data=body, timeout=5)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(positions, [0, 0])
+        self.assertEqual(mock_request.call_args.kwargs['timeout'], 5)
+
+    @patch('requests.Session.request')
+    def test_file_body_is_sent_as_mapped_memoryview_over_tls(self, mock_request, mock_sleep):
+        """
+        Test that an https FileBody is sent through the session as a memoryview of the whole file.
+        """
+        sent = []
+        mock_request.side_effect = lambda method, url, **kwargs: sent.append(bytes(kwargs['data'])) or make_response(200)
+        with tempfile.TemporaryFile() as f:
+            f.write(b"x" * 5000)
+            f.flush()
+
+            response = self.client.post("https://api.example.com/upload", data=FileBody(f))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sent, [b"x" * 5000])
+
+    @patch('your_project_name.api_client.http_client.time.monotonic', return_value=100.0)
+    @patch('requests.Session.request', return_value=make_response(200))
+    def test_rate_limit_spaces_requests_per_host(self, mock_request, mock_monotonic, mock_sleep):
+        """
+        Test that requests to one host are spaced by 1/rate_limit seconds and other hosts are not delayed.
+        """
+        client = ApiClient(rate_limit=4)
+
+        for _ in range(3):
+            client.get("https://api.example.com/data")
+        client.get("https://other.example.com/data")
+
+        self.assertEqual([call.args[0] for call in mock_sleep.call_args_list], [0.25, 0.5])
+
+    @patch('requests.Session.request', side_effect=requests.exceptions.ConnectionError("down"))
+    def test_raises_after_last_connection_error(self, mock_request, mock_sleep):
+        """
+        Test that the connection error is raised once retries are exhausted.
+        """
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.client.get("https://api.example.com/data")
+        self.assertEqual(mock_request.call_count, 4)
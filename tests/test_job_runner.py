@@ -0,0 +1,123 @@
+# tests/test_job_runner.py
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from your_project_name.pipeline import job_runner
+
+class TestJobRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.dir_patcher = patch('your_project_name.config.settings.OUTPUT_FILE_DIRECTORY', self.temp_dir)
+        self.dir_patcher.start()
+        self.jobs = [
+            {"name": "users", "query": "SELECT * FROM users", "format": "csv", "filename": "users.csv"},
+            {"name": "orders", "query": "SELECT * FROM orders", "format": "jsonl", "filename": "orders.jsonl",
+             "endpoint": "http://orders-api"},
+        ]
+
+    def tearDown(self):
+        self.dir_patcher.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def write_manifest(self, filename, content):
+        manifest_path = os.path.join(self.temp_dir, filename)
+        with open(manifest_path, 'w') as f:
+            f.write(content)
+        return manifest_path
+
+    def test_load_job_manifest_json_and_yaml(self):
+        """
+        Test that JSON lists and YAML mappings with a "jobs" key are both accepted.
+        """
+        json_path = self.write_manifest("jobs.json", json.dumps(self.jobs))
+        self.assertEqual(job_runner.load_job_manifest(json_path), self.jobs)
+
+        yaml_path = self.write_manifest("jobs.yaml", (
+            "jobs:\n"
+            "  - name: users\n"
+            "    query: SELECT * FROM users\n"
+            "    format: csv\n"
+            "    filename: users.csv\n"
+        ))
+        self.assertEqual(job_runner.load_job_manifest(yaml_path), [self.jobs[0]])
+
+    def test_load_job_manifest_rejects_invalid_jobs(self):
+        """
+        Test that missing keys, unknown formats and duplicate names are reported.
+        """
+        invalid_manifests = [
+            [{"name": "users", "query": "SELECT 1", "format": "csv"}],
+            [{"name": "users", "query": "SELECT 1", "format": "pdf", "filename": "users.pdf"}],
+            [self.jobs[0], self.jobs[0]],
+            {"jobs": []},
+        ]
+        for manifest in invalid_manifests:
+            manifest_path = self.write_manifest("jobs.json", json.dumps(manifest))
+            with self.assertRaises(ValueError):
+                job_runner.load_job_manifest(manifest_path)
+
+    @patch('your_project_name.pipeline.job_runner.api_sender.upload_file_to_api', return_value=True)
+    @patch('your_project_name.pipeline.job_runner.db_connector.iter_rows_from_db')
+    def test_run_jobs_isolates_failures(self, mock_iter_rows, mock_upload):
+        """
+        Test that a failing job is reported without affecting the others, in manifest order.
+        """
+        def iter_rows(query):
+            if "orders" in query:
+                raise RuntimeError("relation orders does not exist")
+            if "FALSE" in query:
+                return
+            yield {'id': 1}
+            yield {'id': 2}
+        mock_iter_rows.side_effect = iter_rows
+        jobs = self.jobs + [{"name": "empty", "query": "SELECT * FROM users WHERE FALSE", "format": "json",
+                             "filename": "empty.json"}]
+
+        results = job_runner.run_jobs(jobs, max_workers=2, executor="thread")
+
+        self.assertEqual([result["name"] for result in results], ["users", "orders", "empty"])
+        self.assertEqual([result["status"] for result in results], ["success", "failed", "no_data"])
+        self.assertEqual(results[0]["rows"], 2)
+        self.assertIn("relation orders does not exist", results[1]["error"])
+        mock_upload.assert_called_once_with(os.path.join(self.temp_dir, "users.csv"), job_runner.settings.API_ENDPOINT,
+                                            job_runner.settings.API_KEY, job_runner.settings.UPLOAD_MODE,
+                                            cache_key=None)
+
+    @patch('your_project_name.pipeline.job_runner.api_sender.upload_file_to_api')
+    @patch('your_project_name.pipeline.job_runner.db_connector.iter_rows_from_db')
+    def test_run_export_job_incremental_advances_watermark_after_upload(self, mock_iter_rows, mock_upload):
+        """
+        Test that an incremental job queries past the saved watermark and only advances it after a successful upload.
+        """
+        job = {"name": "users", "query": "SELECT * FROM users", "format": "jsonl", "filename": "users.jsonl",
+               "watermark_column": "user_id"}
+        mock_iter_rows.side_effect = lambda query: iter([{'user_id': 11}, {'user_id': 12}])
+
+        with patch('your_project_name.pipeline.watermark_store.load_watermark', return_value=10) as mock_load, \
+                patch('your_project_name.pipeline.watermark_store.save_watermark') as mock_save:
+            mock_upload.return_value = False
+            self.assertEqual(job_runner.run_export_job(job)["status"], "failed")
+            mock_save.assert_not_called()
+
+            mock_upload.return_value = True
+            self.assertEqual(job_runner.run_export_job(job)["status"], "success")
+            mock_save.assert_called_once_with("users", 12)
+
+        mock_load.assert_called_with("users")
+        self.assertIn("WHERE user_id > 10", mock_iter_rows.call_args.args[0])
+
+    def test_run_jobs_rejects_unknown_executor(self):
+        """
+        Test that an unknown executor name raises ValueError.
+        """
+        with self.assertRaises(ValueError):
+            job_runner.run_jobs(self.jobs, executor="cluster")
+
+if __name__ == '__main__':
+    unittest.main()
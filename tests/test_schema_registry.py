@@ -0,0 +1,56 @@
+# tests/test_schema_registry.py
+
+import tempfile
+import unittest
+
+from your_project_name.database import schema_registry
+
+class TestSchemaRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.schema = schema_registry.schema_from_columns(
+            ["id", "Full Name", "signed_up", "score"],
+            ["id INTEGER", "full_name TEXT", "signed_up TIMESTAMP", "score NUMERIC"],
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_register_and_load_schema(self):
+        """
+        Test that a registered schema is returned as written and unknown tables have none.
+        """
+        self.assertIsNone(schema_registry.load_schema("people", self.temp_dir.name))
+
+        schema_registry.register_schema("people", self.schema, self.temp_dir.name)
+
+        self.assertEqual(schema_registry.load_schema("people", self.temp_dir.name), self.schema)
+        self.assertEqual(schema_registry.columns_sql(self.schema),
+                         "id INTEGER, full_name TEXT, signed_up TIMESTAMP, score NUMERIC")
+
+    def test_validate_header_reports_differences(self):
+        """
+        Test that matching headers pass and missing, unexpected or reordered columns raise ValueError.
+        """
+        schema_registry.validate_header(self.schema, ["id", "Full Name", "signed_up", "score"])
+
+        with self.assertRaisesRegex(ValueError, "missing score; unexpected points"):
+            schema_registry.validate_header(self.schema, ["id", "Full Name", "signed_up", "points"])
+        with self.assertRaisesRegex(ValueError, "different order"):
+            schema_registry.validate_header(self.schema, ["Full Name", "id", "signed_up", "score"])
+
+    def test_read_csv_options_maps_sql_types(self):
+        """
+        Test that SQL types become pandas dtypes, timestamps are parsed as dates and unknown types as text.
+        """
+        self.schema["columns"].append({"header": "tags", "name": "tags", "type": "JSONB"})
+
+        options = schema_registry.read_csv_options(self.schema)
+
+        self.assertEqual(options["dtype"], {"id": "Int64", "Full Name": "string", "score": "float64",
+                                            "tags": "string"})
+        self.assertEqual(options["parse_dates"], ["signed_up"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,257 @@
+# tests/test_upload_modes.py
+
+import gzip
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch, MagicMock
+
+from your_project_name.api_client.api_sender import (
+    PartUploader,
+    call_get_api,
+    call_post_api,
+    stream_rows_to_api,
+    upload_file_in_chunks,
+    upload_file_to_api,
+    upload_files,
+)
+from your_project_name.api_client.http_client import ApiClient
+from your_project_name.file_handler.file_operations import create_sharded_files
+
+class RecordingUploadHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the upload API that records every request it receives."""
+
+    def do_POST(self):
+        if self.headers.get('Transfer-Encoding') == 'chunked':
+            body = b""
+            while (size := int(self.rfile.readline().split(b";")[0], 16)):
+                body += self.rfile.read(size)
+                self.rfile.readline()
+            self.rfile.readline()
+        else:
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        server = self.server
+        server.requests.append((dict(self.headers), body))
+        status = server.failures.pop(0) if server.failures else 200
+        if status == 200 and 'X-Upload-Offset' in self.headers:
+            server.chunks[int(self.headers['X-Upload-Offset'])] = body
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(b'{"status": "ok"}')
+
+    def log_message(self, format, *args):
+        pass
+
+class TestStreamingUploads(unittest.TestCase):
+
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), RecordingUploadHandler)
+        self.server.requests = []
+        self.server.chunks = {}
+        self.server.failures = []
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+        self.api_endpoint = f"http://127.0.0.1:{self.server.server_port}/upload"
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.temp_dir.name, "export.csv")
+        self.content = os.urandom(2500)
+        with open(self.filepath, 'wb') as f:
+            f.write(self.content)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def test_stream_mode_sends_multipart_body(self):
+        """
+        Test that the streamed multipart body has a Content-Length and contains the whole file.
+        """
+        success = upload_file_to_api(self.filepath, self.api_endpoint, "test_key", mode="stream")
+
+        self.assertTrue(success)
+        headers, body = self.server.requests[0]
+        self.assertEqual(int(headers['Content-Length']), len(body))
+        self.assertTrue(headers['Content-Type'].startswith('multipart/form-data; boundary='))
+        self.assertIn(b'filename="export.csv"', body)
+        self.assertIn(b'Content-Type: text/csv', body)
+        self.assertIn(self.content, body)
+
+    def test_raw_mode_sends_file_as_body_with_sendfile(self):
+        """
+        Test that raw mode sends the file itself with sendfile, a Content-Length, and re-sends it on a retry.
+        """
+        self.server.failures = [503]
+        with patch('socket.socket.sendfile', autospec=True, side_effect=socket.socket.sendfile) as mock_sendfile:
+            success = upload_file_to_api(self.filepath, self.api_endpoint, "test_key", mode="raw",
+                                         client=ApiClient(backoff_factor=0))
+
+        self.assertTrue(success)
+        self.assertEqual(mock_sendfile.call_count, 2)
+        headers, body = self.server.requests[-1]
+        self.assertEqual(body, self.content)
+        self.assertEqual(headers['Content-Length'], str(len(self.content)))
+        self.assertEqual(headers['Content-Type'], 'text/csv')
+        self.assertEqual(headers['X-File-Name'], 'export.csv')
+        self.assertEqual(headers['X-API-Key'], 'test_key')
+
+    def test_stream_rows_to_api_sends_compressed_chunked_body_and_tee(self):
+        """
+        Test that streamed rows are sent gzipped with chunked encoding, and the tee file holds the same bytes.
+        """
+        rows = ({'id': i, 'name': f'Name{i}'} for i in range(1000))
+        with patch('your_project_name.config.settings.OUTPUT_FILE_DIRECTORY', self.temp_dir.name):
+            success = stream_rows_to_api(rows, "jsonl", "users.jsonl", self.api_endpoint, "test_key",
+                                         compression="gzip", tee=True)
+
+        self.assertTrue(success)
+        headers, body = self.server.requests[0]
+        self.assertEqual(headers['Transfer-Encoding'], 'chunked')
+        self.assertEqual(headers['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['X-File-Name'], 'users.jsonl.gz')
+        lines = gzip.decompress(body).decode("utf-8").splitlines()
+        self.assertEqual(len(lines), 1000)
+        self.assertEqual(lines[-1], '{"id":999,"name":"Name999"}')
+        with open(os.path.join(self.temp_dir.name, "users.jsonl.gz"), 'rb') as f:
+            self.assertEqual(f.read(), body)
+
+        self.assertFalse(stream_rows_to_api(iter([]), "jsonl", "users.jsonl", self.api_endpoint, tee=False))
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_chunked_upload_reassembles_file(self):
+        """
+        Test that the chunks sent with their offsets reassemble to the original file.
+        """
+        success = upload_file_in_chunks(self.filepath, self.api_endpoint, "test_key", chunk_size=1000)
+
+        self.assertTrue(success)
+        self.assertEqual(sorted(self.server.chunks), [0, 1000, 2000])
+        self.assertEqual(b"".join(self.server.chunks[offset] for offset in sorted(self.server.chunks)), self.content)
+        headers = self.server.requests[-1][0]
+        self.assertEqual(headers['Content-Range'], 'bytes 2000-2499/2500')
+        self.assertEqual(len({request[0]['X-Upload-Id'] for request in self.server.requests}), 1)
+
+    def test_chunked_upload_retries_only_failed_chunk(self):
+        """
+        Test that a chunk failing with a 5xx status is re-sent without re-sending accepted chunks.
+        """
+        self.server.failures = [200, 503]
+
+        success = upload_file_in_chunks(self.filepath, self.api_endpoint, chunk_size=1000, max_retries=2,
+                                        client=ApiClient(backoff_factor=0))
+
+        self.assertTrue(success)
+        offsets = [int(request[0]['X-Upload-Offset']) for request in self.server.requests]
+        self.assertEqual(offsets, [0, 1000, 1000, 2000])
+        self.assertEqual(b"".join(self.server.chunks[offset] for offset in sorted(self.server.chunks)), self.content)
+
+    def test_chunked_upload_resumes_from_offset(self):
+        """
+        Test that an interrupted upload can be resumed from the first missing offset.
+        """
+        success = upload_file_in_chunks(self.filepath, self.api_endpoint, chunk_size=1000,
+                                        upload_id="resume-me", start_offset=2000)
+
+        self.assertTrue(success)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.server.requests[0][0]['X-Upload-Id'], 'resume-me')
+        self.assertEqual(self.server.chunks[2000], self.content[2000:])
+
+    def test_chunked_upload_stops_on_client_error(self):
+        """
+        Test that a 4xx response fails the upload without retrying.
+        """
+        self.server.failures = [400]
+
+        self.assertFalse(upload_file_in_chunks(self.filepath, self.api_endpoint, chunk_size=1000))
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_compressed_file_uploads_declare_content_encoding(self):
+        """
+        Test that a .csv.gz file is sent as text/csv with Content-Encoding: gzip in every upload mode.
+        """
+        gz_filepath = self.filepath + ".gz"
+        os.rename(self.filepath, gz_filepath)
+
+        self.assertTrue(upload_file_to_api(gz_filepath, self.api_endpoint, mode="multipart"))
+        self.assertTrue(upload_file_to_api(gz_filepath, self.api_endpoint, mode="stream"))
+        self.assertTrue(upload_file_in_chunks(gz_filepath, self.api_endpoint, chunk_size=5000))
+
+        for _, body in self.server.requests[:2]:
+            self.assertIn(b'filename="export.csv.gz"\r\nContent-Type: text/csv\r\nContent-Encoding: gzip\r\n', body)
+            self.assertIn(self.content, body)
+        chunk_headers = self.server.requests[2][0]
+        self.assertEqual(chunk_headers['Content-Type'], 'text/csv')
+        self.assertEqual(chunk_headers['Content-Encoding'], 'gzip')
+
+    def test_part_uploader_uploads_parts_as_they_close(self):
+        """
+        Test that every part of a sharded export is uploaded, and that a failed part is reported.
+        """
+        rows = [{'id': i, 'name': f'Name{i}'} for i in range(7)]
+        with patch('your_project_name.config.settings.OUTPUT_FILE_DIRECTORY', self.temp_dir.name):
+            with PartUploader(self.api_endpoint, mode="multipart", max_workers=2) as uploader:
+                manifest_path = create_sharded_files(rows, "csv", "users.csv", max_rows=3, compression=None,
+                                                     on_part=uploader.submit)
+
+        self.assertTrue(uploader.succeeded)
+        self.assertTrue(os.path.exists(manifest_path))
+        filenames = sorted(body.split(b'filename="')[1].split(b'"')[0] for _, body in self.server.requests)
+        self.assertEqual(filenames, [b"users.part-00001.csv", b"users.part-00002.csv", b"users.part-00003.csv"])
+
+        self.server.failures = [500]
+        with PartUploader(self.api_endpoint, mode="multipart", client=ApiClient(max_retries=0)) as uploader:
+            uploader.submit(self.filepath)
+        self.assertFalse(uploader.succeeded)
+
+    def test_upload_files_resumes_from_journal(self):
+        """
+        Test that a batch upload sends every file once, reports failures and skips journaled files on a rerun.
+        """
+        batch_dir = os.path.join(self.temp_dir.name, "batch")
+        os.makedirs(batch_dir)
+        for name in ("a.csv", "b.csv", "c.csv", ".c.csv.tmp"):
+            with open(os.path.join(batch_dir, name), 'wb') as f:
+                f.write(self.content)
+        journal_file = os.path.join(self.temp_dir.name, "state", "journal.jsonl")
+        self.server.failures = [500]
+
+        summary = upload_files(batch_dir, self.api_endpoint, mode="multipart", max_workers=2,
+                               journal_file=journal_file, client=ApiClient(max_retries=0))
+
+        self.assertEqual(len(summary["uploaded"]), 2)
+        self.assertEqual(len(summary["failed"]), 1)
+        self.assertEqual(summary["bytes"], 2 * len(self.content))
+        self.assertEqual(len(self.server.requests), 3)
+
+        failed = summary["failed"]
+        summary = upload_files(batch_dir, self.api_endpoint, mode="multipart", journal_file=journal_file)
+
+        self.assertEqual(summary["uploaded"], failed)
+        self.assertEqual(len(summary["skipped"]), 2)
+        self.assertEqual(len(self.server.requests), 4)
+
+class TestApiClientDelegation(unittest.TestCase):
+
+    def test_call_post_and_get_api_use_client(self):
+        """
+        Test that call_post_api and call_get_api send requests through the given ApiClient.
+        """
+        mock_client = MagicMock()
+        mock_client.post.return_value.json.return_value = {"ok": True}
+        mock_client.get.return_value.json.return_value = {"ok": True}
+
+        call_post_api("http://mockapi.com/items", {"id": 1}, timeout=5, client=mock_client)
+        call_get_api("http://mockapi.com/items", {"id": 1}, client=mock_client)
+
+        mock_client.post.assert_called_once_with("http://mockapi.com/items", json={"id": 1}, timeout=5)
+        mock_client.get.assert_called_once_with("http://mockapi.com/items", params={"id": 1}, timeout=None)
+
+if __name__ == '__main__':
+    unittest.main()
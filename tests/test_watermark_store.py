@@ -0,0 +1,70 @@
+# tests/test_watermark_store.py
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from your_project_name.pipeline import watermark_store
+
+class TestWatermarkStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.state_file = os.path.join(self.temp_dir, "state", "watermarks.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_load_watermark_without_state_file(self):
+        """
+        Test that a job without a saved watermark gets None, meaning a full export.
+        """
+        self.assertIsNone(watermark_store.load_watermark("users", self.state_file))
+
+    def test_save_and_load_watermark_round_trips_types(self):
+        """
+        Test that each supported watermark type is restored with its original type.
+        """
+        values = {
+            "timestamps": datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+            "dates": date(2024, 5, 1),
+            "ids": 42,
+            "amounts": Decimal("10.50"),
+            "codes": "A-100",
+        }
+        for job_name, value in values.items():
+            watermark_store.save_watermark(job_name, value, self.state_file)
+
+        for job_name, value in values.items():
+            loaded = watermark_store.load_watermark(job_name, self.state_file)
+            self.assertEqual(loaded, value)
+            self.assertIs(type(loaded), type(value))
+
+    def test_save_watermark_replaces_file_and_keeps_other_jobs(self):
+        """
+        Test that saving rewrites the state file atomically without leftovers or losing other jobs.
+        """
+        watermark_store.save_watermark("users", 1, self.state_file)
+        watermark_store.save_watermark("orders", 5, self.state_file)
+        watermark_store.save_watermark("users", 2, self.state_file)
+
+        with open(self.state_file) as f:
+            state = json.load(f)
+        self.assertEqual({name: entry["value"] for name, entry in state.items()}, {"users": 2, "orders": 5})
+        self.assertEqual(sorted(os.listdir(os.path.dirname(self.state_file))),
+                         ["watermarks.json", "watermarks.json.lock"])
+
+    def test_save_watermark_rejects_unsupported_types(self):
+        """
+        Test that values that cannot be compared reliably after a round trip are rejected.
+        """
+        with self.assertRaises(TypeError):
+            watermark_store.save_watermark("users", 1.5, self.state_file)
+        self.assertFalse(os.path.exists(self.state_file))
+
+if __name__ == '__main__':
+    unittest.main()